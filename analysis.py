@@ -0,0 +1,106 @@
+"""
+Module de filtrage des tokens : mots vides et racinisation légère.
+
+Ce module fournit des fonctionnalités pour :
+1. Fournir des listes de mots vides (articles, prépositions, pronoms...) pour le
+   français et l'anglais, intégrées au code (aucun téléchargement)
+2. Réduire les mots à une racine approximative avec des raciniseurs légers, qui ne
+   retirent que les marques de pluriel et de genre les plus courantes
+"""
+
+from typing import Callable, Dict, FrozenSet
+
+FRENCH_STOP_WORDS = frozenset("""
+a à afin ai aie aient aies ait alors as au aucun aucune aura aurai auraient aurais
+aurait auras aurez auriez aurions aurons auront aussi autre aux avaient avais avait
+avant avec avez aviez avions avoir avons ayant ayez ayons c ça car ce ceci cela celle
+celles celui ces cet cette ceux chaque comme d dans de des donc dont du elle elles en
+encore es est et étaient étais était étant été êtes étiez étions être eu eue eues eûmes
+eurent eus eut eux fait font fut furent fus il ils j je jusqu l la le les leur leurs lui
+m ma mais me même mes moi mon n ne ni nos notre nous on ont ou où par parce pas peu peut
+plus pour qu quand que quel quelle quelles quels qui s sa sans se sera serai seraient
+serais serait seras serez seriez serions serons seront ses si son sont sous soyez
+soyons suis sur t ta te tes toi ton tous tout toute toutes tu un une vos votre vous y
+""".split())
+
+ENGLISH_STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before
+being below between both but by can could did do does doing down during each few for
+from further had has have having he her here hers herself him himself his how i if in
+into is it its itself just me more most my myself no nor not now of off on once only or
+other our ours ourselves out over own same she should so some such than that the their
+theirs them themselves then there these they this those through to too under until up
+very was we were what when where which while who whom why will with would you your
+yours yourself yourselves
+""".split())
+
+STOP_WORDS: Dict[str, FrozenSet[str]] = {
+    'fr': FRENCH_STOP_WORDS,
+    'en': ENGLISH_STOP_WORDS,
+}
+
+
+def stem_french(word: str) -> str:
+    """
+    Racinise un mot français en retirant pluriel, féminin et terminaisons en r/é.
+
+    Variante de la racinisation « minimale » de Savoy : chevaux -> cheval,
+    chats -> chat, chanteuses -> chanteus, parler -> parl. Seul le pluriel est
+    retiré des mots de quatre ou cinq lettres ; les mots plus courts sont
+    gardés tels quels.
+
+    Args :
+        word : Mot en minuscules
+
+    Returns :
+        La racine du mot
+    """
+    length = len(word)
+    if length < 4:
+        return word
+    if word[-1] == 'x':
+        if length >= 6 and word[-3:-1] == 'au':
+            return word[:-2] + 'l'
+        return word
+    if word[-1] == 's':
+        word = word[:-1]
+    if length < 6:
+        return word
+    if word[-1] == 'r':
+        word = word[:-1]
+    if word[-1] == 'e':
+        word = word[:-1]
+    if word[-1] == 'é':
+        word = word[:-1]
+    if word[-1] == word[-2] and word[-1].isalpha():
+        word = word[:-1]
+    return word
+
+
+def stem_english(word: str) -> str:
+    """
+    Racinise un mot anglais en retirant la marque du pluriel (S-stemmer de Harman).
+
+    queries -> query, books -> book ; les terminaisons -ss, -us, -aies, -eies,
+    -oes et -ees sont conservées.
+
+    Args :
+        word : Mot en minuscules
+
+    Returns :
+        La racine du mot
+    """
+    if len(word) < 3 or word[-1] != 's' or word[-2] in 'us':
+        return word
+    if word[-2] == 'e':
+        if len(word) > 3 and word[-3] == 'i' and word[-4] not in 'ae':
+            return word[:-3] + 'y'
+        if word[-3] in 'iaoe':
+            return word
+    return word[:-1]
+
+
+STEMMERS: Dict[str, Callable[[str], str]] = {
+    'fr': stem_french,
+    'en': stem_english,
+}
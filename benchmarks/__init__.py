@@ -0,0 +1,6 @@
+"""
+Benchmarks de TextIndexerPy.
+
+Chaque module s'exécute depuis la racine du dépôt, par exemple :
+    python -m benchmarks.bench_build_index
+"""
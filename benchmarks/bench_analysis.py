@@ -0,0 +1,114 @@
+"""
+Benchmark du filtrage des mots vides et de la racinisation.
+
+Construit l'index d'un même corpus sans filtre, avec les mots vides retirés,
+puis avec les mots vides retirés et les mots racinisés, et compare le nombre
+de termes et de postings, la taille des postings en mémoire, la taille du
+fichier d'index et le temps moyen d'une requête OU.
+
+Par défaut, le corpus est synthétique : les mots les plus fréquents de la loi
+de Zipf sont remplacés par de vrais mots vides français et anglais, et une
+partie des autres mots est mise au pluriel. Un dossier de fichiers texte peut
+être utilisé à la place avec --directory.
+
+Usage :
+    python -m benchmarks.bench_analysis --documents 5000 --length 300
+    python -m benchmarks.bench_analysis --directory dossier_de_textes/
+"""
+
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+from typing import Dict
+
+import document_loader
+from analysis import ENGLISH_STOP_WORDS, FRENCH_STOP_WORDS
+from indexer import InvertedIndex
+from search_engine import SearchEngine
+from tokenizer import Tokenizer
+from benchmarks.bench_top_k import make_queries
+from benchmarks.corpus import generate_corpus, make_vocabulary
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def with_stop_words(documents: Dict[str, str], vocabulary_size: int, plural_rate: float = 0.3,
+                    seed: int = 3) -> Dict[str, str]:
+    """Donne au corpus synthétique des mots vides réels et des pluriels."""
+    rng = random.Random(seed)
+    stop_words = sorted(FRENCH_STOP_WORDS | ENGLISH_STOP_WORDS)
+    rng.shuffle(stop_words)
+    # Les mots vides prennent la place des mots les plus fréquents
+    replacements = dict(zip(make_vocabulary(vocabulary_size), stop_words))
+
+    def replace(match):
+        word = match.group()
+        replacement = replacements.get(word)
+        if replacement is not None:
+            return replacement
+        return word + "s" if rng.random() < plural_rate else word
+
+    return {doc_id: WORD_PATTERN.sub(replace, content) for doc_id, content in documents.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--length", type=int, default=300)
+    parser.add_argument("--directory", help="dossier de fichiers texte à utiliser à la place du corpus synthétique")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    vocabulary_size = 5000
+    if args.directory:
+        documents = document_loader.load_documents(args.directory)
+    else:
+        documents = with_stop_words(generate_corpus(args.documents, args.length, vocabulary_size),
+                                    vocabulary_size)
+    # Requêtes mêlant mots vides et mots fréquents, comme une requête en langage naturel
+    queries = with_stop_words({i: query for i, query in enumerate(make_queries(args.queries, 4, vocabulary_size))},
+                              vocabulary_size)
+    queries = list(queries.values())
+
+    configurations = {
+        "sans filtre": Tokenizer(),
+        "mots vides": Tokenizer(stop_words=("fr", "en")),
+        "mots vides + racines": Tokenizer(stop_words=("fr", "en"), stemmer="fr"),
+    }
+
+    print(f"Corpus : {len(documents)} documents")
+    print(f"{'analyse':<22}{'termes':>9}{'postings':>11}{'postings (Mo)':>15}"
+          f"{'fichier (Mo)':>14}{'requête (ms)':>14}")
+    reference = None
+    with tempfile.TemporaryDirectory() as directory:
+        for name, tokenizer in configurations.items():
+            index = InvertedIndex(tokenizer)
+            index.build_index(documents)
+            postings_count = sum(len(postings) for postings in index.index.values())
+            postings_bytes = index.memory_usage()["postings"]
+            path = os.path.join(directory, "index.idx")
+            index.save(path)
+            file_size = os.path.getsize(path)
+
+            engine = SearchEngine(index)
+            for query in queries:
+                engine.search(query, use_all_terms=False, top_k=10)
+            start = time.perf_counter()
+            for query in queries:
+                engine.search(query, use_all_terms=False, top_k=10)
+            query_time = (time.perf_counter() - start) * 1000 / len(queries)
+
+            print(f"{name:<22}{len(index.index):>9}{postings_count:>11}{postings_bytes / 1e6:>15.2f}"
+                  f"{file_size / 1e6:>14.2f}{query_time:>14.3f}")
+            if reference is None:
+                reference = (postings_bytes, file_size)
+            else:
+                print(f"{'':<22}postings : -{100 * (1 - postings_bytes / reference[0]):.1f} %, "
+                      f"fichier : -{100 * (1 - file_size / reference[1]):.1f} %")
+
+
+if __name__ == "__main__":
+    main()
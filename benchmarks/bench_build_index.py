@@ -0,0 +1,118 @@
+"""
+Benchmark de la construction de l'index inversé.
+
+Compare le temps de construction et le pic mémoire de la construction en une
+seule passe (InvertedIndex.build_index) avec l'ancienne méthode, qui
+tokenisait chaque document deux fois. L'ancienne tokenisation (table de
+ponctuation reconstruite pour chaque document, lower().split(), deux copies
+complètes des tokens) est reproduite ici telle quelle, pour que la
+référence ne suive pas les évolutions du tokeniseur.
+
+Usage :
+    python -m benchmarks.bench_build_index --documents 2000 --length 300
+"""
+
+import argparse
+import string
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from indexer import InvertedIndex
+from benchmarks.corpus import generate_corpus
+
+
+def _tokenize(text: str) -> List[str]:
+    """Ancienne tokenisation : minuscules, ponctuation supprimée, découpage aux blancs."""
+    text = text.lower()
+    text = text.translate(str.maketrans('', '', string.punctuation))
+    return text.split()
+
+
+def _preprocess_documents(documents: Dict[str, str]) -> Dict[str, List[str]]:
+    """Ancien prétraitement : la liste des tokens de chaque document."""
+    return {doc_id: _tokenize(content) for doc_id, content in documents.items()}
+
+
+def _get_token_positions(documents: Dict[str, str]) -> Dict[str, Dict[str, List[int]]]:
+    """Ancien relevé des positions, qui tokenisait une seconde fois chaque document."""
+    token_positions = {}
+    for doc_id, content in documents.items():
+        content = content.lower()
+        content = content.translate(str.maketrans('', '', string.punctuation))
+        positions = {}
+        for position, token in enumerate(content.split()):
+            if token not in positions:
+                positions[token] = []
+            positions[token].append(position)
+        token_positions[doc_id] = positions
+    return token_positions
+
+
+def build_index_two_pass(documents: Dict[str, str]) -> Tuple[dict, dict, dict]:
+    """Reproduit l'ancienne construction (deux tokenisations par document)."""
+    index, document_lengths, term_frequencies = {}, {}, {}
+    token_positions = _get_token_positions(documents)
+    preprocessed_docs = _preprocess_documents(documents)
+    for doc_id, tokens in preprocessed_docs.items():
+        document_lengths[doc_id] = len(tokens)
+    for doc_id, positions_dict in token_positions.items():
+        term_frequencies[doc_id] = {}
+        for token, positions in positions_dict.items():
+            term_frequencies[doc_id][token] = len(positions)
+            if token not in index:
+                index[token] = []
+            index[token].append((doc_id, positions))
+    return index, document_lengths, term_frequencies
+
+
+def build_index_single_pass(documents: Dict[str, str]) -> InvertedIndex:
+    """Construction actuelle en une seule passe."""
+    index = InvertedIndex()
+    index.build_index(documents)
+    return index
+
+
+def measure(build: Callable[[Dict[str, str]], object],
+            documents: Dict[str, str], repeat: int) -> Tuple[float, int]:
+    """
+    Mesure le meilleur temps de construction et le pic mémoire.
+
+    Returns :
+        Tuple (meilleur temps en secondes, pic mémoire en octets)
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build(documents)
+        best = min(best, time.perf_counter() - start)
+
+    # Le pic mémoire est mesuré à part : tracemalloc ralentit l'exécution
+    tracemalloc.start()
+    build(documents)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--length", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    documents = generate_corpus(args.documents, args.length)
+    print(f"Corpus : {args.documents} documents, ~{args.length} mots par document")
+    print(f"{'méthode':<14}{'temps (s)':>12}{'pic mémoire (Mo)':>20}")
+    results = {}
+    for name, build in (("deux passes", build_index_two_pass),
+                        ("une passe", build_index_single_pass)):
+        elapsed, peak = measure(build, documents, args.repeat)
+        results[name] = elapsed
+        print(f"{name:<14}{elapsed:>12.3f}{peak / 2**20:>20.1f}")
+    print(f"Accélération : x{results['deux passes'] / results['une passe']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark du parcours et de la lecture d'une arborescence de documents.
+
+Crée une arborescence de petits fichiers (.txt, .md, une partie compressée
+en .gz), puis mesure le temps de lecture de tous les documents : par
+l'ancien chargeur (os.listdir et lecture séquentielle, appliqué dossier par
+dossier puisqu'il ne parcourait pas les sous-dossiers) et par crawler.crawl
+avec un nombre croissant de threads de lecture.
+
+Le cache du système de fichiers est chaud après la création des fichiers :
+le gain des threads est plus grand sur un disque lent ou réseau, où les
+lectures attendent le périphérique.
+
+Usage :
+    python -m benchmarks.bench_crawler --files 100000 --threads 1,4,8,16
+    python -m benchmarks.bench_crawler --directory dossier_existant/
+"""
+
+import argparse
+import gzip
+import os
+import random
+import tempfile
+import time
+
+import crawler
+from benchmarks.corpus import make_vocabulary
+
+
+def make_tree(root: str, files: int, per_directory: int = 1000, words: int = 80, seed: int = 5):
+    """Crée une arborescence de petits documents, répartis en dossiers de per_directory fichiers."""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(2000)
+    for i in range(files):
+        directory = os.path.join(root, f"part_{i // per_directory // 10:03d}", f"dir_{i // per_directory:04d}")
+        if i % per_directory == 0:
+            os.makedirs(directory, exist_ok=True)
+        content = " ".join(rng.choices(vocabulary, k=words)).encode("utf-8")
+        kind = i % 10
+        if kind == 0:
+            with gzip.open(os.path.join(directory, f"doc_{i:07d}.txt.gz"), "wb") as file:
+                file.write(content)
+        else:
+            extension = ".md" if kind < 3 else ".txt"
+            with open(os.path.join(directory, f"doc_{i:07d}{extension}"), "wb") as file:
+                file.write(content)
+
+
+def legacy_load(root: str) -> int:
+    """Ancien chargeur : os.listdir de chaque dossier, fichiers .txt lus un par un."""
+    count = 0
+    for directory, _, _ in os.walk(root):
+        for filename in os.listdir(directory):
+            if filename.endswith(".txt"):
+                with open(os.path.join(directory, filename), "r", encoding="utf-8") as file:
+                    file.read()
+                count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument("--threads", default="1,4,8,16", help="nombres de threads de lecture à mesurer")
+    parser.add_argument("--directory", help="arborescence existante à lire plutôt qu'une arborescence générée")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary:
+        root = args.directory
+        if root is None:
+            root = temporary
+            start = time.perf_counter()
+            make_tree(root, args.files)
+            print(f"Arborescence de {args.files} fichiers créée en {time.perf_counter() - start:.1f} s")
+
+        print(f"{'lecteur':<28}{'documents':>11}{'secondes':>10}{'fichiers/s':>12}{'Mo/s':>8}")
+        start = time.perf_counter()
+        count = legacy_load(root)
+        elapsed = time.perf_counter() - start
+        print(f"{'ancien (.txt seulement)':<28}{count:>11}{elapsed:>10.2f}{count / elapsed:>12.0f}{'':>8}")
+
+        for threads in (int(value) for value in args.threads.split(",")):
+            report = crawler.CrawlReport()
+            start = time.perf_counter()
+            count = sum(1 for _ in crawler.crawl(root, workers=threads, report=report))
+            elapsed = time.perf_counter() - start
+            name = f"crawl, {threads} thread(s)"
+            print(f"{name:<28}{count:>11}{elapsed:>10.2f}{count / elapsed:>12.0f}"
+                  f"{report.bytes / elapsed / 1e6:>8.1f}")
+            if report.errors:
+                print(f"  {len(report.errors)} erreur(s), par exemple : {report.errors[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark de la recherche approchée des termes (fautes de frappe).
+
+Pour des vocabulaires de tailles croissantes, mesure la construction et la
+mémoire de l'index des variantes (FuzzyIndex), puis la latence d'une
+recherche à distance 1 et 2 de mots mal orthographiés (une ou deux lettres
+insérées, retirées, remplacées ou inversées), comparée au calcul de la
+distance avec chaque terme du vocabulaire. Les deux méthodes doivent
+trouver les mêmes termes.
+
+Usage :
+    python -m benchmarks.bench_fuzzy --sizes 1000,10000,100000
+"""
+
+import argparse
+import random
+import string
+import time
+from typing import List
+
+from fuzzy import FuzzyIndex, edit_distance
+from benchmarks.bench_memory import traced_size
+
+CONSONANTS = "bcdfghjklmnprstvz"
+VOWELS = "aeiouy"
+
+
+def make_words(count: int, seed: int = 11) -> List[str]:
+    """Génère des mots distincts de 3 à 12 lettres, alternant consonnes et voyelles."""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        length = min(12, max(3, int(rng.gauss(7, 2))))
+        words.add("".join(rng.choice(VOWELS if i % 2 else CONSONANTS) for i in range(length)))
+    return sorted(words)
+
+
+def misspell(word: str, typos: int, rng: random.Random) -> str:
+    """Applique des fautes de frappe au hasard (insertion, suppression, substitution, inversion)."""
+    for _ in range(typos):
+        i = rng.randrange(len(word))
+        kind = rng.randrange(4)
+        if kind == 0:
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+        elif kind == 1 and len(word) > 1:
+            word = word[:i] + word[i + 1:]
+        elif kind == 2 or i + 1 >= len(word):
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+        else:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word
+
+
+def linear_lookup(words: List[str], word: str, max_distance: int):
+    """Recherche de référence : distance avec chaque terme du vocabulaire."""
+    matches = []
+    for term in words:
+        if abs(len(term) - len(word)) <= max_distance:
+            distance = edit_distance(word, term, max_distance)
+            if distance <= max_distance:
+                matches.append((term, distance))
+    matches.sort(key=lambda match: (match[1], match[0]))
+    return matches
+
+
+def percentile(latencies: List[float], p: float) -> float:
+    """Retourne un percentile des latences, en microsecondes."""
+    latencies = sorted(latencies)
+    return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="tailles de vocabulaire, séparées par des virgules")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--linear-queries", type=int, default=50, help="requêtes mesurées avec le parcours complet")
+    args = parser.parse_args()
+
+    print(f"{'termes':>8}{'k':>3}{'construction (s)':>18}{'mémoire (Mo)':>14}"
+          f"{'p50 (µs)':>10}{'p99 (µs)':>10}{'parcours (µs)':>15}{'accélération':>14}")
+    for size in (int(size) for size in args.sizes.split(",")):
+        words = make_words(size)
+        for max_distance in (1, 2):
+            start = time.perf_counter()
+            fuzzy_index = FuzzyIndex(max_distance)
+            fuzzy_index.update(words)
+            build_time = time.perf_counter() - start
+
+            def build():
+                built = FuzzyIndex(max_distance)
+                built.update(words)
+                return built
+
+            memory = traced_size(build) - traced_size(lambda: list(words))
+
+            rng = random.Random(size + max_distance)
+            queries = [misspell(rng.choice(words), rng.randint(1, max_distance), rng) for _ in range(args.queries)]
+            latencies = []
+            for query in queries:
+                query_start = time.perf_counter()
+                fuzzy_index.lookup(query)
+                latencies.append(time.perf_counter() - query_start)
+
+            linear_latencies = []
+            for query in queries[:args.linear_queries]:
+                query_start = time.perf_counter()
+                expected = linear_lookup(words, query, max_distance)
+                linear_latencies.append(time.perf_counter() - query_start)
+                if fuzzy_index.lookup(query) != expected:
+                    raise AssertionError(f"Résultats différents pour {query!r}")
+
+            mean = sum(latencies) / len(latencies)
+            linear_mean = sum(linear_latencies) / len(linear_latencies)
+            print(f"{size:>8}{max_distance:>3}{build_time:>18.2f}{memory / 2**20:>14.1f}"
+                  f"{percentile(latencies, 0.50):>10.0f}{percentile(latencies, 0.99):>10.0f}"
+                  f"{linear_mean * 1e6:>15.0f}{linear_mean / mean:>13.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark de l'intersection des postings (requêtes ET).
+
+Compare l'ancienne intersection (un set Python construit à partir de la
+liste complète de chaque terme) avec l'intersection galopante de
+postings.intersect_sorted, pour des listes de tailles très différentes :
+un terme rare combiné à des termes fréquents.
+
+Usage :
+    python -m benchmarks.bench_intersection --universe 2000000
+"""
+
+import argparse
+import random
+import time
+from array import array
+
+from postings import intersect_sorted
+
+
+def intersect_with_sets(lists):
+    """Reproduit l'ancienne intersection, dans l'ordre de la requête."""
+    doc_ids = set(lists[0])
+    for doc_id_list in lists[1:]:
+        doc_ids = doc_ids.intersection(set(doc_id_list))
+        if not doc_ids:
+            return []
+    return sorted(doc_ids)
+
+
+def sample_postings(rng, universe: int, size: int) -> array:
+    """Tire une liste triée de numéros de documents distincts."""
+    return array('I', sorted(rng.sample(range(universe), size)))
+
+
+def best_time(function, lists, repeat: int) -> float:
+    """Retourne le meilleur temps d'exécution en millisecondes."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(lists)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--universe", type=int, default=2000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    frequent = [sample_postings(rng, args.universe, args.universe // ratio) for ratio in (2, 4)]
+    print(f"Univers de {args.universe} documents ; termes fréquents de "
+          f"{len(frequent[0])} et {len(frequent[1])} documents")
+    print(f"{'terme rare':>12}{'sets (ms)':>12}{'galopante (ms)':>17}{'accélération':>15}")
+    # Un terme rare ne dépasse pas le quart de l'univers, la taille du moins fréquent des autres termes
+    for rare_size in (size for size in (10, 100, 1000, 10000, 100000) if size <= args.universe // 4):
+        # Ordre de la requête défavorable : les termes fréquents d'abord
+        lists = frequent + [sample_postings(rng, args.universe, rare_size)]
+        expected = intersect_with_sets(lists)
+        assert intersect_sorted(lists) == expected
+        with_sets = best_time(intersect_with_sets, lists, args.repeat)
+        galloping = best_time(intersect_sorted, lists, args.repeat)
+        print(f"{rare_size:>12}{with_sets:>12.2f}{galloping:>17.3f}{with_sets / galloping:>14.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark de la mémoire occupée par l'index.
+
+Compare l'ancienne représentation des postings (listes de tuples
+(id_doc, [positions]) répétant le nom du document) avec les tableaux
+compacts de PostingsList, et affiche le rapport InvertedIndex.memory_usage.
+
+Usage :
+    python -m benchmarks.bench_memory --documents 5000 --length 300
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from indexer import InvertedIndex
+from benchmarks.corpus import generate_corpus
+
+
+def traced_size(build) -> int:
+    """Retourne la mémoire encore allouée par l'objet construit."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--length", type=int, default=300)
+    args = parser.parse_args()
+
+    documents = generate_corpus(args.documents, args.length)
+    index = InvertedIndex()
+    index.build_index(documents)
+
+    def tuple_postings():
+        return {term: [(index.doc_names[number], positions.tolist()) for number, positions in postings]
+                for term, postings in index.index.items()}
+
+    def array_postings():
+        copy = InvertedIndex()
+        copy.build_index(documents)
+        return copy.index
+
+    print(f"Corpus : {args.documents} documents, ~{args.length} mots par document")
+    legacy = traced_size(tuple_postings)
+    compact = traced_size(array_postings)
+    print(f"Postings en listes de tuples : {legacy / 2**20:10.1f} Mo")
+    print(f"Postings en tableaux         : {compact / 2**20:10.1f} Mo")
+    print(f"Réduction                    : x{legacy / compact:.1f}")
+
+    print("\nInvertedIndex.memory_usage() :")
+    for name, size in index.memory_usage().items():
+        print(f"  {name:<18}{size / 2**20:10.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
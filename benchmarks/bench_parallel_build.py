@@ -0,0 +1,46 @@
+"""
+Benchmark de la construction parallèle de l'index.
+
+Mesure le temps de construction avec 1, 2, 4 et 8 processus et
+l'accélération obtenue par rapport à la construction séquentielle.
+
+Usage :
+    python -m benchmarks.bench_parallel_build --documents 20000 --length 300
+"""
+
+import argparse
+import os
+import time
+
+from indexer import InvertedIndex
+from benchmarks.corpus import generate_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--length", type=int, default=300)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    documents = generate_corpus(args.documents, args.length)
+    print(f"Corpus : {args.documents} documents, ~{args.length} mots par document, "
+          f"{os.cpu_count()} processeurs disponibles")
+    print(f"{'processus':>10}{'temps (s)':>12}{'accélération':>14}")
+
+    baseline = None
+    for workers in args.workers:
+        best = float("inf")
+        for _ in range(args.repeat):
+            index = InvertedIndex()
+            start = time.perf_counter()
+            index.build_index(documents, workers=workers)
+            best = min(best, time.perf_counter() - start)
+        if baseline is None:
+            baseline = best
+        print(f"{workers:>10}{best:>12.3f}{baseline / best:>13.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark de la compression des positions dans les postings.
+
+Compare trois représentations des positions d'un même index : listes
+d'entiers Python (une par document), tableau array concaténé (représentation
+précédente de PostingsList) et écarts encodés par blocs sur 1, 2 ou 4 octets
+(PostingsList). Mesure la mémoire occupée par les postings (numéros de
+documents compris), le débit de lecture de toutes les positions et le temps
+d'accès aux positions d'un document pris au hasard.
+
+Usage :
+    python -m benchmarks.bench_postings --documents 5000 --length 300
+"""
+
+import argparse
+import copy
+import random
+import time
+from array import array
+
+from indexer import InvertedIndex
+from benchmarks.bench_memory import traced_size
+from benchmarks.corpus import generate_corpus
+
+
+class ArrayPostings:
+    """Représentation précédente : positions de tous les documents dans un tableau, découpé par offsets."""
+
+    __slots__ = ('doc_ids', 'offsets', 'positions')
+
+    def __init__(self, postings):
+        self.doc_ids = array('I', postings.doc_ids)
+        self.offsets = array('I', postings.offsets)
+        self.positions = array('I')
+        for _, positions in postings:
+            self.positions.extend(positions)
+
+    def __iter__(self):
+        positions = self.positions
+        offsets = self.offsets
+        for i in range(len(offsets) - 1):
+            yield self.doc_ids[i], positions[offsets[i]:offsets[i + 1]]
+
+    def positions_at(self, i):
+        return self.positions[self.offsets[i]:self.offsets[i + 1]]
+
+
+def best_time(run, repeat: int) -> float:
+    """Retourne le meilleur temps d'exécution, en secondes."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--length", type=int, default=300)
+    parser.add_argument("--lookups", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    documents = generate_corpus(args.documents, args.length)
+    index = InvertedIndex()
+    index.build_index(documents)
+    compressed = dict(index.index)
+    total_positions = sum(postings.offsets[-1] for postings in compressed.values())
+
+    representations = {
+        "listes Python": lambda: {term: [(doc_id, positions.tolist()) for doc_id, positions in postings]
+                                  for term, postings in compressed.items()},
+        "tableau array": lambda: {term: ArrayPostings(postings) for term, postings in compressed.items()},
+        "blocs compressés": lambda: copy.deepcopy(compressed),
+    }
+    sizes = {name: traced_size(build) for name, build in representations.items()}
+    built = {name: build() for name, build in representations.items() if name != "blocs compressés"}
+    built["blocs compressés"] = compressed
+
+    rng = random.Random(7)
+    terms = list(compressed)
+    lookups = []
+    for _ in range(args.lookups):
+        term = rng.choice(terms)
+        lookups.append((term, rng.randrange(len(compressed[term]))))
+
+    def decode(postings_by_term):
+        for postings in postings_by_term.values():
+            for _, positions in postings:
+                for _ in positions:
+                    pass
+
+    def lookup_lists(postings_by_term):
+        for term, i in lookups:
+            postings_by_term[term][i][1]
+
+    def lookup_positions(postings_by_term):
+        for term, i in lookups:
+            postings_by_term[term].positions_at(i)
+
+    lookup_functions = {"listes Python": lookup_lists, "tableau array": lookup_positions,
+                        "blocs compressés": lookup_positions}
+
+    print(f"Corpus : {args.documents} documents, {total_positions} positions")
+    print(f"{'représentation':<20}{'mémoire (Mo)':>14}{'octets/position':>17}{'compression':>13}"
+          f"{'décodage (Mpos/s)':>19}{'accès (µs)':>12}")
+    reference = sizes["listes Python"]
+    for name, postings_by_term in built.items():
+        decode_time = best_time(lambda: decode(postings_by_term), args.repeat)
+        lookup_time = best_time(lambda: lookup_functions[name](postings_by_term), args.repeat)
+        print(f"{name:<20}{sizes[name] / 2**20:>14.2f}{sizes[name] / total_positions:>17.2f}"
+              f"{reference / sizes[name]:>12.1f}x{total_positions / decode_time / 1e6:>19.2f}"
+              f"{lookup_time * 1e6 / len(lookups):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
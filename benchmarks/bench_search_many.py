@@ -0,0 +1,59 @@
+"""
+Benchmark du traitement de requêtes par lots.
+
+Compare une boucle de SearchEngine.search avec search_many en séquentiel,
+sur un pool de threads et sur un pool de processus, pour un journal de
+requêtes où les mots fréquents et les requêtes populaires se répètent.
+
+Usage :
+    python -m benchmarks.bench_search_many --documents 20000 --queries 20000 --workers 4
+"""
+
+import argparse
+import time
+
+from indexer import InvertedIndex
+from search_engine import SearchEngine
+from benchmarks.bench_top_k import make_queries
+from benchmarks.corpus import generate_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--length", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--distinct", type=int, default=2000, help="nombre de requêtes distinctes du journal")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    vocabulary_size = 5000
+    documents = generate_corpus(args.documents, args.length, vocabulary_size)
+    index = InvertedIndex()
+    index.build_index(documents)
+    del documents
+    engine = SearchEngine(index)
+
+    distinct = make_queries(args.distinct, 3, vocabulary_size)
+    queries = [distinct[i % len(distinct)] for i in range(args.queries)]
+    engine.search(queries[0], use_all_terms=False, top_k=10)
+
+    start = time.perf_counter()
+    expected = [engine.search(query, use_all_terms=False, top_k=10) for query in queries]
+    baseline = time.perf_counter() - start
+    print(f"Corpus : {args.documents} documents, {args.queries} requêtes ({args.distinct} distinctes)")
+    print(f"{'méthode':<28}{'temps (s)':>10}{'requêtes/s':>13}{'accélération':>15}")
+    print(f"{'boucle de search':<28}{baseline:>10.2f}{args.queries / baseline:>13.0f}{1.0:>14.2f}x")
+
+    for label, workers, use_processes in (("search_many", 1, False),
+                                          (f"search_many, {args.workers} threads", args.workers, False),
+                                          (f"search_many, {args.workers} processus", args.workers, True)):
+        start = time.perf_counter()
+        results = engine.search_many(queries, False, 10, workers, use_processes)
+        elapsed = time.perf_counter() - start
+        assert results == expected
+        print(f"{label:<28}{elapsed:>10.2f}{args.queries / elapsed:>13.0f}{baseline / elapsed:>14.2f}x")
+
+
+if __name__ == "__main__":
+    main()
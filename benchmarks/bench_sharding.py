@@ -0,0 +1,72 @@
+"""
+Benchmark de l'index fragmenté, avec un processus par fragment.
+
+Pour 1, 2, 4 et 8 fragments, mesure le temps de construction, la mémoire de
+l'index du plus gros fragment (celle qu'un processus ou une machine doit
+contenir) et le débit d'un lot de requêtes OU top-10, comparés à ceux d'un
+index unique. Les scores des meilleurs résultats doivent être ceux de
+l'index unique, les statistiques de la collection étant globales.
+
+Usage :
+    python -m benchmarks.bench_sharding --documents 20000 --length 300 --shards 1 2 4 8
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+
+from benchmarks.corpus import generate_corpus, make_vocabulary
+from indexer import InvertedIndex
+from search_engine import SearchEngine
+from sharding import ShardedIndex, ShardedSearchEngine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--length", type=int, default=300)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    documents = generate_corpus(args.documents, args.length)
+    vocabulary = make_vocabulary(5000)
+    rng = random.Random(7)
+    queries = [" ".join(rng.choices(vocabulary[:2000], k=rng.randint(1, 3))) for _ in range(args.queries)]
+    print(f"Corpus : {args.documents} documents, ~{args.length} mots par document, "
+          f"{os.cpu_count()} processeurs disponibles")
+
+    index = InvertedIndex()
+    start = time.perf_counter()
+    index.build_index(documents)
+    build_time = time.perf_counter() - start
+    engine = SearchEngine(index)
+    start = time.perf_counter()
+    expected = engine.search_many(queries, False, args.top_k)
+    search_time = time.perf_counter() - start
+    memory = sum(index.memory_usage().values())
+
+    print(f"{'fragments':>10}{'construction (s)':>18}{'plus gros fragment (Mo)':>25}{'requêtes/s':>12}")
+    print(f"{'index seul':>10}{build_time:>18.2f}{memory / 2**20:>25.1f}{len(queries) / search_time:>12.0f}")
+    for shard_count in args.shards:
+        with ShardedIndex(shard_count, processes=True) as sharded:
+            start = time.perf_counter()
+            sharded.build_index(documents)
+            build_time = time.perf_counter() - start
+            memory = max(sum(usage.values()) for usage in sharded.memory_usage())
+            coordinator = ShardedSearchEngine(sharded)
+            start = time.perf_counter()
+            results = coordinator.search_many(queries, False, args.top_k)
+            search_time = time.perf_counter() - start
+        for query, result, reference in zip(queries, results, expected):
+            if not all(math.isclose(score, expected_score, rel_tol=1e-9)
+                       for (_, score), (_, expected_score) in zip(result, reference)):
+                raise AssertionError(f"Scores différents de ceux de l'index seul pour {query!r}")
+        print(f"{shard_count:>10}{build_time:>18.2f}{memory / 2**20:>25.1f}{len(queries) / search_time:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
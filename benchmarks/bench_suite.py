@@ -0,0 +1,280 @@
+"""
+Suite de benchmarks reproductible, avec résultats en JSON.
+
+Pour chaque taille de corpus synthétique (loi de Zipf, de 1 000 à 1 000 000
+de documents générés à la demande), mesure :
+- le temps de construction de l'index, la mémoire estimée de l'index et le
+  pic de mémoire résidente (chaque taille est mesurée dans son propre
+  processus, pour que ce pic soit celui de la taille et non du programme) ;
+- la latence (moyenne, p50, p99) des recherches d'un terme, ET de deux
+  termes, OU de trois termes et d'une expression exacte, top-10 ;
+- le débit des extraits (ResultRetriever.get_multi_term_snippet, sans cache).
+
+Les corpus et les requêtes ne dépendent que de la graine : deux exécutions
+mesurent exactement le même travail. Les résultats sont écrits en JSON avec
+--output ; --compare compare les latences et les temps à un fichier de
+résultats précédent et signale les régressions au-delà de --tolerance
+(code de retour 1).
+
+Usage :
+    python -m benchmarks.bench_suite --sizes 1000,10000,100000 --output resultats.json
+    python -m benchmarks.bench_suite --sizes 1000,10000 --compare reference.json --tolerance 0.15
+    python -m benchmarks.bench_suite --sizes 1000000 --length 100 --workers 4 --output million.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmarks.corpus import SyntheticCorpus
+from indexer import InvertedIndex
+from retrieval import ResultRetriever
+from search_engine import SearchEngine
+
+# Nombre de résultats demandés par recherche, comme l'affichage par défaut
+TOP_K = 10
+
+# Mesures comparées par --compare : chemin dans les résultats d'une taille ; une
+# valeur plus grande est une régression, sauf pour les débits (marqués True)
+COMPARED = (
+    (("construction_s",), False),
+    (("requetes", "terme", "p50_ms"), False),
+    (("requetes", "terme", "p99_ms"), False),
+    (("requetes", "et", "p50_ms"), False),
+    (("requetes", "et", "p99_ms"), False),
+    (("requetes", "ou", "p50_ms"), False),
+    (("requetes", "ou", "p99_ms"), False),
+    (("requetes", "expression", "p50_ms"), False),
+    (("requetes", "expression", "p99_ms"), False),
+    (("extraits_par_s",), True),
+)
+
+
+def make_queries(corpus: SyntheticCorpus, count: int, seed: int) -> Dict[str, List[str]]:
+    """
+    Tire les requêtes de chaque type.
+
+    Les termes mêlent mots très fréquents, moyens et rares de la loi de Zipf ;
+    les expressions sont deux mots consécutifs d'un document du corpus, pour
+    qu'elles aient des résultats.
+
+    Args :
+        corpus : Le corpus interrogé
+        count : Nombre de requêtes de chaque type
+        seed : Graine du tirage
+
+    Returns :
+        Dictionnaire associant chaque type de requête à ses requêtes
+    """
+    rng = random.Random(seed)
+    vocabulary = corpus.vocabulary
+
+    def word() -> str:
+        # Rang tiré sur une échelle logarithmique : autant de mots fréquents que de mots rares
+        return vocabulary[min(len(vocabulary) - 1, int(len(vocabulary) ** rng.random()) - 1)]
+
+    phrases = []
+    for _ in range(count):
+        words = [token.strip(",.;!") for token in corpus.words(rng.randrange(len(corpus)))]
+        start = rng.randrange(max(1, len(words) - 1))
+        phrases.append('"' + " ".join(words[start:start + 2]) + '"')
+    return {
+        "terme": [word() for _ in range(count)],
+        "et": [f"{word()} {word()}" for _ in range(count)],
+        "ou": [f"{word()} {word()} {word()}" for _ in range(count)],
+        "expression": phrases,
+    }
+
+
+def latencies(run: Callable[[str], object], queries: List[str], repeat: int = 1) -> Dict[str, float]:
+    """Exécute les requêtes repeat fois et retourne le nombre de mesures et leurs latences, en millisecondes."""
+    measured = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            run(query)
+            measured.append(time.perf_counter() - start)
+    measured.sort()
+
+    def percentile(p: float) -> float:
+        return measured[min(len(measured) - 1, int(p * len(measured)))] * 1000
+
+    return {
+        "requetes": len(measured),
+        "moyenne_ms": sum(measured) / len(measured) * 1000,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def max_rss() -> int:
+    """Retourne le pic de mémoire résidente du processus, en octets (0 si elle n'est pas disponible)."""
+    if resource is None:
+        return 0
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_size(size: int, args) -> dict:
+    """
+    Construit l'index d'un corpus de la taille donnée et mesure les recherches et les extraits.
+
+    Exécuté dans un processus dédié à la taille (voir main), dont max_rss est le pic de mémoire.
+    """
+    corpus = SyntheticCorpus(size, args.length, args.vocabulary, args.exponent, args.seed)
+    index = InvertedIndex()
+    start = time.perf_counter()
+    index.build_index_from_stream(corpus.items(), workers=args.workers)
+    build_time = time.perf_counter() - start
+    memory = index.memory_usage()
+
+    engine = SearchEngine(index, args.scorer)
+    queries = make_queries(corpus, args.queries, args.seed + size)
+    # Premier appel hors mesure : normalisations précalculées du classement
+    engine.search(queries["terme"][0], False, TOP_K)
+    results = {
+        "terme": latencies(lambda query: engine.search(query, True, TOP_K), queries["terme"], args.repeat),
+        "et": latencies(lambda query: engine.search(query, True, TOP_K), queries["et"], args.repeat),
+        "ou": latencies(lambda query: engine.search(query, False, TOP_K), queries["ou"], args.repeat),
+        "expression": latencies(lambda query: engine.search(query, True, TOP_K), queries["expression"], args.repeat),
+    }
+
+    # Extraits des meilleurs résultats des requêtes OU ; les documents sont générés
+    # avant la mesure, qui ne porte que sur la construction des extraits
+    snippet_requests = []
+    for query in queries["ou"]:
+        terms = engine.parse_query(query).highlight_terms()
+        snippet_requests.extend((doc_id, terms) for doc_id, _ in engine.search(query, False, TOP_K))
+    documents = {doc_id: corpus[doc_id] for doc_id, _ in snippet_requests}
+    retriever = ResultRetriever(index, documents, args.scorer, cache_size=0)
+    start = time.perf_counter()
+    for doc_id, terms in snippet_requests:
+        retriever.get_multi_term_snippet(doc_id, terms)
+    snippet_time = time.perf_counter() - start
+
+    return {
+        "documents": size,
+        "tokens": index.total_tokens,
+        "termes": index.vocabulary_size(),
+        "construction_s": build_time,
+        "documents_par_s": size / build_time if build_time else 0.0,
+        "memoire_index_mo": memory["total"] / 2**20,
+        "memoire_postings_mo": memory["postings"] / 2**20,
+        "rss_max_mo": max_rss() / 2**20,
+        "requetes": results,
+        "extraits": len(snippet_requests),
+        "extraits_par_s": len(snippet_requests) / snippet_time if snippet_time else 0.0,
+    }
+
+
+def lookup(entry: dict, path) -> float:
+    """Retourne la valeur d'une mesure des résultats d'une taille, ou None si elle est absente."""
+    for key in path:
+        if not isinstance(entry, dict) or key not in entry:
+            return None
+        entry = entry[key]
+    return entry
+
+
+def compare(current: dict, reference: dict, tolerance: float) -> List[str]:
+    """
+    Compare deux exécutions de la suite, taille par taille.
+
+    Args :
+        current : Résultats de l'exécution courante
+        reference : Résultats de l'exécution de référence
+        tolerance : Écart relatif toléré avant de signaler une régression (0.1 pour 10 %)
+
+    Returns :
+        Les régressions, une ligne par mesure
+    """
+    reference_sizes = {entry["documents"]: entry for entry in reference["resultats"]}
+    regressions = []
+    print(f"\n{'documents':>10}  {'mesure':<26}{'référence':>12}{'actuel':>12}{'écart':>9}")
+    for entry in current["resultats"]:
+        previous = reference_sizes.get(entry["documents"])
+        if previous is None:
+            continue
+        for path, higher_is_better in COMPARED:
+            new, old = lookup(entry, path), lookup(previous, path)
+            if not new or not old:
+                continue
+            change = new / old - 1.0
+            worse = -change if higher_is_better else change
+            name = ".".join(path)
+            flag = "  régression" if worse > tolerance else ""
+            print(f"{entry['documents']:>10}  {name:<26}{old:>12.3f}{new:>12.3f}{change:>+8.0%}{flag}")
+            if flag:
+                regressions.append(f"{entry['documents']} documents, {name} : {old:.3f} -> {new:.3f} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="nombres de documents, séparés par des virgules")
+    parser.add_argument("--length", type=int, default=200, help="nombre moyen de mots par document")
+    parser.add_argument("--vocabulary", type=int, default=50000, help="nombre de mots distincts")
+    parser.add_argument("--exponent", type=float, default=1.1, help="exposant de la loi de Zipf")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--queries", type=int, default=200, help="requêtes de chaque type")
+    parser.add_argument("--repeat", type=int, default=3, help="passages sur les requêtes (défaut : 3)")
+    parser.add_argument("--scorer", default="bm25", help="frequence, tfidf ou bm25")
+    parser.add_argument("--workers", type=int, default=1, help="processus pour la construction de l'index")
+    parser.add_argument("--output", help="fichier JSON des résultats")
+    parser.add_argument("--compare", help="fichier JSON de résultats de référence")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="écart relatif toléré (défaut : 0.10)")
+    args = parser.parse_args()
+
+    report = {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "processeurs": os.cpu_count(),
+        "parametres": {name: getattr(args, name) for name in
+                       ("length", "vocabulary", "exponent", "seed", "queries", "repeat", "scorer", "workers")},
+        "resultats": [],
+    }
+    print(f"{'documents':>10}{'construction (s)':>18}{'index (Mo)':>12}"
+          f"{'terme p50/p99':>16}{'ET p50/p99':>16}{'OU p50/p99':>16}{'expr. p50/p99':>16}{'extraits/s':>12}")
+    for size in (int(size) for size in args.sizes.split(",")):
+        # Un processus neuf par taille : le pic de mémoire résidente est propre à chaque taille
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            entry = executor.submit(run_size, size, args).result()
+        report["resultats"].append(entry)
+        columns = "".join(f"{entry['requetes'][kind]['p50_ms']:>8.2f}/{entry['requetes'][kind]['p99_ms']:<7.2f}"
+                          for kind in ("terme", "et", "ou", "expression"))
+        print(f"{size:>10}{entry['construction_s']:>18.2f}{entry['memoire_index_mo']:>12.1f}  "
+              f"{columns}{entry['extraits_par_s']:>10.0f}")
+        sys.stdout.flush()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f"\nRésultats enregistrés dans {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            reference = json.load(file)
+        regressions = compare(report, reference, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} régression(s) au-delà de {args.tolerance:.0%} :")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nAucune régression.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark du tokeniseur.
+
+Compare, en tokens par seconde, l'ancienne tokenisation (table de ponctuation
+ASCII reconstruite à chaque appel, puis lower et split) avec le Tokenizer
+compilé, sur un corpus ASCII et sur un corpus accentué, pour le simple
+découpage (tokenize) et pour l'analyse complète d'un document (positions et
+décalages, utilisée à l'indexation ; l'ancienne analyse découpait sur les
+blancs puis retrouvait chaque fragment dans le texte).
+
+Usage :
+    python -m benchmarks.bench_tokenizer --documents 5000 --length 300
+"""
+
+import argparse
+import string
+import time
+from array import array
+from typing import Callable, Dict, List
+
+from tokenizer import Tokenizer
+from benchmarks.corpus import generate_corpus
+
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+# Syllabes accentuées substituées pour obtenir un corpus « français »
+ACCENTS = {"de": "dé", "ze": "zè", "na": "nà", "po": "pô", "mu": "mû"}
+
+
+def legacy_tokenize(text: str) -> List[str]:
+    """Reproduit l'ancien document_loader.tokenize."""
+    text = text.lower()
+    text = text.translate(str.maketrans('', '', string.punctuation))
+    return text.split()
+
+
+def legacy_analyze(content: str):
+    """Reproduit l'ancienne analyse d'un document (positions et décalages des tokens)."""
+    chunks = content.split()
+    cleaned = ' '.join(chunks).lower().translate(PUNCTUATION_TABLE).split(' ')
+    positions = {}
+    offsets = array('I')
+    position = 0
+    cursor = 0
+    for chunk, token in zip(chunks, cleaned):
+        start = content.find(chunk, cursor)
+        cursor = start + len(chunk)
+        if token:
+            positions.setdefault(token, []).append(position)
+            offsets.append(start)
+            position += 1
+    return positions, offsets
+
+
+def accented(documents: Dict[str, str]) -> Dict[str, str]:
+    """Remplace quelques syllabes par leur version accentuée."""
+    result = {}
+    for doc_id, content in documents.items():
+        for plain, accent in ACCENTS.items():
+            content = content.replace(plain, accent)
+        result[doc_id] = content.capitalize()
+    return result
+
+
+def tokens_per_second(run: Callable[[str], object], texts: List[str], tokens: int, repeat: int) -> float:
+    """Retourne le meilleur débit, en tokens par seconde."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            run(text)
+        best = min(best, time.perf_counter() - start)
+    return tokens / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--length", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    ascii_corpus = generate_corpus(args.documents, args.length)
+    corpora = {"ASCII": ascii_corpus, "accentué": accented(ascii_corpus)}
+    tokenizers = {"Tokenizer": Tokenizer(), "Tokenizer + accents": Tokenizer(fold_accents=True)}
+
+    print(f"{'corpus':<10}{'méthode':<34}{'tokens/s':>14}{'accélération':>15}")
+    for corpus_name, documents in corpora.items():
+        texts = list(documents.values())
+        tokens = sum(len(legacy_tokenize(text)) for text in texts)
+        baseline = tokens_per_second(legacy_tokenize, texts, tokens, args.repeat)
+        print(f"{corpus_name:<10}{'ancien tokenize':<34}{baseline:>14,.0f}{1.0:>14.2f}x")
+        for name, tokenizer in tokenizers.items():
+            rate = tokens_per_second(tokenizer.tokenize, texts, tokens, args.repeat)
+            print(f"{corpus_name:<10}{name + ' (tokenize)':<34}{rate:>14,.0f}{rate / baseline:>14.2f}x")
+
+        baseline = tokens_per_second(legacy_analyze, texts, tokens, args.repeat)
+        print(f"{corpus_name:<10}{'ancienne analyse':<34}{baseline:>14,.0f}{1.0:>14.2f}x")
+        for name, tokenizer in tokenizers.items():
+            rate = tokens_per_second(tokenizer.analyze, texts, tokens, args.repeat)
+            print(f"{corpus_name:<10}{name + ' (analyze)':<34}{rate:>14,.0f}{rate / baseline:>14.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark de la recherche top-k en mode OU.
+
+Compare, pour différentes valeurs de k et longueurs de requête, le calcul
+exhaustif (score de tous les documents puis tri complet) avec la recherche
+top-k par tas borné et élagage MaxScore.
+
+Usage :
+    python -m benchmarks.bench_top_k --documents 20000 --queries 50
+"""
+
+import argparse
+import random
+import time
+
+from indexer import InvertedIndex
+from search_engine import SearchEngine
+from benchmarks.corpus import generate_corpus, make_vocabulary
+
+
+def make_queries(count: int, length: int, vocabulary_size: int, seed: int = 7):
+    """Tire des requêtes mêlant mots fréquents et mots plus rares du vocabulaire."""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(vocabulary_size)
+    queries = []
+    for _ in range(count):
+        words = [rng.choice(vocabulary[:50])]
+        words += [rng.choice(vocabulary[:1000]) for _ in range(length - 1)]
+        queries.append(" ".join(words))
+    return queries
+
+
+def time_queries(run, queries) -> float:
+    """Retourne le temps moyen par requête, en millisecondes."""
+    start = time.perf_counter()
+    for query in queries:
+        run(query)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--length", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--scorer", default="bm25")
+    args = parser.parse_args()
+
+    vocabulary_size = 5000
+    documents = generate_corpus(args.documents, args.length, vocabulary_size)
+    index = InvertedIndex()
+    index.build_index(documents)
+    del documents
+    engine = SearchEngine(index, args.scorer)
+
+    print(f"Corpus : {args.documents} documents, classement {args.scorer}")
+    print(f"{'termes':>7}{'k':>7}{'exhaustif (ms)':>17}{'top-k (ms)':>13}{'accélération':>15}")
+    for length in (1, 2, 4, 8):
+        queries = make_queries(args.queries, length, vocabulary_size)
+        # Préchauffage : bornes par terme et normalisations calculées une fois par version
+        for query in queries:
+            engine.search(query, use_all_terms=False, top_k=10)
+        exhaustive = time_queries(lambda q: engine.search(q, use_all_terms=False), queries)
+        for k in (1, 10, 100, 1000):
+            top_k = time_queries(lambda q: engine.search(q, use_all_terms=False, top_k=k), queries)
+            print(f"{length:>7}{k:>7}{exhaustive:>17.2f}{top_k:>13.2f}{exhaustive / top_k:>14.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Générateur de corpus synthétiques pour les benchmarks.
+
+Les mots sont tirés selon une distribution de Zipf afin de reproduire la
+répartition des fréquences d'un vrai corpus (quelques mots très fréquents,
+une longue traîne de mots rares).
+
+generate_corpus construit tout le corpus en mémoire ; SyntheticCorpus génère
+chaque document à la demande, pour les corpus d'un million de documents.
+"""
+
+import random
+from collections.abc import Mapping
+from typing import Dict, Iterator, List
+
+
+def make_vocabulary(size: int) -> List[str]:
+    """
+    Construit un vocabulaire déterministe de mots artificiels.
+
+    Args :
+        size : Nombre de mots distincts
+
+    Returns :
+        Liste de mots, du plus fréquent au plus rare
+    """
+    syllables = ["ba", "de", "ki", "lo", "mu", "na", "po", "ri", "sa", "tu", "vo", "ze"]
+    vocabulary = []
+    for rank in range(size):
+        word = ""
+        n = rank
+        while True:
+            word += syllables[n % len(syllables)]
+            n //= len(syllables)
+            if n == 0:
+                break
+        vocabulary.append(word)
+    return vocabulary
+
+
+def zipf_cumulative_weights(vocabulary_size: int, exponent: float) -> List[float]:
+    """Retourne les poids cumulés de la loi de Zipf sur les rangs 1 à vocabulary_size."""
+    cumulative = []
+    total = 0.0
+    for rank in range(1, vocabulary_size + 1):
+        total += 1.0 / (rank ** exponent)
+        cumulative.append(total)
+    return cumulative
+
+
+def generate_corpus(num_documents: int, document_length: int = 200,
+                    vocabulary_size: int = 5000, exponent: float = 1.1,
+                    seed: int = 42) -> Dict[str, str]:
+    """
+    Génère un corpus synthétique dont les fréquences suivent une loi de Zipf.
+
+    Args :
+        num_documents : Nombre de documents à générer
+        document_length : Nombre moyen de mots par document
+        vocabulary_size : Nombre de mots distincts
+        exponent : Exposant de la loi de Zipf
+        seed : Graine du générateur aléatoire (corpus reproductible)
+
+    Returns :
+        Dictionnaire associant les identifiants de documents à leur contenu brut
+    """
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(vocabulary_size)
+    cumulative = zipf_cumulative_weights(vocabulary_size, exponent)
+
+    documents = {}
+    for i in range(num_documents):
+        length = max(1, int(rng.gauss(document_length, document_length / 4)))
+        words = rng.choices(vocabulary, cum_weights=cumulative, k=length)
+        # Un peu de ponctuation pour exercer la tokenisation
+        for j in range(9, length, 10):
+            words[j] += rng.choice([",", ".", ";", "!"])
+        documents[f"doc_{i:07d}.txt"] = " ".join(words)
+    return documents
+
+
+class SyntheticCorpus(Mapping):
+    """
+    Corpus synthétique de Zipf dont chaque document est généré à la demande.
+
+    Le contenu d'un document ne dépend que de la graine et de son numéro : le
+    corpus se parcourt sans être gardé en mémoire, et un document se relit à
+    l'identique (pour les extraits, par exemple).
+    """
+
+    def __init__(self, num_documents: int, document_length: int = 200,
+                 vocabulary_size: int = 5000, exponent: float = 1.1, seed: int = 42):
+        """
+        Initialise le corpus.
+
+        Args :
+            num_documents : Nombre de documents
+            document_length : Nombre moyen de mots par document
+            vocabulary_size : Nombre de mots distincts
+            exponent : Exposant de la loi de Zipf
+            seed : Graine du générateur aléatoire (corpus reproductible)
+        """
+        self.num_documents = num_documents
+        self.document_length = document_length
+        self.seed = seed
+        self.vocabulary = make_vocabulary(vocabulary_size)
+        self._cumulative = zipf_cumulative_weights(vocabulary_size, exponent)
+
+    @staticmethod
+    def doc_id(number: int) -> str:
+        """Retourne l'identifiant du document portant le numéro donné."""
+        return f"doc_{number:07d}.txt"
+
+    def words(self, number: int) -> List[str]:
+        """Génère les mots du document portant le numéro donné, ponctuation comprise."""
+        rng = random.Random(self.seed * 1_000_003 + number)
+        length = max(1, int(rng.gauss(self.document_length, self.document_length / 4)))
+        words = rng.choices(self.vocabulary, cum_weights=self._cumulative, k=length)
+        # Un peu de ponctuation pour exercer la tokenisation
+        for j in range(9, length, 10):
+            words[j] += rng.choice([",", ".", ";", "!"])
+        return words
+
+    def _number(self, doc_id) -> int:
+        if (not isinstance(doc_id, str) or not doc_id.startswith("doc_") or not doc_id.endswith(".txt")
+                or not doc_id[4:-4].isdigit()):
+            return -1
+        return int(doc_id[4:-4])
+
+    def __getitem__(self, doc_id: str) -> str:
+        number = self._number(doc_id)
+        if not 0 <= number < self.num_documents:
+            raise KeyError(doc_id)
+        return " ".join(self.words(number))
+
+    def __contains__(self, doc_id) -> bool:
+        return 0 <= self._number(doc_id) < self.num_documents
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.doc_id(number) for number in range(self.num_documents))
+
+    def __len__(self) -> int:
+        return self.num_documents
@@ -0,0 +1,154 @@
+"""
+Module pour garder en mémoire les résultats des requêtes fréquentes.
+
+Ce module fournit des fonctionnalités pour :
+1. Conserver les dernières valeurs calculées dans un cache LRU, borné en nombre
+   d'entrées et en octets, avec une durée de vie optionnelle
+2. Invalider automatiquement le cache lorsque la version de l'index change
+3. Compter les succès, les échecs et les évictions du cache
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estime la mémoire occupée par une valeur mise en cache.
+
+    Les listes, tuples et dictionnaires sont parcourus récursivement ; les
+    autres objets sont comptés avec sys.getsizeof.
+
+    Args :
+        value : La valeur à mesurer
+
+    Returns :
+        Taille approximative en octets
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(estimate_size(key) + estimate_size(item) for key, item in value.items())
+    return size
+
+
+class LRUCache:
+    """
+    Cache LRU borné en nombre d'entrées et en octets, invalidé par version.
+
+    Chaque lecture et chaque écriture indiquent la version de l'index pour
+    laquelle la valeur est valable : dès qu'une version différente est vue,
+    tout le cache est vidé.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024,
+                 ttl: Optional[float] = None):
+        """
+        Initialise un cache vide.
+
+        Args :
+            max_entries : Nombre maximal d'entrées (0 pour désactiver le cache)
+            max_bytes : Taille maximale estimée des valeurs, en octets
+            ttl : Durée de vie d'une entrée en secondes (None pour illimitée)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # clé -> (valeur, taille, date d'expiration)
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, version: int, default: Any = None) -> Any:
+        """
+        Retourne la valeur associée à une clé, si elle est encore valable.
+
+        Args :
+            key : La clé recherchée
+            version : Version actuelle de l'index
+            default : Valeur retournée en cas d'échec
+
+        Returns :
+            La valeur en cache, ou default
+        """
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, version: int):
+        """
+        Ajoute ou remplace une valeur, en évinçant les entrées les moins récemment utilisées.
+
+        Une valeur plus grande que la taille maximale du cache n'est pas conservée.
+
+        Args :
+            key : La clé
+            value : La valeur à conserver
+            version : Version de l'index pour laquelle la valeur a été calculée
+        """
+        if self.max_entries <= 0:
+            return
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._check_version(version)
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        """Vide le cache, sans remettre les compteurs à zéro."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retourne les compteurs du cache.
+
+        Returns :
+            Dictionnaire avec les succès, les échecs, les évictions, le nombre d'entrées et la taille
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
+
+    def _check_version(self, version: int):
+        if version != self._version:
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,101 @@
+"""
+Module d'encodage compact des entiers pour l'index inversé.
+
+Ce module fournit des fonctionnalités pour :
+1. Encoder des entiers positifs en octets variables (varint / variable-byte)
+2. Encoder des listes d'entiers croissants sous forme d'écarts (delta-encoding)
+3. Décoder ces représentations depuis n'importe quel tampon d'octets (bytes, mmap)
+
+Quand tous les écarts d'une liste tiennent sur un octet, l'encodage et le
+décodage se font en une opération sur la liste entière plutôt qu'entier par entier.
+"""
+
+from itertools import accumulate, chain
+from operator import sub
+from typing import List, Sequence, Tuple
+
+# Octets terminant un entier (bit de poids fort à 0) : un bloc dont il ne reste
+# rien une fois ces octets retirés ne contient que des entiers d'un octet
+_SINGLE_BYTES = bytes(range(0x80))
+
+
+def encode_varint(value: int, out: bytearray):
+    """
+    Ajoute un entier positif encodé en octets variables à un tampon.
+
+    Chaque octet porte 7 bits de la valeur ; le bit de poids fort indique
+    qu'un autre octet suit.
+
+    Args :
+        value : Entier positif ou nul à encoder
+        out : Tampon auquel ajouter les octets
+    """
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(buffer, pos: int) -> Tuple[int, int]:
+    """
+    Décode un entier encodé en octets variables.
+
+    Args :
+        buffer : Tampon d'octets (bytes, bytearray ou mmap)
+        pos : Position du premier octet de l'entier
+
+    Returns :
+        Tuple (valeur décodée, position suivant l'entier)
+    """
+    result = 0
+    shift = 0
+    while True:
+        byte = buffer[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_deltas(values: Sequence[int], out: bytearray):
+    """
+    Ajoute une liste d'entiers croissants encodée par écarts successifs.
+
+    Args :
+        values : Entiers triés par ordre croissant
+        out : Tampon auquel ajouter les octets
+    """
+    gaps = list(map(sub, values, chain((0,), values)))
+    if not gaps:
+        return
+    if max(gaps) < 0x80:
+        out += bytes(gaps)
+        return
+    for gap in gaps:
+        encode_varint(gap, out)
+
+
+def decode_deltas(buffer, pos: int, count: int) -> Tuple[List[int], int]:
+    """
+    Décode une liste d'entiers encodée par écarts successifs.
+
+    Args :
+        buffer : Tampon d'octets (bytes, bytearray ou mmap)
+        pos : Position du premier écart
+        count : Nombre d'entiers à décoder
+
+    Returns :
+        Tuple (liste des entiers, position suivant le dernier écart)
+    """
+    chunk = buffer[pos:pos + count]
+    if len(chunk) == count and not chunk.translate(None, _SINGLE_BYTES):
+        # Aucun octet de continuation : chaque octet est un écart
+        return list(accumulate(chunk)), pos + count
+    values = []
+    value = 0
+    for _ in range(count):
+        gap, pos = decode_varint(buffer, pos)
+        value += gap
+        values.append(value)
+    return values, pos
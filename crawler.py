@@ -0,0 +1,277 @@
+"""
+Module de parcours des répertoires de documents.
+
+Ce module fournit des fonctionnalités pour :
+1. Parcourir récursivement un répertoire avec os.scandir, en retenant les fichiers
+   selon des motifs d'inclusion et d'exclusion (glob)
+2. Lire les fichiers texte (.txt, .md), éventuellement compressés (.gz, .bz2)
+3. Détecter l'encodage des fichiers (marque d'ordre des octets, UTF-8, puis
+   Windows-1252 ou Latin-1) et écarter les fichiers binaires
+4. Lire les fichiers sur un pool de threads, la lecture et la décompression se
+   faisant pendant que le fichier précédent est indexé
+5. Rassembler les erreurs de lecture dans un rapport plutôt que de les afficher
+"""
+
+import bz2
+import codecs
+import gzip
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Sequence, Tuple
+
+# Extensions des documents texte reconnus, éventuellement suivies d'une extension de compression
+TEXT_EXTENSIONS = ('.txt', '.md')
+COMPRESSED_OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+}
+
+# Motifs retenus par défaut : tous les documents texte, compressés ou non
+DEFAULT_INCLUDE = tuple(f"*{extension}{compression}" for extension in TEXT_EXTENSIONS
+                        for compression in ('',) + tuple(COMPRESSED_OPENERS))
+# Fichiers et dossiers cachés (.git, fichier d'index...) ignorés par défaut
+DEFAULT_EXCLUDE = ('.*',)
+
+# Nombre de threads de lecture par défaut, et nombre de fichiers confiés à la fois à un thread
+READ_THREADS = 4
+READ_CHUNK_SIZE = 32
+
+# Marques d'ordre des octets, les plus longues d'abord (UTF-32 LE commence comme UTF-16 LE)
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Taille du début de fichier examiné pour reconnaître un fichier binaire
+_BINARY_PROBE = 8192
+
+
+class CrawlError(NamedTuple):
+    """Erreur de lecture d'un fichier ou d'un dossier : identifiant, type et message de l'erreur."""
+    doc_id: str
+    error: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.doc_id} : {self.message} ({self.error})"
+
+
+class CrawlReport:
+    """Bilan d'un parcours : fichiers lus, octets lus et erreurs rencontrées."""
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.errors: List[CrawlError] = []
+
+    def add_error(self, doc_id: str, error: Exception):
+        """Enregistre l'erreur de lecture d'un fichier."""
+        self.errors.append(CrawlError(doc_id, type(error).__name__, str(error)))
+
+    def __str__(self) -> str:
+        return f"{self.files} fichier(s) lu(s), {self.bytes} octet(s), {len(self.errors)} erreur(s)"
+
+
+def matches(path: str, name: str, patterns: Sequence[str]) -> bool:
+    """Indique si un chemin relatif, ou son seul nom, correspond à l'un des motifs glob."""
+    return any(fnmatchcase(name, pattern) or fnmatchcase(path, pattern) for pattern in patterns)
+
+
+def iter_files(root: str, include: Sequence[str] = DEFAULT_INCLUDE, exclude: Sequence[str] = DEFAULT_EXCLUDE,
+               errors: List[CrawlError] = None) -> Iterator[Tuple[str, os.DirEntry]]:
+    """
+    Parcourt récursivement les fichiers d'un répertoire, dans l'ordre des noms.
+
+    Un motif est comparé au nom du fichier et à son chemin relatif (avec des
+    /) ; un dossier exclu n'est pas parcouru. Les liens symboliques vers des
+    dossiers ne sont pas suivis. Un sous-dossier illisible ou un fichier dont
+    le type ne peut être lu est ignoré et signalé dans errors, un dossier
+    l'étant par son chemin relatif suivi d'un /.
+
+    Args :
+        root : Répertoire à parcourir
+        include : Motifs des fichiers retenus
+        exclude : Motifs des fichiers et dossiers ignorés
+        errors : Liste à compléter avec les dossiers et fichiers inaccessibles, ou None
+
+    Returns :
+        Itérateur de tuples (id_doc, entrée os.scandir), l'identifiant étant le
+        chemin relatif du fichier
+
+    Raises :
+        FileNotFoundError : Si le répertoire n'existe pas
+        OSError : Si le répertoire lui-même ne peut être lu
+    """
+    if not os.path.isdir(root):
+        raise FileNotFoundError(f"Répertoire introuvable : {root}")
+    pending = [("", root)]
+    while pending:
+        prefix, directory = pending.pop()
+        try:
+            with os.scandir(directory) as scanned:
+                entries = sorted(scanned, key=lambda entry: entry.name)
+        except OSError as e:
+            if not prefix:
+                raise
+            if errors is not None:
+                errors.append(CrawlError(prefix, type(e).__name__, str(e)))
+            continue
+        subdirectories = []
+        for entry in entries:
+            doc_id = prefix + entry.name
+            if exclude and matches(doc_id, entry.name, exclude):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append((doc_id + "/", entry.path))
+                elif entry.is_file() and matches(doc_id, entry.name, include):
+                    yield doc_id, entry
+            except OSError as e:
+                if errors is not None:
+                    errors.append(CrawlError(doc_id, type(e).__name__, str(e)))
+        # Les sous-dossiers sont parcourus après les fichiers, dans l'ordre des noms
+        pending.extend(reversed(subdirectories))
+
+
+def decode_text(data: bytes) -> str:
+    """
+    Décode le contenu d'un fichier texte en détectant son encodage.
+
+    Une marque d'ordre des octets désigne l'encodage (UTF-8, UTF-16, UTF-32) ;
+    sinon le texte est décodé en UTF-8, puis en Windows-1252 et enfin en
+    Latin-1, qui accepte n'importe quels octets.
+
+    Args :
+        data : Contenu brut du fichier
+
+    Returns :
+        Le texte décodé
+
+    Raises :
+        ValueError : Si le fichier semble binaire (octets nuls sans marque d'ordre des octets)
+    """
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return data.decode(encoding)
+    if b"\x00" in data[:_BINARY_PROBE]:
+        raise ValueError("fichier binaire")
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        pass
+    try:
+        return data.decode('cp1252')
+    except UnicodeDecodeError:
+        return data.decode('latin-1')
+
+
+def read_bytes(path: str) -> bytes:
+    """Lit le contenu brut d'un fichier, décompressé selon son extension."""
+    opener = COMPRESSED_OPENERS.get(os.path.splitext(path)[1], open)
+    with opener(path, 'rb') as file:
+        return file.read()
+
+
+def read_document(path: str) -> str:
+    """
+    Lit un document texte, décompressé et décodé.
+
+    Args :
+        path : Chemin du fichier
+
+    Returns :
+        Le contenu du document
+    """
+    return decode_text(read_bytes(path))
+
+
+def map_in_threads(function: Callable, items: Iterable, workers: int = READ_THREADS,
+                   chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Tuple]:
+    """
+    Applique une fonction à chaque élément sur un pool de threads, dans l'ordre des éléments.
+
+    Les éléments sont confiés aux threads par paquets de chunk_size, pour que
+    le coût de chaque tâche ne dépasse pas celui de la lecture d'un petit
+    fichier. Seuls quelques paquets sont traités d'avance : les éléments sont
+    lus au fil de l'eau et les résultats ne s'accumulent pas en mémoire.
+
+    Args :
+        function : Fonction à appliquer (une lecture de fichier, par exemple)
+        items : Éléments à traiter
+        workers : Nombre de threads (1 pour tout traiter dans le thread appelant)
+        chunk_size : Nombre d'éléments par tâche
+
+    Returns :
+        Itérateur de tuples (élément, résultat, exception), l'exception étant None
+        si la fonction a réussi
+    """
+    if workers <= 1:
+        for item in items:
+            yield _apply(function, item)
+        return
+
+    def apply_chunk(chunk: List) -> List[Tuple]:
+        return [_apply(function, item) for item in chunk]
+
+    max_pending = workers * 2
+    pending = deque()
+    chunk = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crawler") as executor:
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                pending.append(executor.submit(apply_chunk, chunk))
+                chunk = []
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+        if chunk:
+            pending.append(executor.submit(apply_chunk, chunk))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _apply(function: Callable, item) -> Tuple:
+    try:
+        return item, function(item), None
+    except Exception as e:
+        return item, None, e
+
+
+def crawl(root: str, include: Sequence[str] = DEFAULT_INCLUDE, exclude: Sequence[str] = DEFAULT_EXCLUDE,
+          workers: int = READ_THREADS, report: CrawlReport = None) -> Iterator[Tuple[str, str]]:
+    """
+    Parcourt récursivement un répertoire et lit ses documents sur un pool de threads.
+
+    Les dossiers inaccessibles (voir iter_files) sont signalés dans le bilan
+    comme les fichiers illisibles.
+
+    Args :
+        root : Répertoire à parcourir
+        include : Motifs des fichiers retenus
+        exclude : Motifs des fichiers et dossiers ignorés
+        workers : Nombre de threads de lecture
+        report : Bilan à compléter (fichiers lus, erreurs), ou None
+
+    Returns :
+        Itérateur de tuples (id_doc, contenu), dans l'ordre du parcours
+    """
+    def read(file: Tuple[str, os.DirEntry]) -> Tuple[int, str]:
+        data = read_bytes(file[1].path)
+        return len(data), decode_text(data)
+
+    files = iter_files(root, include, exclude, report.errors if report is not None else None)
+    for (doc_id, _), result, error in map_in_threads(read, files, workers):
+        if error is not None:
+            if report is not None:
+                report.add_error(doc_id, error)
+            continue
+        size, content = result
+        if report is not None:
+            report.files += 1
+            report.bytes += size
+        yield doc_id, content
@@ -1,42 +1,143 @@
-import os
-import string
-from typing import List, Dict
-
-def load_documents(directory_path: str) -> Dict[str, str]:
-   documents = {}
-   if not os.path.exists(directory_path):
-        raise FileNotFoundError(f"Répertoire introuvable : {directory_path}")
-   for filename in os.listdir(directory_path):
-      if filename.endswith('.txt'):
-         file_path = os.path.join(directory_path, filename)
-         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-               content = file.read()
-               documents[filename] = content
-         except Exception as e:
-            print(f"Erreur lors du chargement du fichier {filename} : {e}")
-            
-    return documents
-def tokenize(text: str) -> List[str]:
+import sys
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Dict, Sequence, Tuple
+
+import crawler
+from crawler import DEFAULT_EXCLUDE, DEFAULT_INCLUDE, READ_THREADS, CrawlError, CrawlReport
+from tokenizer import DEFAULT_TOKENIZER
+
+
+def list_document_paths(directory_path: str, include: Sequence[str] = DEFAULT_INCLUDE,
+                        exclude: Sequence[str] = DEFAULT_EXCLUDE,
+                        errors: List[CrawlError] = None) -> Dict[str, str]:
     """
-    Découpe le texte en tokens (mots).
+    Liste récursivement les documents d'un répertoire sans les lire.
 
     Args :
-        text : Texte d'entrée à tokeniser
+        directory_path : Répertoire contenant les documents
+        include : Motifs glob des fichiers retenus (.txt et .md, compressés ou non, par défaut)
+        exclude : Motifs glob des fichiers et dossiers ignorés (fichiers cachés par défaut)
+        errors : Liste à compléter avec les dossiers et fichiers inaccessibles, ou None
 
     Returns :
-        Liste de tokens
+        Dictionnaire associant les identifiants de documents (chemins relatifs) au chemin de leur fichier
+    """
+    return {doc_id: entry.path for doc_id, entry in crawler.iter_files(directory_path, include, exclude, errors)}
+
+
+def iter_documents(directory_path: str, include: Sequence[str] = DEFAULT_INCLUDE,
+                   exclude: Sequence[str] = DEFAULT_EXCLUDE, workers: int = READ_THREADS,
+                   report: CrawlReport = None) -> Iterator[Tuple[str, str]]:
+    """
+    Parcourt les documents d'un répertoire un par un, sans les garder en mémoire.
+
+    Les fichiers sont lus d'avance sur un pool de threads (voir crawler.crawl).
+
+    Args :
+        directory_path : Répertoire contenant les documents
+        include : Motifs glob des fichiers retenus
+        exclude : Motifs glob des fichiers et dossiers ignorés
+        workers : Nombre de threads de lecture
+        report : Bilan à compléter avec les fichiers lus et les erreurs ; si None,
+                 les erreurs sont écrites sur la sortie d'erreur à la fin du parcours
+
+    Returns :
+        Itérateur de tuples (id_doc, contenu brut)
+    """
+    own_report = report is None
+    if own_report:
+        report = CrawlReport()
+    yield from crawler.crawl(directory_path, include, exclude, workers, report)
+    if own_report:
+        for error in report.errors:
+            print(f"Erreur lors du chargement du fichier {error}", file=sys.stderr)
+
+
+def iter_document_batches(documents: Iterable[Tuple[str, str]], batch_size: int) -> Iterator[List[Tuple[str, str]]]:
+    """
+    Regroupe un flux de documents en lots de taille bornée.
+
+    Args :
+        documents : Flux de tuples (id_doc, contenu brut)
+        batch_size : Nombre maximal de documents par lot
+
+    Returns :
+        Itérateur de listes de tuples (id_doc, contenu brut)
     """
-    # Mettre en minuscules
-    text = text.lower()
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_documents(directory_path: str, include: Sequence[str] = DEFAULT_INCLUDE,
+                   exclude: Sequence[str] = DEFAULT_EXCLUDE, workers: int = READ_THREADS,
+                   report: CrawlReport = None) -> Dict[str, str]:
+    return dict(iter_documents(directory_path, include, exclude, workers, report))
 
-    # Supprimer la ponctuation
-    text = text.translate(str.maketrans('', '', string.punctuation))
 
-    # Découper en mots
-    tokens = text.split()
+class DocumentStore(Mapping):
+    """
+    Collection de documents lus à la demande depuis leurs fichiers.
+
+    Se comporte comme le dictionnaire retourné par load_documents, mais seuls
+    les noms des fichiers sont gardés en mémoire : le contenu d'un document
+    est relu lorsqu'il est demandé (pour un extrait, par exemple), et les
+    derniers documents lus sont gardés dans un petit cache.
+    """
 
-    return tokens
+    def __init__(self, directory_path: str, cache_size: int = 32, include: Sequence[str] = DEFAULT_INCLUDE,
+                 exclude: Sequence[str] = DEFAULT_EXCLUDE):
+        """
+        Initialise avec le répertoire contenant les documents.
+
+        Args :
+            directory_path : Répertoire contenant les documents
+            cache_size : Nombre de documents récemment lus gardés en mémoire
+            include : Motifs glob des fichiers retenus
+            exclude : Motifs glob des fichiers et dossiers ignorés
+        """
+        self.directory_path = directory_path
+        self.errors: List[CrawlError] = []  # dossiers et fichiers inaccessibles lors du listage
+        self.paths = list_document_paths(directory_path, include, exclude, self.errors)
+        self._read = lru_cache(maxsize=cache_size)(self._read_file)
+
+    def _read_file(self, doc_id: str) -> str:
+        try:
+            return crawler.read_document(self.paths[doc_id])
+        except (OSError, EOFError, ValueError) as e:
+            raise KeyError(doc_id) from e
+
+    def __getitem__(self, doc_id: str) -> str:
+        if doc_id not in self.paths:
+            raise KeyError(doc_id)
+        return self._read(doc_id)
+
+    def __contains__(self, doc_id) -> bool:
+        return doc_id in self.paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+def tokenize(text: str) -> List[str]:
+    """
+    Découpe le texte en tokens (mots) avec le tokeniseur par défaut.
+
+    Args :
+        text : Texte d'entrée à tokeniser
+
+    Returns :
+        Liste de tokens
+    """
+    return DEFAULT_TOKENIZER.tokenize(text)
 
 def preprocess_documents(documents: Dict[str, str]) -> Dict[str, List[str]]:
     """
@@ -56,6 +157,19 @@ def preprocess_documents(documents: Dict[str, str]) -> Dict[str, List[str]]:
 
     return preprocessed_docs
 
+def get_document_token_positions(content: str) -> Tuple[Dict[str, List[int]], int]:
+    """
+    Tokenise un document en une seule passe et regroupe les positions de chaque token.
+
+    Args :
+        content : Contenu brut du document
+
+    Returns :
+        Tuple (dictionnaire token -> positions, nombre total de tokens du document)
+    """
+    positions, offsets = DEFAULT_TOKENIZER.analyze(content)
+    return positions, len(offsets)
+
 def get_token_positions(documents: Dict[str, str]) -> Dict[str, Dict[str, List[int]]]:
     """
     Récupère les positions de chaque token dans chaque document.
@@ -69,31 +183,6 @@ def get_token_positions(documents: Dict[str, str]) -> Dict[str, Dict[str, List[i
     token_positions = {}
 
     for doc_id, content in documents.items():
-        # Mettre en minuscules
-        content = content.lower()
-
-        # Supprimer la ponctuation
-        content = content.translate(str.maketrans('', '', string.punctuation))
-
-        # Découper en mots et suivre les positions
-        tokens = content.split()
-        positions = {}
-
-        for position, token in enumerate(tokens):
-            if token not in positions:
-                positions[token] = []
-            positions[token].append(position)
-
-        token_positions[doc_id] = positions
+        token_positions[doc_id], _ = get_document_token_positions(content)
 
     return token_positions
-
-
-
-   
-   
-
-
-
-    
-   
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""
+Module de recherche approchée des termes, tolérante aux fautes de frappe.
+
+Ce module fournit des fonctionnalités pour :
+1. Calculer une distance d'édition bornée entre deux mots (insertions, suppressions,
+   substitutions et inversions de deux lettres voisines), abandonnée dès qu'elle
+   dépasse la borne
+2. Précalculer, pour chaque terme du vocabulaire, les variantes obtenues en retirant
+   jusqu'à k lettres (suppression symétrique, comme SymSpell)
+3. Retrouver les termes à distance au plus k d'un mot en ne générant que les
+   variantes du mot : seuls les termes partageant une variante sont comparés
+"""
+
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+# Distance d'édition maximale des recherches approchées par défaut
+MAX_DISTANCE = 2
+
+# Seules les premières lettres des termes sont retenues pour les variantes :
+# le nombre de variantes d'un long terme reste borné
+PREFIX_LENGTH = 7
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Calcule la distance d'édition entre deux mots, bornée.
+
+    Distance de Damerau-Levenshtein restreinte : une inversion de deux
+    lettres voisines (chien -> cihen) compte pour une seule modification.
+
+    Args :
+        a : Premier mot
+        b : Second mot
+        max_distance : Distance au-delà de laquelle le calcul est abandonné
+
+    Returns :
+        La distance, ou max_distance + 1 si elle dépasse max_distance
+    """
+    if a == b:
+        return 0
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > max_distance:
+        return max_distance + 1
+    # Le début et la fin communs ne changent pas la distance
+    start = 0
+    while start < len(a) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a = a[start:len(a) - end]
+    b = b[start:len(b) - end]
+    if not a:
+        return len(b) if len(b) <= max_distance else max_distance + 1
+
+    width = len(b)
+    before_previous = None
+    previous = list(range(width + 1))
+    for i in range(1, len(a) + 1):
+        char_a = a[i - 1]
+        current = [i] * (width + 1)
+        row_min = i
+        for j in range(1, width + 1):
+            char_b = b[j - 1]
+            value = previous[j - 1] + (char_a != char_b)
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if (i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b
+                    and before_previous[j - 2] + 1 < value):
+                value = before_previous[j - 2] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return max_distance + 1
+        before_previous, previous = previous, current
+    distance = previous[width]
+    return distance if distance <= max_distance else max_distance + 1
+
+
+def deletes(word: str, max_distance: int) -> Set[str]:
+    """
+    Retourne les variantes d'un mot privé de 0 à max_distance lettres.
+
+    Args :
+        word : Le mot
+        max_distance : Nombre maximal de lettres retirées
+
+    Returns :
+        Ensemble des variantes, le mot lui-même compris
+    """
+    variants = {word}
+    level = {word}
+    for _ in range(max_distance):
+        level = {variant[:i] + variant[i + 1:] for variant in level for i in range(len(variant))}
+        variants |= level
+    return variants
+
+
+class FuzzyIndex:
+    """
+    Index des variantes par suppression des termes du vocabulaire.
+
+    Deux mots à distance au plus k ont une variante commune obtenue en
+    retirant au plus k lettres de chacun : une recherche ne consulte que les
+    termes partageant une variante avec le mot cherché, puis calcule leur
+    distance exacte. Les variantes ne sont calculées que sur les
+    PREFIX_LENGTH premières lettres : les débuts de deux mots à distance au
+    plus k ont encore une variante commune, et le nombre de variantes d'un
+    long terme reste borné.
+    """
+
+    def __init__(self, max_distance: int = MAX_DISTANCE, prefix_length: int = PREFIX_LENGTH):
+        """
+        Initialise un index vide.
+
+        Args :
+            max_distance : Distance maximale des recherches
+            prefix_length : Nombre de premières lettres dont les variantes sont indexées
+        """
+        self.max_distance = max_distance
+        self.prefix_length = max(prefix_length, max_distance + 1)
+        self.terms: List[str] = []  # numéro -> terme
+        self._numbers: Dict[str, int] = {}  # terme -> numéro
+        # variante -> numéro du terme, ou liste des numéros si plusieurs termes la partagent
+        self._deletes: Dict[str, Union[int, List[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._numbers
+
+    def add(self, term: str):
+        """
+        Ajoute un terme à l'index, s'il n'y est pas déjà.
+
+        Args :
+            term : Le terme
+        """
+        if term in self._numbers:
+            return
+        number = len(self.terms)
+        self.terms.append(term)
+        self._numbers[term] = number
+        entries = self._deletes
+        for variant in deletes(term[:self.prefix_length], self.max_distance):
+            entry = entries.get(variant)
+            if entry is None:
+                entries[variant] = number
+            elif isinstance(entry, int):
+                entries[variant] = [entry, number]
+            else:
+                entry.append(number)
+
+    def update(self, terms: Iterable[str]):
+        """Ajoute plusieurs termes à l'index."""
+        for term in terms:
+            self.add(term)
+
+    def lookup(self, word: str, max_distance: int = None) -> List[Tuple[str, int]]:
+        """
+        Retourne les termes à distance d'édition au plus max_distance d'un mot.
+
+        Args :
+            word : Le mot cherché, normalisé comme les termes
+            max_distance : Distance maximale (au plus celle de l'index ; celle de l'index si None)
+
+        Returns :
+            Liste de tuples (terme, distance), triés par distance puis par terme
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        if max_distance > self.max_distance:
+            raise ValueError(f"Distance {max_distance} supérieure à celle de l'index ({self.max_distance})")
+        candidates = set()
+        entries = self._deletes
+        for variant in deletes(word[:self.prefix_length], max_distance):
+            entry = entries.get(variant)
+            if entry is None:
+                continue
+            if isinstance(entry, int):
+                candidates.add(entry)
+            else:
+                candidates.update(entry)
+
+        matches = []
+        terms = self.terms
+        for number in candidates:
+            term = terms[number]
+            if abs(len(term) - len(word)) > max_distance:
+                continue
+            distance = edit_distance(word, term, max_distance)
+            if distance <= max_distance:
+                matches.append((term, distance))
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches
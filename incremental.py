@@ -0,0 +1,205 @@
+"""
+Module pour mettre à jour l'index de façon incrémentale.
+
+Ce module fournit des fonctionnalités pour :
+1. Mémoriser l'état de chaque fichier indexé (date de modification, taille, empreinte du contenu)
+2. Détecter les fichiers ajoutés, modifiés et supprimés d'un répertoire et de ses
+   sous-répertoires, les fichiers modifiés étant lus sur un pool de threads
+3. Ne réindexer que les documents concernés, les documents supprimés étant marqués
+   puis compactés en arrière-plan
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import crawler
+import metrics
+from crawler import DEFAULT_EXCLUDE, DEFAULT_INCLUDE, READ_THREADS, CrawlError
+from indexer import InvertedIndex
+from tokenizer import Tokenizer
+
+
+def manifest_path_for(index_path: str) -> str:
+    """Retourne le chemin du manifeste associé à un fichier d'index."""
+    return f"{index_path}.manifest.json"
+
+
+def content_digest(data: bytes) -> str:
+    """Calcule l'empreinte du contenu d'un fichier."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ChangeSet:
+    """Résumé des changements appliqués à l'index lors d'une mise à jour."""
+
+    def __init__(self):
+        self.added: List[str] = []
+        self.modified: List[str] = []
+        self.deleted: List[str] = []
+        self.errors: List[CrawlError] = []  # fichiers et dossiers illisibles, ignorés
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.deleted)
+
+    def __str__(self) -> str:
+        summary = (f"{len(self.added)} ajouté(s), {len(self.modified)} modifié(s), "
+                   f"{len(self.deleted)} supprimé(s)")
+        if self.errors:
+            summary += f", {len(self.errors)} illisible(s)"
+        return summary
+
+
+class IncrementalIndexer:
+    """Classe pour maintenir un index inversé synchronisé avec un répertoire."""
+
+    def __init__(self, directory_path: str, index: InvertedIndex = None,
+                 manifest: Dict[str, Tuple[float, int, str]] = None, workers: int = 1,
+                 tokenizer: Tokenizer = None, include: Sequence[str] = DEFAULT_INCLUDE,
+                 exclude: Sequence[str] = DEFAULT_EXCLUDE, read_threads: int = READ_THREADS):
+        """
+        Initialise avec un répertoire et, éventuellement, un index existant.
+
+        Args :
+            directory_path : Répertoire contenant les documents à indexer
+            index : L'index inversé à mettre à jour (un index vide par défaut)
+            manifest : État des fichiers déjà indexés, id_doc -> (date, taille, empreinte)
+            workers : Nombre de processus utilisés pour indexer les documents modifiés
+            tokenizer : Tokeniseur d'un nouvel index (ignoré si index est fourni)
+            include : Motifs glob des fichiers indexés
+            exclude : Motifs glob des fichiers et dossiers ignorés
+            read_threads : Nombre de threads lisant les fichiers modifiés
+        """
+        self.directory_path = directory_path
+        self.index = index if index is not None else InvertedIndex(tokenizer)
+        self.manifest = dict(manifest) if manifest else {}
+        self.workers = workers
+        self.include = include
+        self.exclude = exclude
+        self.read_threads = read_threads
+
+    @classmethod
+    def open(cls, directory_path: str, index_path: str, workers: int = 1,
+             tokenizer: Tokenizer = None, include: Sequence[str] = DEFAULT_INCLUDE,
+             exclude: Sequence[str] = DEFAULT_EXCLUDE) -> 'IncrementalIndexer':
+        """
+        Ouvre l'index enregistré d'un répertoire avec son manifeste.
+
+        Si l'index ou son manifeste est absent ou illisible, ou si l'index a été
+        construit avec un autre tokeniseur que celui demandé, un index vide est
+        utilisé : la prochaine mise à jour réindexera alors tout le répertoire.
+
+        Args :
+            directory_path : Répertoire contenant les documents
+            index_path : Chemin du fichier d'index
+            workers : Nombre de processus utilisés pour indexer les documents modifiés
+            tokenizer : Tokeniseur souhaité (None pour garder celui de l'index enregistré)
+            include : Motifs glob des fichiers indexés
+            exclude : Motifs glob des fichiers et dossiers ignorés
+
+        Returns :
+            L'indexeur incrémental prêt à être mis à jour
+        """
+        try:
+            with open(manifest_path_for(index_path), "r", encoding="utf-8") as file:
+                manifest = {doc_id: tuple(state) for doc_id, state in json.load(file).items()}
+            index = InvertedIndex.load(index_path)
+        except (OSError, ValueError):
+            return cls(directory_path, workers=workers, tokenizer=tokenizer, include=include, exclude=exclude)
+        if tokenizer is not None and index.tokenizer != tokenizer:
+            index.close()
+            return cls(directory_path, workers=workers, tokenizer=tokenizer, include=include, exclude=exclude)
+        return cls(directory_path, index, manifest, workers, include=include, exclude=exclude)
+
+    @metrics.timed("refresh")
+    def refresh(self, background_compaction: bool = True) -> ChangeSet:
+        """
+        Met à jour l'index avec les fichiers ajoutés, modifiés ou supprimés.
+
+        La date et la taille d'un fichier sont comparées en premier ; le
+        contenu n'est relu et comparé par empreinte que si elles ont changé.
+        Un fichier ou un dossier illisible est ignoré et signalé dans les
+        erreurs du résultat ; les documents déjà indexés qu'il contient restent
+        dans l'index.
+
+        Args :
+            background_compaction : Si True, les postings des documents supprimés
+                                    ou remplacés sont compactés dans un thread
+
+        Returns :
+            Les changements appliqués à l'index
+        """
+        if not os.path.exists(self.directory_path):
+            raise FileNotFoundError(f"Répertoire introuvable : {self.directory_path}")
+
+        changes = ChangeSet()
+        seen = set()
+        # Les documents modifiés sont lus au fil de l'indexation, sans garder le corpus en mémoire
+        self.index.build_index_from_stream(self._changed_documents(changes, seen), self.workers)
+
+        # Les documents inaccessibles, ou dans un dossier illisible, ne sont pas considérés comme supprimés
+        seen.update(error.doc_id for error in changes.errors)
+        unreadable = tuple(error.doc_id for error in changes.errors if error.doc_id.endswith("/"))
+        for doc_id in list(self.manifest):
+            if doc_id not in seen and not doc_id.startswith(unreadable):
+                del self.manifest[doc_id]
+                self.index.remove_document(doc_id)
+                changes.deleted.append(doc_id)
+
+        if background_compaction and self.index.has_tombstones():
+            self.index.compact_in_background()
+        return changes
+
+    def _changed_documents(self, changes: ChangeSet, seen: set) -> Iterator[Tuple[str, str]]:
+        """
+        Parcourt le répertoire et produit les documents ajoutés ou modifiés.
+
+        Le manifeste, les changements et l'ensemble des fichiers vus sont mis à
+        jour au fil du parcours.
+        """
+        def candidates() -> Iterator[Tuple[str, str, os.stat_result, Tuple]]:
+            for doc_id, entry in crawler.iter_files(self.directory_path, self.include, self.exclude,
+                                                    changes.errors):
+                seen.add(doc_id)
+                try:
+                    stat = entry.stat()
+                except OSError as e:
+                    changes.errors.append(CrawlError(doc_id, type(e).__name__, str(e)))
+                    continue
+                previous = self.manifest.get(doc_id)
+                if previous is not None and previous[0] == stat.st_mtime and previous[1] == stat.st_size:
+                    continue
+                yield doc_id, entry.path, stat, previous
+
+        def read(candidate: Tuple) -> Tuple[str, str]:
+            # L'empreinte porte sur le contenu décompressé, avant décodage
+            data = crawler.read_bytes(candidate[1])
+            return content_digest(data), crawler.decode_text(data)
+
+        for (doc_id, _, stat, previous), result, error in crawler.map_in_threads(read, candidates(),
+                                                                                 self.read_threads):
+            if error is not None:
+                changes.errors.append(CrawlError(doc_id, type(error).__name__, str(error)))
+                continue
+            digest, content = result
+            self.manifest[doc_id] = (stat.st_mtime, stat.st_size, digest)
+            if previous is not None and previous[2] == digest:
+                # Fichier touché sans changement de contenu
+                continue
+            (changes.modified if previous is not None else changes.added).append(doc_id)
+            yield doc_id, content
+
+    def save(self, index_path: str):
+        """
+        Enregistre l'index et le manifeste des fichiers indexés.
+
+        Args :
+            index_path : Chemin du fichier d'index
+        """
+        self.index.save(index_path)
+        manifest_path = manifest_path_for(index_path)
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.manifest, file)
+        os.replace(tmp_path, manifest_path)
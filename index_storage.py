@@ -0,0 +1,445 @@
+"""
+Module pour enregistrer et recharger l'index inversé dans un fichier binaire compact.
+
+Ce module fournit des fonctionnalités pour :
+1. Écrire l'index dans un fichier (dictionnaire des termes trié, postings et positions
+   encodés par écarts, table des longueurs de documents)
+2. Ouvrir ce fichier par projection mémoire (mmap) pour un démarrage quasi instantané
+3. Décoder paresseusement les postings d'un terme uniquement lorsqu'il est consulté
+4. Lire la position dans le texte d'une fenêtre de tokens d'un document, sans lire les autres
+
+Format du fichier (entiers en little-endian) :
+    en-tête      : signature, version, nombre de documents, nombre de termes, positions des sections
+    tokeniseur   : paramètres du tokeniseur de l'index, en JSON
+    documents    : pour chaque document, nom, longueur, position et taille de son vecteur de termes,
+                   position de ses décalages de tokens
+    termes       : table à taille fixe (position du terme, taille, position des postings, nb de documents,
+                   nb d'occurrences)
+    octets       : les termes encodés en UTF-8, triés par ordre des octets
+    postings     : pour chaque terme, écarts des numéros de documents, nombre cumulé de positions
+                   avant chaque document (par écarts), premier document et octets par écart de
+                   chaque bloc, puis positions encodées comme dans PostingsList (recopiées telles quelles)
+    vecteurs     : pour chaque document, (écart de numéro de terme, fréquence)
+    décalages    : pour chaque document, début de chaque token dans le texte (entiers de 32 bits)
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import MutableMapping, Sequence
+from typing import Dict, Iterator, List, Tuple
+
+import metrics
+from codec import decode_deltas, decode_varint, encode_deltas, encode_varint
+from postings import PostingsList
+from term_dictionary import TermDictionary
+
+INDEX_FILENAME = ".textindexer.idx"
+
+MAGIC = b"TXIDX\x00"
+FORMAT_VERSION = 5
+
+SIGNATURE = struct.Struct("<6sH")
+HEADER = struct.Struct("<6sHIIQQQQQQ")
+TERM_ENTRY = struct.Struct("<QIQII")
+
+
+def write_index(path: str, index) -> None:
+    """
+    Enregistre un index inversé dans un fichier binaire.
+
+    Le fichier est d'abord écrit à côté de sa destination puis renommé, afin
+    qu'un index déjà présent ne soit jamais laissé à moitié écrit. Les documents
+    sont renumérotés de façon contiguë, dans l'ordre de leurs numéros actuels.
+
+    Args :
+        path : Chemin du fichier d'index
+        index : L'index inversé à enregistrer, compacté (sans documents supprimés en attente)
+    """
+    doc_names = []
+    doc_numbers = {}
+    for number, doc_id in enumerate(index.doc_names):
+        if doc_id is not None and index.doc_numbers.get(doc_id) == number:
+            doc_numbers[number] = len(doc_names)
+            doc_names.append(doc_id)
+
+    encoded_terms = sorted((term.encode("utf-8"), term) for term in index.index)
+    term_numbers = {term: number for number, (_, term) in enumerate(encoded_terms)}
+
+    # Postings et table des termes
+    term_table = bytearray()
+    term_bytes = bytearray()
+    postings = bytearray()
+    for raw_term, term in encoded_terms:
+        term_postings = index.index[term]
+        term_table += TERM_ENTRY.pack(len(term_bytes), len(raw_term), len(postings), len(term_postings),
+                                      term_postings.offsets[-1])
+        term_bytes += raw_term
+        encode_deltas([doc_numbers[number] for number in term_postings.doc_ids], postings)
+        encode_deltas(term_postings.offsets[1:], postings)
+        blocks, widths, positions = term_postings.encoded_positions()
+        encode_varint(len(blocks), postings)
+        encode_deltas(blocks, postings)
+        postings += widths
+        encode_varint(len(positions), postings)
+        postings += positions
+
+    # Vecteurs de termes par document et table des documents
+    doc_table = bytearray()
+    forward = bytearray()
+    token_offsets = bytearray()
+    for number, doc_id in zip(doc_numbers, doc_names):
+        term_freqs = sorted((term_numbers[term], freq)
+                            for term, freq in index.term_frequencies.get(doc_id, {}).items())
+        raw_name = doc_id.encode("utf-8")
+        encode_varint(len(raw_name), doc_table)
+        doc_table += raw_name
+        encode_varint(index.document_lengths[doc_id], doc_table)
+        encode_varint(len(forward), doc_table)
+        encode_varint(len(term_freqs), doc_table)
+        encode_varint(len(token_offsets), doc_table)
+        offsets = index.document_token_offsets(number)
+        if sys.byteorder != "little":
+            offsets = array("I", offsets)
+            offsets.byteswap()
+        token_offsets += offsets.tobytes()
+        previous = 0
+        for term_number, freq in term_freqs:
+            encode_varint(term_number - previous, forward)
+            encode_varint(freq, forward)
+            previous = term_number
+
+    tokenizer_config = json.dumps(index.tokenizer.config()).encode("utf-8")
+    doc_table_offset = HEADER.size + len(tokenizer_config)
+    term_table_offset = doc_table_offset + len(doc_table)
+    term_bytes_offset = term_table_offset + len(term_table)
+    postings_offset = term_bytes_offset + len(term_bytes)
+    forward_offset = postings_offset + len(postings)
+    token_offsets_offset = forward_offset + len(forward)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(doc_names), len(encoded_terms),
+                         doc_table_offset, term_table_offset, term_bytes_offset,
+                         postings_offset, forward_offset, token_offsets_offset)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        for section in (header, tokenizer_config, doc_table, term_table, term_bytes, postings, forward, token_offsets):
+            file.write(section)
+    os.replace(tmp_path, path)
+
+
+class IndexStorage:
+    """Fichier d'index ouvert par projection mémoire."""
+
+    def __init__(self, path: str):
+        """
+        Ouvre un fichier d'index et lit son en-tête et sa table des documents.
+
+        Args :
+            path : Chemin du fichier d'index
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # La signature et la version sont vérifiées avant de lire le reste de
+        # l'en-tête, dont la taille dépend de la version
+        magic, version = SIGNATURE.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Fichier d'index invalide : {path}")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Version de fichier d'index non prise en charge : {version}")
+        (_, _, self.num_documents, self.num_terms, doc_table_offset,
+         self._term_table_offset, self._term_bytes_offset, self._postings_offset,
+         self._forward_offset, self._token_offsets_offset) = HEADER.unpack_from(self._mmap, 0)
+
+        self.tokenizer_config = json.loads(self._mmap[HEADER.size:doc_table_offset].decode("utf-8"))
+        self.doc_names: List[str] = []
+        self.document_lengths: Dict[str, int] = {}
+        self._forward_entries: Dict[str, Tuple[int, int]] = {}
+        self._token_offsets_positions: List[int] = []
+        pos = doc_table_offset
+        for _ in range(self.num_documents):
+            name_length, pos = decode_varint(self._mmap, pos)
+            doc_id = self._mmap[pos:pos + name_length].decode("utf-8")
+            pos += name_length
+            length, pos = decode_varint(self._mmap, pos)
+            forward_position, pos = decode_varint(self._mmap, pos)
+            count, pos = decode_varint(self._mmap, pos)
+            token_offsets_position, pos = decode_varint(self._mmap, pos)
+            self.doc_names.append(doc_id)
+            self._token_offsets_positions.append(token_offsets_position)
+            self.document_lengths[doc_id] = length
+            self._forward_entries[doc_id] = (forward_position, count)
+
+    def close(self):
+        """Ferme la projection mémoire et le fichier sous-jacent."""
+        self._mmap.close()
+        self._file.close()
+
+    def has_document(self, doc_id: str) -> bool:
+        """Indique si le document figure dans le fichier d'index."""
+        return doc_id in self._forward_entries
+
+    def term_at(self, number: int) -> str:
+        """Retourne le terme portant le numéro donné dans le dictionnaire trié."""
+        start, length, _, _, _ = TERM_ENTRY.unpack_from(
+            self._mmap, self._term_table_offset + number * TERM_ENTRY.size)
+        start += self._term_bytes_offset
+        return self._mmap[start:start + length].decode("utf-8")
+
+    def term_document_frequency(self, term: str) -> int:
+        """Retourne le nombre de documents d'un terme, lu dans la table des termes (0 s'il est absent)."""
+        number = self.find_term(term)
+        if number < 0:
+            return 0
+        return TERM_ENTRY.unpack_from(self._mmap, self._term_table_offset + number * TERM_ENTRY.size)[3]
+
+    def terms(self) -> 'StoredTerms':
+        """Retourne la suite triée des termes du fichier, lus à la demande."""
+        return StoredTerms(self)
+
+    def collection_statistics(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        Lit les statistiques de chaque terme dans la table des termes, sans décoder de postings.
+
+        Returns :
+            Tuple (mot -> nombre total d'occurrences, mot -> nombre de documents)
+        """
+        collection_frequencies = {}
+        document_frequencies = {}
+        term_bytes_offset = self._term_bytes_offset
+        term_table = self._mmap[self._term_table_offset:self._term_table_offset + self.num_terms * TERM_ENTRY.size]
+        for start, length, _, count, occurrences in TERM_ENTRY.iter_unpack(term_table):
+            start += term_bytes_offset
+            term = self._mmap[start:start + length].decode("utf-8")
+            collection_frequencies[term] = occurrences
+            document_frequencies[term] = count
+        return collection_frequencies, document_frequencies
+
+    def find_term(self, term: str) -> int:
+        """
+        Recherche un terme par dichotomie dans le dictionnaire trié.
+
+        Args :
+            term : Le terme recherché
+
+        Returns :
+            Le numéro du terme, ou -1 s'il est absent
+        """
+        raw_term = term.encode("utf-8")
+        low, high = 0, self.num_terms
+        while low < high:
+            middle = (low + high) // 2
+            start, length, _, _, _ = TERM_ENTRY.unpack_from(
+                self._mmap, self._term_table_offset + middle * TERM_ENTRY.size)
+            start += self._term_bytes_offset
+            candidate = self._mmap[start:start + length]
+            if candidate < raw_term:
+                low = middle + 1
+            elif candidate > raw_term:
+                high = middle
+            else:
+                return middle
+        return -1
+
+    def postings_at(self, number: int) -> PostingsList:
+        """
+        Décode la liste des postings du terme portant le numéro donné.
+
+        Les positions restent encodées : leurs octets sont recopiés tels quels.
+
+        Returns :
+            Les postings du terme, numérotés comme doc_names
+        """
+        _, _, pos, count, _ = TERM_ENTRY.unpack_from(
+            self._mmap, self._term_table_offset + number * TERM_ENTRY.size)
+        pos += self._postings_offset
+        start = pos
+        doc_ids, pos = decode_deltas(self._mmap, pos, count)
+        offsets, pos = decode_deltas(self._mmap, pos, count)
+        num_blocks, pos = decode_varint(self._mmap, pos)
+        blocks, pos = decode_deltas(self._mmap, pos, num_blocks)
+        widths = self._mmap[pos:pos + num_blocks]
+        pos += num_blocks
+        size, pos = decode_varint(self._mmap, pos)
+        if metrics.ENABLED:
+            metrics.increment("index_file_bytes_read", pos + size - start)
+        return PostingsList.from_encoded(array("I", doc_ids), array("I", [0] + offsets), array("I", blocks),
+                                         widths, self._mmap[pos:pos + size])
+
+    def token_offsets_at(self, number: int, start: int, stop: int) -> array:
+        """
+        Lit le début dans le texte des tokens start à stop - 1 d'un document.
+
+        Seule la fenêtre demandée est lue : les décalages sont des entiers de
+        taille fixe, à une position calculable directement.
+
+        Args :
+            number : Numéro du document dans le fichier
+            start : Position du premier token de la fenêtre
+            stop : Position suivant le dernier token de la fenêtre
+
+        Returns :
+            Tableau des décalages en caractères, un par token
+        """
+        stop = min(stop, self.document_lengths[self.doc_names[number]])
+        offsets = array("I")
+        if start < stop:
+            pos = self._token_offsets_offset + self._token_offsets_positions[number]
+            offsets.frombytes(self._mmap[pos + 4 * start:pos + 4 * stop])
+            if sys.byteorder != "little":
+                offsets.byteswap()
+        return offsets
+
+    def term_frequencies_of(self, doc_id: str) -> Dict[str, int]:
+        """
+        Décode le vecteur de termes d'un document.
+
+        Returns :
+            Dictionnaire associant chaque terme du document à sa fréquence
+        """
+        pos, count = self._forward_entries[doc_id]
+        pos += self._forward_offset
+        term_freqs = {}
+        term_number = 0
+        for _ in range(count):
+            gap, pos = decode_varint(self._mmap, pos)
+            term_number += gap
+            freq, pos = decode_varint(self._mmap, pos)
+            term_freqs[self.term_at(term_number)] = freq
+        return term_freqs
+
+
+class StoredTerms(Sequence):
+    """Termes d'un fichier d'index, triés, décodés un par un à l'accès (pour la dichotomie)."""
+
+    def __init__(self, storage: IndexStorage):
+        self._storage = storage
+
+    def __len__(self) -> int:
+        return self._storage.num_terms
+
+    def __getitem__(self, number: int) -> str:
+        if not 0 <= number < self._storage.num_terms:
+            raise IndexError(number)
+        return self._storage.term_at(number)
+
+
+class DiskPostings(MutableMapping):
+    """
+    Dictionnaire mot -> PostingsList adossé à un fichier d'index.
+
+    Les postings d'un terme sont décodés au premier accès puis conservés en
+    mémoire, ce qui permet aussi de les modifier (ajout, compactage).
+    """
+
+    def __init__(self, storage: IndexStorage):
+        self._storage = storage
+        self._decoded: Dict[str, PostingsList] = {}
+        self._added = set()  # termes absents du fichier
+        self._removed = set()  # termes du fichier supprimés depuis le chargement
+
+    def __getitem__(self, term: str) -> PostingsList:
+        postings = self._decoded.get(term)
+        if postings is None:
+            if term in self._removed:
+                raise KeyError(term)
+            number = self._storage.find_term(term)
+            if number < 0:
+                raise KeyError(term)
+            postings = self._decoded[term] = self._storage.postings_at(number)
+        return postings
+
+    def __setitem__(self, term: str, postings: PostingsList):
+        if term in self._removed:
+            self._removed.discard(term)
+        elif term not in self._decoded and self._storage.find_term(term) < 0:
+            self._added.add(term)
+        self._decoded[term] = postings
+
+    def __delitem__(self, term: str):
+        if term not in self:
+            raise KeyError(term)
+        self._decoded.pop(term, None)
+        if term in self._added:
+            self._added.discard(term)
+        else:
+            self._removed.add(term)
+
+    def __contains__(self, term) -> bool:
+        if term in self._decoded:
+            return True
+        return term not in self._removed and self._storage.find_term(term) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        for number in range(self._storage.num_terms):
+            term = self._storage.term_at(number)
+            if term not in self._removed:
+                yield term
+        yield from sorted(self._added)
+
+    def __len__(self) -> int:
+        return self._storage.num_terms - len(self._removed) + len(self._added)
+
+    def decoded_items(self) -> Iterator[Tuple[str, PostingsList]]:
+        """Parcourt uniquement les postings déjà décodés et gardés en mémoire."""
+        return iter(self._decoded.items())
+
+    def term_dictionary(self) -> TermDictionary:
+        """Retourne le dictionnaire trié des termes, sans lire tous les termes du fichier."""
+        return TermDictionary([self._storage.terms(), sorted(self._added)], set(self._removed))
+
+
+class DiskTermFrequencies(MutableMapping):
+    """
+    Dictionnaire id_doc -> {mot -> fréquence} adossé à un fichier d'index.
+
+    Les vecteurs de termes sont décodés à chaque accès ; seuls les documents
+    ajoutés ou remplacés après le chargement sont gardés en mémoire.
+    """
+
+    def __init__(self, storage: IndexStorage):
+        self._storage = storage
+        self._overlay: Dict[str, Dict[str, int]] = {}
+        self._deleted = set()  # documents du fichier supprimés depuis le chargement
+
+    def __getitem__(self, doc_id: str) -> Dict[str, int]:
+        term_freqs = self._overlay.get(doc_id)
+        if term_freqs is not None:
+            return term_freqs
+        if doc_id in self._deleted or not self._storage.has_document(doc_id):
+            raise KeyError(doc_id)
+        return self._storage.term_frequencies_of(doc_id)
+
+    def __setitem__(self, doc_id: str, term_freqs: Dict[str, int]):
+        self._deleted.discard(doc_id)
+        self._overlay[doc_id] = term_freqs
+
+    def __delitem__(self, doc_id: str):
+        if doc_id not in self:
+            raise KeyError(doc_id)
+        self._overlay.pop(doc_id, None)
+        if self._storage.has_document(doc_id):
+            self._deleted.add(doc_id)
+
+    def __contains__(self, doc_id) -> bool:
+        if doc_id in self._overlay:
+            return True
+        return doc_id not in self._deleted and self._storage.has_document(doc_id)
+
+    def __iter__(self) -> Iterator[str]:
+        for doc_id in self._storage.doc_names:
+            if doc_id not in self._deleted:
+                yield doc_id
+        for doc_id in self._overlay:
+            if not self._storage.has_document(doc_id):
+                yield doc_id
+
+    def __len__(self) -> int:
+        added = sum(1 for doc_id in self._overlay if not self._storage.has_document(doc_id))
+        return self._storage.num_documents - len(self._deleted) + added
@@ -1,88 +1,680 @@
-"""
-Module pour construire un index inversé à partir de documents prétraités.
-
-Ce module fournit des fonctionnalités pour :
-1. Construire un index inversé (mot -> liste de documents et positions)
-2. Calculer la fréquence des termes (TF) pour chaque mot dans chaque document
-"""
-
-from typing import Dict, List, Tuple
-import document_loader
-
-
-class InvertedIndex:
-    """Classe représentant un index inversé pour la recherche de documents."""
-
-    def __init__(self):
-        """Initialise un index inversé vide."""
-        self.index = {}  # mot -> [(id_doc, [positions])]
-        self.document_lengths = {}  # id_doc -> nombre de tokens
-        self.term_frequencies = {}  # id_doc -> {mot -> fréquence}
-
-    def build_index(self, documents: Dict[str, str]):
-        """
-        Construit l'index inversé à partir d'une collection de documents.
-
-        Args :
-            documents : Dictionnaire associant les identifiants de documents à leur contenu brut
-        """
-        # Récupérer les positions des tokens pour tous les documents
-        token_positions = document_loader.get_token_positions(documents)
-
-        # Calculer la longueur des documents
-        preprocessed_docs = document_loader.preprocess_documents(documents)
-        for doc_id, tokens in preprocessed_docs.items():
-            self.document_lengths[doc_id] = len(tokens)
-
-        # Construire l'index inversé
-        for doc_id, positions_dict in token_positions.items():
-            # Initialiser les fréquences des termes pour ce document
-            self.term_frequencies[doc_id] = {}
-
-            for token, positions in positions_dict.items():
-                # Mettre à jour la fréquence du terme
-                self.term_frequencies[doc_id][token] = len(positions)
-
-                # Mettre à jour l'index inversé
-                if token not in self.index:
-                    self.index[token] = []
-                self.index[token].append((doc_id, positions))
-
-    def get_documents_for_term(self, term: str) -> List[Tuple[str, List[int]]]:
-        """
-        Récupère tous les documents contenant le terme spécifié.
-
-        Args :
-            term : Le terme à rechercher
-
-        Returns :
-            Liste de tuples (id_doc, positions) pour les documents contenant le terme
-        """
-        term = term.lower()  # Normaliser le terme
-        return self.index.get(term, [])
-
-    def get_term_frequency(self, term: str, doc_id: str) -> int:
-        """
-        Récupère la fréquence d'un terme dans un document spécifique.
-
-        Args :
-            term : Le terme dont on veut la fréquence
-            doc_id : L'identifiant du document
-
-        Returns :
-            La fréquence du terme dans le document
-        """
-        term = term.lower()  # Normaliser le terme
-        return self.term_frequencies.get(doc_id, {}).get(term, 0)
-
-    def get_document_length(self, doc_id: str) -> int:
-        """
-        Récupère la longueur (nombre de tokens) d'un document.
-
-        Args :
-            doc_id : L'identifiant du document
-
-        Returns :
-            Le nombre de tokens dans le document
-        """
-        return self.document_lengths.get(doc_id, 0)
\ No newline at end of file
+"""
+Module pour construire un index inversé à partir de documents prétraités.
+
+Ce module fournit des fonctionnalités pour :
+1. Construire un index inversé (mot -> liste de documents et positions)
+2. Calculer la fréquence des termes (TF) pour chaque mot dans chaque document
+3. Mettre à jour l'index document par document (ajout, remplacement, suppression)
+4. Construire l'index en parallèle sur plusieurs processus puis fusionner les segments
+5. Conserver le début de chaque token dans le texte, pour extraire des passages sans retokeniser
+
+Les documents sont numérotés en interne : les postings ne stockent que ces
+numéros (dans des tableaux compacts, voir postings.py) et la table doc_names
+fait la correspondance avec les identifiants de documents.
+"""
+
+import gc
+import heapq
+import itertools
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import Dict, Iterable, List, Tuple
+import document_loader
+import index_storage
+import metrics
+from fuzzy import FuzzyIndex
+from postings import PostingsList
+from term_dictionary import MAX_EXPANSIONS, TermDictionary
+from tokenizer import DEFAULT_TOKENIZER, Tokenizer
+
+
+# Nombre de segments confiés à chaque processus, pour équilibrer la charge
+SEGMENTS_PER_WORKER = 4
+
+# Taille des lots de documents envoyés aux processus lors d'une construction en flux
+STREAM_BATCH_SIZE = 256
+
+Segment = Tuple[List[Tuple[str, PostingsList]], List[str], Dict[str, int], Dict[str, Dict[str, int]], List[array]]
+
+
+@contextmanager
+def gc_paused():
+    """
+    Suspend le ramasse-miettes cyclique pendant une construction en masse.
+
+    L'index ne crée que des listes et des tuples sans cycles ; sans cette
+    pause, le ramasse-miettes reparcourt sans cesse les millions d'objets déjà
+    créés et peut multiplier le temps de construction (ou de désérialisation
+    des segments) par plusieurs fois.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def build_segment(documents: List[Tuple[str, str]], tokenizer: Tokenizer = DEFAULT_TOKENIZER) -> Segment:
+    """
+    Construit un segment d'index partiel pour une partie des documents.
+
+    Cette fonction s'exécute dans un processus de travail : elle retourne des
+    structures simples, transmissibles au processus principal.
+
+    Args :
+        documents : Liste de tuples (id_doc, contenu brut)
+        tokenizer : Tokeniseur de l'index en construction
+
+    Returns :
+        Tuple (liste (mot, postings) triée par mot, table des documents numérotés à partir de 0,
+        longueurs des documents, fréquences des termes, décalages des tokens)
+    """
+    segment = InvertedIndex(tokenizer)
+    with gc_paused():
+        for doc_id, content in documents:
+            segment.add_document(doc_id, content)
+    segment.compact()
+    return (sorted(segment.index.items()), segment.doc_names, segment.document_lengths,
+            segment.term_frequencies, segment.token_offsets)
+
+
+class InvertedIndex:
+    """Classe représentant un index inversé pour la recherche de documents."""
+
+    def __init__(self, tokenizer: Tokenizer = None):
+        """
+        Initialise un index inversé vide.
+
+        Args :
+            tokenizer : Découpage et normalisation des documents et des requêtes
+                        (le tokeniseur par défaut si None)
+        """
+        self.tokenizer = tokenizer if tokenizer is not None else DEFAULT_TOKENIZER
+        self.index = {}  # mot -> PostingsList (numéros de documents et positions)
+        self.doc_names = []  # numéro de document -> id_doc (None une fois supprimé et compacté)
+        self.doc_numbers = {}  # id_doc -> numéro de sa version actuelle
+        self.document_lengths = {}  # id_doc -> nombre de tokens
+        self.term_frequencies = {}  # id_doc -> {mot -> fréquence}
+        # numéro de document -> début de chaque token dans le texte (None si le
+        # document est supprimé et compacté, ou s'il est lu dans le fichier d'index)
+        self.token_offsets = []
+        self._storage = None  # fichier d'index projeté en mémoire, le cas échéant
+        self.version = 0  # incrémenté à chaque modification des documents indexés
+
+        # Statistiques de la collection (documents actuels seulement), tenues à jour
+        # à chaque ajout ou suppression de document ; pour un index chargé, lues dans
+        # le fichier au premier accès (None jusque-là, voir collection_frequencies)
+        self._collection_frequencies = {}  # mot -> nombre total d'occurrences
+        self._document_frequencies = {}  # mot -> nombre de documents le contenant
+        self.total_tokens = 0  # nombre total de tokens des documents
+
+        # Dictionnaire trié des termes, reconstruit à la demande lorsque des termes
+        # ont été ajoutés ou retirés depuis (voir term_dictionary)
+        self._terms_version = 0
+        self._term_dictionary = None
+        self._term_dictionary_version = -1
+        # Variantes des termes pour la recherche approchée, construites à la première
+        # recherche puis tenues à jour à chaque nouveau terme (voir fuzzy)
+        self._fuzzy_index = None
+
+        # Numéros des documents supprimés ou remplacés dont les postings n'ont pas
+        # encore été retirés, et termes dont les postings contiennent de tels restes
+        self._tombstones = set()
+        self._dirty_terms = set()
+        self._lock = threading.RLock()
+
+    @property
+    def collection_frequencies(self) -> Dict[str, int]:
+        """Nombre total d'occurrences de chaque terme, lu dans le fichier d'index au premier accès."""
+        if self._collection_frequencies is None:
+            self._load_statistics()
+        return self._collection_frequencies
+
+    @property
+    def document_frequencies(self) -> Dict[str, int]:
+        """Nombre de documents de chaque terme, lu dans le fichier d'index au premier accès."""
+        if self._document_frequencies is None:
+            self._load_statistics()
+        return self._document_frequencies
+
+    def _load_statistics(self):
+        """Lit les statistiques de tous les termes dans le fichier d'index chargé."""
+        with self._lock:
+            if self._collection_frequencies is None:
+                collection_frequencies, document_frequencies = self._storage.collection_statistics()
+                self._document_frequencies = document_frequencies
+                self._collection_frequencies = collection_frequencies
+
+    def build_index(self, documents: Dict[str, str], workers: int = 1):
+        """
+        Construit l'index inversé à partir d'une collection de documents.
+
+        Chaque document n'est tokenisé qu'une seule fois : les positions, les
+        fréquences et la longueur sont remplies ensemble par add_document.
+
+        Args :
+            documents : Dictionnaire associant les identifiants de documents à leur contenu brut
+            workers : Nombre de processus à utiliser ; au-delà de 1, les documents sont
+                      répartis en segments construits en parallèle puis fusionnés
+        """
+        workers = max(1, min(workers, len(documents)))
+        batch_size = max(1, -(-len(documents) // (workers * SEGMENTS_PER_WORKER)))
+        self.build_index_from_stream(documents.items(), workers, batch_size)
+
+    @metrics.timed("build_index")
+    def build_index_from_stream(self, documents: Iterable[Tuple[str, str]], workers: int = 1,
+                                batch_size: int = STREAM_BATCH_SIZE):
+        """
+        Construit l'index à partir d'un flux de documents, sans jamais garder tout le corpus.
+
+        Seuls les documents en cours de traitement sont en mémoire : un à la fois
+        en séquentiel, ou quelques lots par processus en parallèle.
+
+        Args :
+            documents : Flux de tuples (id_doc, contenu brut), par exemple document_loader.iter_documents
+            workers : Nombre de processus à utiliser
+            batch_size : Nombre de documents par segment lorsque workers est supérieur à 1
+        """
+        if workers <= 1:
+            with gc_paused():
+                for doc_id, content in documents:
+                    self.add_document(doc_id, content)
+            return
+
+        # Les segments sont gardés dans l'ordre des lots ; le nombre de lots en
+        # cours est borné pour que la lecture ne devance pas trop l'indexation
+        max_pending = workers * 2
+        segments = []
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers) as executor, gc_paused():
+            for batch in document_loader.iter_document_batches(documents, batch_size):
+                pending.append(executor.submit(build_segment, batch, self.tokenizer))
+                if len(pending) >= max_pending:
+                    segments.append(pending.popleft().result())
+            while pending:
+                segments.append(pending.popleft().result())
+            self.merge_segments(segments)
+
+    @metrics.timed("merge_segments")
+    def merge_segments(self, segments: List[Segment]):
+        """
+        Fusionne des segments d'index partiels dans cet index.
+
+        Les listes de mots triées des segments sont fusionnées en k voies : les
+        postings d'un même mot sont concaténés dans l'ordre des segments, ce qui
+        conserve l'ordre des documents.
+
+        Args :
+            segments : Segments produits par build_segment, dans l'ordre des documents
+        """
+        with self._lock:
+            self.version += 1
+            # Renuméroter les documents de chaque segment à la suite de ceux de l'index
+            shifted_terms = []
+            for terms, doc_names, lengths, term_freqs, token_offsets in segments:
+                shift = len(self.doc_names)
+                for number, doc_id in enumerate(doc_names, shift):
+                    if doc_id is None:
+                        continue
+                    if doc_id in self.doc_numbers:
+                        self.remove_document(doc_id)
+                    self.doc_numbers[doc_id] = number
+                self.doc_names.extend(doc_names)
+                self.token_offsets.extend(token_offsets)
+                self.document_lengths.update(lengths)
+                self.term_frequencies.update(term_freqs)
+                self.total_tokens += sum(lengths.values())
+                for doc_term_freqs in term_freqs.values():
+                    self._count_terms(doc_term_freqs)
+                shifted_terms.append([(term, postings, shift) for term, postings in terms])
+
+            merged = heapq.merge(*shifted_terms, key=itemgetter(0))
+            for term, group in itertools.groupby(merged, key=itemgetter(0)):
+                postings = self.index.get(term)
+                if postings is None:
+                    postings = self.index[term] = PostingsList()
+                    self._terms_version += 1
+                    if self._fuzzy_index is not None:
+                        self._fuzzy_index.add(term)
+                for _, segment_postings, shift in group:
+                    postings.extend(segment_postings, shift)
+
+    def add_document(self, doc_id: str, content: str):
+        """
+        Ajoute un document à l'index en une seule passe de tokenisation.
+
+        Si le document est déjà indexé, son ancienne version est remplacée.
+
+        Args :
+            doc_id : L'identifiant du document
+            content : Le contenu brut du document
+        """
+        positions_dict, token_offsets = self.tokenizer.analyze(content)
+
+        with self._lock:
+            if doc_id in self.doc_numbers:
+                self.remove_document(doc_id)
+            self.version += 1
+            number = len(self.doc_names)
+            self.doc_names.append(doc_id)
+            self.token_offsets.append(token_offsets)
+            self.doc_numbers[doc_id] = number
+            self.document_lengths[doc_id] = len(token_offsets)
+            self.total_tokens += len(token_offsets)
+
+            # Initialiser les fréquences des termes pour ce document
+            term_freqs = {}
+            self.term_frequencies[doc_id] = term_freqs
+            collection_frequencies = self.collection_frequencies
+            document_frequencies = self.document_frequencies
+
+            for token, positions in positions_dict.items():
+                # Mettre à jour la fréquence du terme et les statistiques de la collection
+                frequency = len(positions)
+                term_freqs[token] = frequency
+                collection_frequencies[token] = collection_frequencies.get(token, 0) + frequency
+                document_frequencies[token] = document_frequencies.get(token, 0) + 1
+
+                # Mettre à jour l'index inversé
+                postings = self.index.get(token)
+                if postings is None:
+                    postings = self.index[token] = PostingsList()
+                    self._terms_version += 1
+                    if self._fuzzy_index is not None:
+                        self._fuzzy_index.add(token)
+                postings.append(number, positions)
+
+    def remove_document(self, doc_id: str):
+        """
+        Supprime un document de l'index.
+
+        Le document est seulement marqué comme supprimé (pierre tombale) : ses
+        postings sont ignorés par les recherches et retirés plus tard par compact.
+
+        Args :
+            doc_id : L'identifiant du document
+        """
+        with self._lock:
+            number = self.doc_numbers.pop(doc_id, None)
+            if number is None:
+                return
+            self.version += 1
+            term_freqs = self.term_frequencies.pop(doc_id, {})
+            self.total_tokens -= self.document_lengths.pop(doc_id, 0)
+            self._tombstones.add(number)
+            self._dirty_terms.update(term_freqs)
+
+            # Retirer le document des statistiques de la collection
+            collection_frequencies = self.collection_frequencies
+            document_frequencies = self.document_frequencies
+            for term, freq in term_freqs.items():
+                remaining = document_frequencies[term] - 1
+                if remaining:
+                    document_frequencies[term] = remaining
+                    collection_frequencies[term] -= freq
+                else:
+                    del document_frequencies[term]
+                    del collection_frequencies[term]
+
+    def _count_terms(self, term_freqs: Dict[str, int]):
+        """Ajoute les fréquences des termes d'un document aux statistiques de la collection."""
+        collection_frequencies = self.collection_frequencies
+        document_frequencies = self.document_frequencies
+        for term, freq in term_freqs.items():
+            collection_frequencies[term] = collection_frequencies.get(term, 0) + freq
+            document_frequencies[term] = document_frequencies.get(term, 0) + 1
+
+    def has_tombstones(self) -> bool:
+        """Indique si des postings de documents supprimés restent à compacter."""
+        return bool(self._dirty_terms)
+
+    @metrics.timed("compact")
+    def compact(self):
+        """
+        Retire des postings les entrées des documents supprimés ou remplacés.
+
+        Le verrou n'est tenu que le temps de compacter un terme, ce qui permet
+        d'appeler cette méthode depuis un thread pendant que l'index est utilisé.
+        """
+        while True:
+            with self._lock:
+                if not self._dirty_terms:
+                    for number in self._tombstones:
+                        self.doc_names[number] = None
+                        self.token_offsets[number] = None
+                    self._tombstones.clear()
+                    return
+                term = next(iter(self._dirty_terms))
+                postings = self.index.get(term)
+                if postings is not None:
+                    live_postings = self._live_postings(postings)
+                    if live_postings:
+                        self.index[term] = live_postings
+                    else:
+                        del self.index[term]
+                        self._terms_version += 1
+                # Le terme n'est retiré qu'une fois compacté : une lecture sans
+                # verrou ne peut donc jamais voir d'anciens postings non filtrés
+                self._dirty_terms.discard(term)
+
+    def compact_in_background(self) -> threading.Thread:
+        """
+        Lance le compactage de l'index dans un thread d'arrière-plan.
+
+        Returns :
+            Le thread de compactage (déjà démarré)
+        """
+        thread = threading.Thread(target=self.compact, name="index-compaction", daemon=True)
+        thread.start()
+        return thread
+
+    def _live_postings(self, postings: PostingsList) -> PostingsList:
+        """Filtre une liste de postings pour en retirer les documents supprimés ou remplacés."""
+        tombstones = self._tombstones
+        return postings.filter(lambda number: number not in tombstones)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Estime la mémoire occupée par les structures de l'index.
+
+        Pour un index chargé depuis un fichier, seuls les postings déjà décodés
+        sont comptés.
+
+        Returns :
+            Dictionnaire associant chaque structure à sa taille en octets, avec le total
+        """
+        if self._storage is not None:
+            postings_items = self.index.decoded_items()
+        else:
+            postings_items = self.index.items()
+        dictionary = sys.getsizeof(self.index)
+        postings = 0
+        for term, postings_list in postings_items:
+            dictionary += sys.getsizeof(term)
+            postings += postings_list.memory_usage()
+
+        documents = (sys.getsizeof(self.doc_names) + sys.getsizeof(self.doc_numbers)
+                     + sys.getsizeof(self.document_lengths))
+        documents += sum(sys.getsizeof(doc_id) for doc_id in self.doc_numbers)
+
+        token_offsets = sys.getsizeof(self.token_offsets)
+        token_offsets += sum(sys.getsizeof(offsets) for offsets in self.token_offsets if offsets is not None)
+
+        # Statistiques pas encore lues dans le fichier : rien en mémoire
+        statistics = 0
+        if self._collection_frequencies is not None:
+            statistics = sys.getsizeof(self._collection_frequencies) + sys.getsizeof(self._document_frequencies)
+
+        term_frequencies = 0
+        if self._storage is None:
+            term_frequencies = sys.getsizeof(self.term_frequencies)
+            term_frequencies += sum(sys.getsizeof(term_freqs) for term_freqs in self.term_frequencies.values())
+
+        usage = {
+            'dictionary': dictionary,
+            'postings': postings,
+            'documents': documents,
+            'term_frequencies': term_frequencies,
+            'token_offsets': token_offsets,
+            'statistics': statistics,
+        }
+        usage['total'] = sum(usage.values())
+        return usage
+
+    @metrics.timed("save_index")
+    def save(self, path: str):
+        """
+        Enregistre l'index dans un fichier binaire compact.
+
+        Args :
+            path : Chemin du fichier d'index
+        """
+        self.compact()
+        index_storage.write_index(path, self)
+
+    @classmethod
+    @metrics.timed("load_index")
+    def load(cls, path: str) -> 'InvertedIndex':
+        """
+        Charge un index enregistré par save, par projection mémoire.
+
+        Seule la table des documents est lue au chargement ; les postings d'un
+        terme ne sont décodés que lorsqu'ils sont consultés.
+
+        Args :
+            path : Chemin du fichier d'index
+
+        Returns :
+            L'index inversé chargé
+        """
+        storage = index_storage.IndexStorage(path)
+        index = cls(Tokenizer(**storage.tokenizer_config))
+        index._storage = storage
+        index.index = index_storage.DiskPostings(storage)
+        index.term_frequencies = index_storage.DiskTermFrequencies(storage)
+        index.document_lengths = dict(storage.document_lengths)
+        # Statistiques des termes lues à la demande : le chargement ne parcourt pas le vocabulaire
+        index._collection_frequencies = None
+        index._document_frequencies = None
+        index.total_tokens = sum(index.document_lengths.values())
+        index.doc_names = list(storage.doc_names)
+        index.token_offsets = [None] * len(index.doc_names)
+        index.doc_numbers = {doc_id: number for number, doc_id in enumerate(index.doc_names)}
+        return index
+
+    def close(self):
+        """Libère le fichier d'index projeté en mémoire, s'il y en a un."""
+        if self._storage is not None:
+            self._storage.close()
+            self._storage = None
+
+    def get_documents_for_term(self, term: str) -> List[Tuple[str, List[int]]]:
+        """
+        Récupère tous les documents contenant le terme spécifié.
+
+        Args :
+            term : Le terme à rechercher
+
+        Returns :
+            Liste de tuples (id_doc, positions) pour les documents contenant le terme
+        """
+        doc_names = self.doc_names
+        return [(doc_names[number], positions.tolist()) for number, positions in self.get_postings(term)]
+
+    def get_postings(self, term: str) -> PostingsList:
+        """
+        Récupère la liste compacte des postings d'un terme, sans les documents supprimés.
+
+        Args :
+            term : Le terme à rechercher
+
+        Returns :
+            Les postings du terme (numéros de documents et positions) ; voir doc_names
+        """
+        term = self.tokenizer.normalize(term)  # Normaliser le terme comme les documents
+        if term in self._dirty_terms:
+            with self._lock:
+                postings = self.index.get(term)
+                return self._live_postings(postings) if postings is not None else PostingsList()
+        postings = self.index.get(term)
+        if postings is None:
+            return PostingsList()
+        if metrics.ENABLED:
+            metrics.increment("postings_bytes", postings.memory_usage())
+        return postings
+
+    def term_dictionary(self) -> TermDictionary:
+        """
+        Retourne le dictionnaire trié des termes de l'index.
+
+        Il est gardé tant qu'aucun terme n'est ajouté ni retiré ; pour un index
+        chargé, les termes du fichier, déjà triés, ne sont pas relus.
+
+        Returns :
+            Le dictionnaire des termes
+        """
+        with self._lock:
+            if self._term_dictionary_version != self._terms_version:
+                if isinstance(self.index, index_storage.DiskPostings):
+                    self._term_dictionary = self.index.term_dictionary()
+                else:
+                    self._term_dictionary = TermDictionary([sorted(self.index)])
+                self._term_dictionary_version = self._terms_version
+            return self._term_dictionary
+
+    def document_frequency(self, term: str) -> int:
+        """
+        Retourne le nombre de documents contenant un terme.
+
+        Args :
+            term : Le terme, normalisé comme ceux de l'index
+
+        Returns :
+            Le nombre de documents du terme
+        """
+        if self._document_frequencies is None:
+            # Index inchangé depuis son chargement : une dichotomie dans la table des termes suffit
+            return self._storage.term_document_frequency(term)
+        return self._document_frequencies.get(term, 0)
+
+    def vocabulary_size(self) -> int:
+        """Retourne le nombre de termes distincts des documents indexés."""
+        if self._collection_frequencies is None:
+            return self._storage.num_terms
+        return len(self._collection_frequencies)
+
+    def most_frequent_terms(self, limit: int) -> List[Tuple[str, int]]:
+        """
+        Retourne les termes les plus fréquents de la collection, avec un tas borné.
+
+        Args :
+            limit : Nombre maximal de termes à retourner
+
+        Returns :
+            Liste de tuples (mot, nombre d'occurrences) triée par nombre d'occurrences décroissant
+        """
+        with self._lock:
+            return heapq.nlargest(limit, self.collection_frequencies.items(), key=itemgetter(1))
+
+    def expand_terms(self, pattern: str, max_expansions: int = MAX_EXPANSIONS) -> List[str]:
+        """
+        Retourne les termes de l'index correspondant à un motif à jokers (* et ?).
+
+        Si le motif correspond à plus de max_expansions termes, seuls les termes
+        présents dans le plus de documents sont gardés.
+
+        Args :
+            pattern : Motif à jokers, normalisé comme les termes de l'index
+            max_expansions : Nombre maximal de termes retenus
+
+        Returns :
+            Liste triée des termes correspondants
+        """
+        with self._lock:
+            dictionary = self.term_dictionary()
+            return dictionary.expand(pattern, max_expansions, self.document_frequency)
+
+    def fuzzy_terms(self, word: str, max_distance: int, max_expansions: int = MAX_EXPANSIONS) -> List[str]:
+        """
+        Retourne les termes de l'index à distance d'édition au plus max_distance d'un mot.
+
+        L'index des variantes est construit à la première recherche (ou
+        reconstruit pour une distance plus grande) ; les termes retirés
+        depuis sont ignorés.
+
+        Args :
+            word : Le mot, normalisé comme les termes de l'index
+            max_distance : Distance d'édition maximale (fautes de frappe tolérées)
+            max_expansions : Nombre maximal de termes retenus
+
+        Returns :
+            Liste des termes, du plus proche au plus éloigné puis du plus fréquent au plus rare
+        """
+        with self._lock:
+            if self._fuzzy_index is None or self._fuzzy_index.max_distance < max_distance:
+                self._fuzzy_index = FuzzyIndex(max_distance)
+                self._fuzzy_index.update(self.term_dictionary().iter_prefix(""))
+            matches = [(term, distance) for term, distance in self._fuzzy_index.lookup(word, max_distance)
+                       if term in self.index]
+            matches.sort(key=lambda match: (match[1], -self.document_frequency(match[0])))
+            return [term for term, _ in matches[:max_expansions]]
+
+    def get_term_frequency(self, term: str, doc_id: str) -> int:
+        """
+        Récupère la fréquence d'un terme dans un document spécifique.
+
+        Args :
+            term : Le terme dont on veut la fréquence
+            doc_id : L'identifiant du document
+
+        Returns :
+            La fréquence du terme dans le document
+        """
+        term = self.tokenizer.normalize(term)  # Normaliser le terme comme les documents
+        return self.term_frequencies.get(doc_id, {}).get(term, 0)
+
+    def get_document_length(self, doc_id: str) -> int:
+        """
+        Récupère la longueur (nombre de tokens) d'un document.
+
+        Args :
+            doc_id : L'identifiant du document
+
+        Returns :
+            Le nombre de tokens dans le document
+        """
+        return self.document_lengths.get(doc_id, 0)
+
+    def get_positions(self, term: str, doc_id: str) -> array:
+        """
+        Récupère les positions d'un terme dans un document.
+
+        Args :
+            term : Le terme à rechercher
+            doc_id : L'identifiant du document
+
+        Returns :
+            Les positions du terme dans le document, croissantes (vide si absent)
+        """
+        number = self.doc_numbers.get(doc_id)
+        if number is None:
+            return array('I')
+        postings = self.get_postings(term)
+        i = bisect_left(postings.doc_ids, number)
+        if i < len(postings) and postings.doc_ids[i] == number:
+            return postings.positions_at(i)
+        return array('I')
+
+    def get_token_offsets(self, doc_id: str, start: int, stop: int) -> array:
+        """
+        Récupère le début dans le texte d'une fenêtre de tokens d'un document.
+
+        Args :
+            doc_id : L'identifiant du document
+            start : Position du premier token de la fenêtre
+            stop : Position suivant le dernier token de la fenêtre
+
+        Returns :
+            Décalage en caractères du début de chaque token de la fenêtre
+        """
+        number = self.doc_numbers.get(doc_id)
+        if number is None:
+            return array('I')
+        return self._token_offsets_window(number, max(0, start), stop)
+
+    def document_token_offsets(self, number: int) -> array:
+        """Récupère le début dans le texte de tous les tokens du document portant ce numéro."""
+        return self._token_offsets_window(number, 0, self.document_lengths[self.doc_names[number]])
+
+    def _token_offsets_window(self, number: int, start: int, stop: int) -> array:
+        if self._storage is not None and number < self._storage.num_documents:
+            return self._storage.token_offsets_at(number, start, stop)
+        return self.token_offsets[number][start:stop]
@@ -1,107 +1,406 @@
-#!/usr/bin/env python
-"""
-Interface CLI simple pour TextIndexerPy.
-
-Ce module fournit une interface en ligne de commande interactive pour l'application TextIndexerPy,
-permettant de charger des documents, de rechercher des termes et de consulter des statistiques.
-"""
-
-import sys
-
-import document_loader
-from indexer import InvertedIndex
-from retrieval import ResultRetriever
-from stats import Statistics
-
-
-def main():
-    """Fonction principale de l'interface CLI simple."""
-    print("TextIndexerPy : Un outil simple d'indexation et de recherche de texte")
-    print("---------------------------------------------------------------------")
-
-    # Demander le répertoire contenant les documents
-    directory = input("Entrez le chemin du dossier contenant les fichiers texte à indexer : ")
-
-    # Charger les documents
-    try:
-        print(f"Chargement des documents depuis {directory}...")
-        documents = document_loader.load_documents(directory)
-
-        if not documents:
-            print("Aucun fichier texte trouvé dans le dossier spécifié.")
-            return 1
-
-        print(f"{len(documents)} documents chargés.")
-    except Exception as e:
-        print(f"Erreur lors du chargement des documents : {e}")
-        return 1
-
-    # Construire l'index
-    try:
-        print("Construction de l'index inversé...")
-        index = InvertedIndex()
-        index.build_index(documents)
-        print("Index construit avec succès.")
-    except Exception as e:
-        print(f"Erreur lors de la construction de l'index : {e}")
-        return 1
-
-    # Créer les objets statistiques et récupération
-    stats = Statistics(index, documents)
-    retriever = ResultRetriever(index, documents)
-
-    # Afficher les statistiques générales après chargement
-    print("\nDocuments chargés et indexés avec succès.")
-    print(stats.display_general_stats())
-
-    # Boucle principale d'interaction
-    while True:
-        print("\nQue souhaitez-vous faire ?")
-        print("1. Rechercher des termes")
-        print("2. Voir les statistiques générales")
-        print("3. Voir les statistiques d'un document")
-        print("4. Quitter")
-
-        choice = input("Entrez votre choix (1-4) : ")
-
-        if choice == '1':
-            # Fonctionnalité de recherche
-            query = input("Entrez votre requête de recherche : ")
-
-            search_logic = input("Utiliser la logique OU pour la recherche ? (o/n, défaut : ET) : ").lower()
-            use_all_terms = search_logic != 'o'
-            search_mode = "OU" if not use_all_terms else "ET"
-
-            max_results = input("Nombre maximal de résultats à afficher (défaut : 10) : ")
-            max_results = int(max_results) if max_results.isdigit() else 10
-
-            print(f"\nRecherche de '{query}' en mode {search_mode}...")
-            results = retriever.display_results(query, use_all_terms, max_results)
-            print(results)
-            input("\nAppuyez sur Entrée pour continuer...")
-
-        elif choice == '2':
-            # Statistiques générales
-            print("\n" + stats.display_general_stats())
-            print(stats.display_most_frequent_words(10))
-            input("\nAppuyez sur Entrée pour continuer...")
-
-        elif choice == '3':
-            # Statistiques d'un document
-            doc_name = input("Entrez le nom du document : ")
-            print("\n" + stats.display_document_stats(doc_name))
-            input("\nAppuyez sur Entrée pour continuer...")
-
-        elif choice == '4':
-            # Quitter
-            print("Merci d'avoir utilisé TextIndexerPy !")
-            break
-
-        else:
-            print("Choix invalide. Veuillez réessayer.")
-
-    return 0
-
-
-if __name__ == "__main__":
+#!/usr/bin/env python
+"""
+Interface CLI simple pour TextIndexerPy.
+
+Ce module fournit une interface en ligne de commande interactive pour l'application TextIndexerPy,
+permettant de charger des documents, de rechercher des termes et de consulter des statistiques.
+
+Il fournit aussi des sous-commandes non interactives, utilisables dans des scripts :
+    python main_cli.py index dossier/                         construit ou met à jour l'index
+    python main_cli.py search dossier/ "mot-clé" [...]        recherche, résultats en lignes JSON
+    python main_cli.py search dossier/ --queries requetes.txt une requête par ligne (- pour stdin)
+    python main_cli.py stats dossier/ [--document id_doc]     statistiques en JSON
+    python main_cli.py bench dossier/ --queries requetes.txt  mesure des temps de recherche
+
+Avec --metrics fichier.prom, les durées des étapes, les octets de postings lus,
+la mémoire de l'index et les taux de succès des caches sont enregistrés au
+format texte de Prometheus ; avec --profile fichier.prof, la commande est
+profilée avec cProfile (fichier lisible avec python -m pstats).
+
+Sans sous-commande, l'interface interactive est lancée. Les messages des
+sous-commandes sont écrits sur la sortie d'erreur, pour que la sortie standard
+ne contienne que les résultats.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Sequence, TextIO, Tuple
+
+import document_loader
+import index_storage
+import metrics
+from crawler import DEFAULT_EXCLUDE, DEFAULT_INCLUDE
+from incremental import IncrementalIndexer
+from retrieval import ResultRetriever
+from search_engine import SearchEngine
+from stats import Statistics
+from tokenizer import Tokenizer
+
+# Nombre de requêtes lues puis traitées ensemble par search_many
+QUERY_BATCH_SIZE = 1000
+
+
+def interactive():
+    """Fonction principale de l'interface CLI interactive."""
+    print("TextIndexerPy : Un outil simple d'indexation et de recherche de texte")
+    print("---------------------------------------------------------------------")
+
+    # Demander le répertoire contenant les documents
+    directory = input("Entrez le chemin du dossier contenant les fichiers texte à indexer : ")
+
+    # Recenser les documents ; leur contenu n'est lu qu'à la demande
+    try:
+        print(f"Chargement des documents depuis {directory}...")
+        documents = document_loader.DocumentStore(directory)
+
+        if not documents:
+            print("Aucun fichier texte trouvé dans le dossier spécifié.")
+            return 1
+
+        print(f"{len(documents)} documents chargés.")
+    except Exception as e:
+        print(f"Erreur lors du chargement des documents : {e}")
+        return 1
+
+    workers = input("Nombre de processus pour l'indexation (défaut : 1) : ")
+    workers = int(workers) if workers.isdigit() and int(workers) > 0 else 1
+
+    # Recharger l'index enregistré et ne réindexer que les fichiers modifiés
+    index_path = os.path.join(directory, index_storage.INDEX_FILENAME)
+    try:
+        print("Mise à jour de l'index inversé...")
+        updater = IncrementalIndexer.open(directory, index_path, workers)
+        changes = updater.refresh()
+        index = updater.index
+        print(f"Index à jour ({changes}).")
+        for error in changes.errors:
+            print(f"Fichier illisible : {error}")
+        if changes:
+            try:
+                updater.save(index_path)
+            except OSError as e:
+                print(f"Impossible d'enregistrer l'index : {e}")
+    except Exception as e:
+        print(f"Erreur lors de la construction de l'index : {e}")
+        return 1
+
+    # Créer les objets statistiques et récupération
+    stats = Statistics(index, documents)
+    retriever = ResultRetriever(index, documents)
+
+    # Afficher les statistiques générales après chargement
+    print("\nDocuments chargés et indexés avec succès.")
+    print(stats.display_general_stats())
+
+    # Boucle principale d'interaction
+    while True:
+        print("\nQue souhaitez-vous faire ?")
+        print("1. Rechercher des termes")
+        print("2. Voir les statistiques générales")
+        print("3. Voir les statistiques d'un document")
+        print("4. Quitter")
+
+        choice = input("Entrez votre choix (1-4) : ")
+
+        if choice == '1':
+            # Fonctionnalité de recherche
+            print('Syntaxe : mots, "expression exacte", mot1 NEAR/k mot2, préfixe*, r?se')
+            query = input("Entrez votre requête de recherche : ")
+
+            search_logic = input("Utiliser la logique OU pour la recherche ? (o/n, défaut : ET) : ").lower()
+            use_all_terms = search_logic != 'o'
+            search_mode = "OU" if not use_all_terms else "ET"
+
+            max_results = input("Nombre maximal de résultats à afficher (défaut : 10) : ")
+            max_results = int(max_results) if max_results.isdigit() else 10
+
+            typos = input("Nombre de fautes de frappe tolérées par mot (0, 1 ou 2, défaut : 0) : ")
+            retriever.search_engine.fuzzy_distance = int(typos) if typos in ('1', '2') else 0
+
+            print(f"\nRecherche de '{query}' en mode {search_mode}...")
+            results = retriever.display_results(query, use_all_terms, max_results)
+            print(results)
+            input("\nAppuyez sur Entrée pour continuer...")
+
+        elif choice == '2':
+            # Statistiques générales
+            print("\n" + stats.display_general_stats())
+            print(stats.display_most_frequent_words(10))
+            input("\nAppuyez sur Entrée pour continuer...")
+
+        elif choice == '3':
+            # Statistiques d'un document
+            doc_name = input("Entrez le nom du document : ")
+            print("\n" + stats.display_document_stats(doc_name))
+            input("\nAppuyez sur Entrée pour continuer...")
+
+        elif choice == '4':
+            # Quitter
+            print("Merci d'avoir utilisé TextIndexerPy !")
+            break
+
+        else:
+            print("Choix invalide. Veuillez réessayer.")
+
+    return 0
+
+
+def log(message: str):
+    """Écrit un message de progression sur la sortie d'erreur."""
+    print(message, file=sys.stderr)
+
+
+def file_patterns(args) -> Tuple[Sequence[str], Sequence[str]]:
+    """Retourne les motifs des fichiers retenus et ignorés (--include, --exclude) ; les fichiers cachés restent ignorés."""
+    include = [pattern for pattern in (args.include or "").split(",") if pattern] or DEFAULT_INCLUDE
+    exclude = DEFAULT_EXCLUDE + tuple(pattern for pattern in (args.exclude or "").split(",") if pattern)
+    return include, exclude
+
+
+def open_documents(args) -> document_loader.DocumentStore:
+    """Recense les documents du répertoire, avec les mêmes motifs que l'index."""
+    include, exclude = file_patterns(args)
+    return document_loader.DocumentStore(args.directory, include=include, exclude=exclude)
+
+
+def open_index(directory: str, workers: int = 1, tokenizer: Tokenizer = None,
+               include: Sequence[str] = DEFAULT_INCLUDE, exclude: Sequence[str] = DEFAULT_EXCLUDE) -> IncrementalIndexer:
+    """
+    Recharge l'index enregistré d'un répertoire, le met à jour et l'enregistre s'il a changé.
+
+    Args :
+        directory : Répertoire contenant les documents
+        workers : Nombre de processus pour l'indexation
+        tokenizer : Tokeniseur souhaité ; l'index est reconstruit s'il en utilisait un autre
+                    (None pour garder celui de l'index enregistré)
+        include : Motifs glob des fichiers indexés
+        exclude : Motifs glob des fichiers et dossiers ignorés
+
+    Returns :
+        L'indexeur incrémental, avec l'index à jour
+    """
+    index_path = os.path.join(directory, index_storage.INDEX_FILENAME)
+    updater = IncrementalIndexer.open(directory, index_path, workers, tokenizer, include, exclude)
+    start = time.perf_counter()
+    changes = updater.refresh()
+    log(f"Index à jour ({changes}) en {time.perf_counter() - start:.2f} s.")
+    for error in changes.errors:
+        log(f"Fichier illisible : {error}")
+    if changes:
+        try:
+            updater.save(index_path)
+        except OSError as e:
+            log(f"Impossible d'enregistrer l'index : {e}")
+    return updater
+
+
+def write_metrics(args, index, caches: Dict[str, Dict[str, int]] = None):
+    """Enregistre les mesures au format Prometheus dans le fichier --metrics, s'il est indiqué."""
+    if args.metrics is None:
+        return
+    with open(args.metrics, "w", encoding="utf-8") as file:
+        file.write(metrics.METRICS.to_prometheus(index, caches))
+    log(f"Mesures enregistrées dans {args.metrics}.")
+
+
+def read_queries(args) -> Iterator[str]:
+    """Parcourt les requêtes de la ligne de commande, puis celles du fichier --queries (- pour stdin)."""
+    yield from args.query
+    if args.queries is None:
+        return
+    file: TextIO = sys.stdin if args.queries == "-" else open(args.queries, "r", encoding="utf-8")
+    try:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield line
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def command_index(args) -> int:
+    """Sous-commande index : construit ou met à jour l'index d'un répertoire."""
+    stop_words = [language for language in (args.stop_words or "").split(",") if language]
+    tokenizer = Tokenizer(fold_accents=args.fold_accents, stop_words=stop_words, stemmer=args.stemmer)
+    updater = open_index(args.directory, args.workers, tokenizer, *file_patterns(args))
+    index = updater.index
+    index_path = os.path.join(args.directory, index_storage.INDEX_FILENAME)
+    print(json.dumps({
+        "documents": len(index.doc_numbers),
+        "termes": index.vocabulary_size(),
+        "postings": sum(index.document_frequencies.values()),
+        "tokens": index.total_tokens,
+        "fichier_octets": os.path.getsize(index_path) if os.path.exists(index_path) else 0,
+        "tokeniseur": index.tokenizer.config(),
+    }, ensure_ascii=False))
+    write_metrics(args, index)
+    return 0
+
+
+def command_search(args) -> int:
+    """Sous-commande search : une ligne JSON de résultats par requête."""
+    updater = open_index(args.directory, args.workers, None, *file_patterns(args))
+    documents = open_documents(args)
+    retriever = ResultRetriever(updater.index, documents, args.scorer, fuzzy_distance=args.fuzzy)
+    engine = retriever.search_engine
+    use_all_terms = args.mode == "et"
+    top_k = args.k if args.k > 0 else None
+
+    queries = read_queries(args)
+    while True:
+        batch = [query for _, query in zip(range(QUERY_BATCH_SIZE), queries)]
+        if not batch:
+            break
+        parsed_queries = {}
+        results = engine.search_many(batch, use_all_terms, top_k, args.threads, parsed_queries=parsed_queries)
+        lines = []
+        for query, query_results in zip(batch, results):
+            entries = []
+            highlight_terms = parsed_queries[query].highlight_terms() if args.snippets else None
+            for doc_id, score in query_results:
+                entry = {"document": doc_id, "score": score}
+                if highlight_terms is not None:
+                    entry["extrait"] = retriever.get_multi_term_snippet(doc_id, highlight_terms)
+                entries.append(entry)
+            lines.append(json.dumps({"requete": query, "resultats": entries}, ensure_ascii=False))
+        sys.stdout.write("\n".join(lines) + "\n")
+    write_metrics(args, updater.index, retriever.cache_stats())
+    return 0
+
+
+def command_stats(args) -> int:
+    """Sous-commande stats : statistiques générales, ou d'un document, en JSON."""
+    updater = open_index(args.directory, args.workers, None, *file_patterns(args))
+    documents = open_documents(args)
+    stats = Statistics(updater.index, documents)
+    if args.document is not None:
+        if args.document not in updater.index.doc_numbers:
+            log(f"Document '{args.document}' introuvable.")
+            return 1
+        result = {
+            "document": args.document,
+            "mots": updater.index.get_document_length(args.document),
+            "mots_frequents": stats.get_document_most_frequent_words(args.document, args.limit),
+        }
+    else:
+        result = {
+            "documents": stats.get_document_count(),
+            "mots_uniques": stats.get_unique_word_count(),
+            "mots_total": stats.get_total_word_count(),
+            "mots_frequents": stats.get_most_frequent_words(args.limit),
+        }
+    print(json.dumps(result, ensure_ascii=False))
+    write_metrics(args, updater.index)
+    return 0
+
+
+def command_bench(args) -> int:
+    """Sous-commande bench : mesure la latence de chaque requête et le débit."""
+    updater = open_index(args.directory, args.workers, None, *file_patterns(args))
+    queries: List[str] = list(read_queries(args))
+    if not queries:
+        log("Aucune requête à mesurer.")
+        return 1
+    engine = SearchEngine(updater.index, args.scorer, fuzzy_distance=args.fuzzy)
+    use_all_terms = args.mode == "et"
+    top_k = args.k if args.k > 0 else None
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for query in queries:
+            query_start = time.perf_counter()
+            engine.search(query, use_all_terms, top_k)
+            latencies.append(time.perf_counter() - query_start)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    print(json.dumps({
+        "requetes": len(latencies),
+        "secondes": elapsed,
+        "requetes_par_seconde": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+        "max_ms": latencies[-1] * 1000,
+    }))
+    write_metrics(args, updater.index)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construit l'analyseur des arguments et des sous-commandes."""
+    parser = argparse.ArgumentParser(description="TextIndexerPy : indexation et recherche de texte")
+    subparsers = parser.add_subparsers(dest="command")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("directory", help="dossier contenant les fichiers texte à indexer")
+    common.add_argument("--workers", type=int, default=1, help="processus pour l'indexation (défaut : 1)")
+    common.add_argument("--include", help="motifs des fichiers à indexer, séparés par des virgules "
+                                          "(défaut : *.txt, *.md, compressés ou non en .gz et .bz2)")
+    common.add_argument("--exclude", help="motifs des fichiers et dossiers à ignorer, séparés par des virgules "
+                                          "(les fichiers cachés sont toujours ignorés)")
+    common.add_argument("--metrics", metavar="FICHIER",
+                        help="mesure les étapes et enregistre les mesures au format texte de Prometheus")
+    common.add_argument("--profile", metavar="FICHIER",
+                        help="profile la commande avec cProfile et enregistre le profil (python -m pstats FICHIER)")
+
+    querying = argparse.ArgumentParser(add_help=False)
+    querying.add_argument("query", nargs="*", help="requêtes à rechercher")
+    querying.add_argument("--queries", help="fichier contenant une requête par ligne (- pour stdin)")
+    querying.add_argument("--mode", choices=("et", "ou"), default="et", help="logique de recherche (défaut : et)")
+    querying.add_argument("-k", type=int, default=10, help="nombre maximal de résultats par requête (0 pour tous)")
+    querying.add_argument("--scorer", default="bm25", help="frequence, tfidf ou bm25 (défaut : bm25)")
+    querying.add_argument("--fuzzy", type=int, default=0, choices=(0, 1, 2),
+                          help="fautes de frappe tolérées par mot (défaut : 0, recherche exacte)")
+
+    index_parser = subparsers.add_parser("index", parents=[common], help="construit ou met à jour l'index")
+    index_parser.add_argument("--stop-words", help="langues des mots vides à retirer, séparées par des virgules (fr,en)")
+    index_parser.add_argument("--stemmer", choices=("fr", "en"), help="raciniseur léger à appliquer")
+    index_parser.add_argument("--fold-accents", action="store_true", help="ignore les accents (été = ete)")
+    index_parser.set_defaults(handler=command_index)
+
+    search_parser = subparsers.add_parser("search", parents=[common, querying],
+                                          help="recherche des requêtes, résultats en lignes JSON")
+    search_parser.add_argument("--snippets", action="store_true", help="ajoute un extrait à chaque résultat")
+    search_parser.add_argument("--threads", type=int, default=1, help="threads pour les recherches (défaut : 1)")
+    search_parser.set_defaults(handler=command_search)
+
+    stats_parser = subparsers.add_parser("stats", parents=[common], help="statistiques en JSON")
+    stats_parser.add_argument("--document", help="identifiant du document")
+    stats_parser.add_argument("--limit", type=int, default=10, help="nombre de mots les plus fréquents")
+    stats_parser.set_defaults(handler=command_stats)
+
+    bench_parser = subparsers.add_parser("bench", parents=[common, querying], help="mesure les temps de recherche")
+    bench_parser.add_argument("--repeat", type=int, default=1, help="nombre de passages sur les requêtes")
+    bench_parser.set_defaults(handler=command_bench)
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    """Point d'entrée : sous-commande donnée en argument, ou interface interactive."""
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        return interactive()
+    if args.metrics is not None:
+        metrics.enable()
+    try:
+        if args.profile is None:
+            return args.handler(args)
+        with metrics.profiled(args.profile, sys.stderr):
+            status = args.handler(args)
+        log(f"Profil enregistré dans {args.profile}.")
+        return status
+    except (OSError, ValueError) as e:
+        log(f"Erreur : {e}")
+        return 1
+
+
+if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,237 @@
+"""
+Module d'instrumentation de l'indexation et de la recherche.
+
+Ce module fournit des fonctionnalités pour :
+1. Mesurer la durée de chaque étape (construction de l'index, intersection, classement,
+   extraits...) dans des histogrammes à seaux fixes
+2. Compter les octets de postings consultés et lus dans le fichier d'index
+3. Exporter les mesures au format texte de Prometheus, avec la mémoire de l'index et
+   les taux de succès des caches
+4. Profiler une exécution avec cProfile et enregistrer le résultat
+
+Les mesures sont désactivées par défaut : une étape instrumentée ne coûte alors
+qu'un appel de fonction et le test d'un booléen. Les mesures faites dans des
+processus de travail (construction parallèle, search_many avec des processus)
+restent dans ces processus.
+"""
+
+import cProfile
+import functools
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, TextIO
+
+# Bornes supérieures des seaux des histogrammes de durée, en secondes
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Préfixe des noms des mesures exportées
+PREFIX = "textindexer"
+
+# Mesures activées (voir enable) ; lu par chaque étape instrumentée
+ENABLED = False
+
+
+class Histogram:
+    """Histogramme de durées à seaux fixes, avec leur somme et leur nombre."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # le dernier seau reçoit les durées au-delà de la dernière borne
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Ajoute une durée à l'histogramme."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Estime un quantile des durées, par la borne supérieure de son seau.
+
+        Args :
+            q : Le quantile, entre 0 et 1 (0.99 pour le 99e centile)
+
+        Returns :
+            La borne du seau contenant le quantile (la dernière borne s'il est au-delà)
+        """
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank and seen:
+                return bound
+        return self.buckets[-1]
+
+
+class Metrics:
+    """Histogrammes de durée par étape et compteurs, partagés par les threads."""
+
+    def __init__(self):
+        self.histograms: Dict[str, Histogram] = {}  # étape -> durées
+        self.counters: Dict[str, float] = {}  # nom -> valeur cumulée
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        """Enregistre la durée d'une exécution d'une étape."""
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name: str, amount: float = 1):
+        """Ajoute une quantité à un compteur."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        """Remet toutes les mesures à zéro."""
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def summary(self) -> Dict[str, dict]:
+        """
+        Résume les mesures, pour un affichage ou une sortie JSON.
+
+        Returns :
+            Dictionnaire avec, pour chaque étape, le nombre d'exécutions, la durée
+            totale et les durées estimées p50 et p99 (en millisecondes), et la
+            valeur de chaque compteur
+        """
+        with self._lock:
+            stages = {stage: {
+                "appels": histogram.count,
+                "secondes": histogram.sum,
+                "p50_ms": histogram.quantile(0.50) * 1000,
+                "p99_ms": histogram.quantile(0.99) * 1000,
+            } for stage, histogram in sorted(self.histograms.items())}
+            return {"etapes": stages, "compteurs": dict(sorted(self.counters.items()))}
+
+    def to_prometheus(self, index=None, caches: Optional[Dict[str, Dict[str, int]]] = None) -> str:
+        """
+        Exporte les mesures au format texte de Prometheus.
+
+        Args :
+            index : Index inversé dont la mémoire et le nombre de documents sont exportés, ou None
+            caches : Compteurs des caches, nom -> LRUCache.stats() (voir ResultRetriever.cache_stats), ou None
+
+        Returns :
+            Le texte de l'export, une mesure par ligne
+        """
+        lines = []
+        with self._lock:
+            name = f"{PREFIX}_stage_duration_seconds"
+            lines.append(f"# HELP {name} Durée des étapes de l'indexation et de la recherche.")
+            lines.append(f"# TYPE {name} histogram")
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum!r}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+            for counter, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {PREFIX}_{counter}_total counter")
+                lines.append(f"{PREFIX}_{counter}_total {value}")
+
+        if index is not None:
+            name = f"{PREFIX}_index_memory_bytes"
+            lines.append(f"# HELP {name} Mémoire estimée des structures de l'index.")
+            lines.append(f"# TYPE {name} gauge")
+            for part, size in index.memory_usage().items():
+                lines.append(f'{name}{{part="{part}"}} {size}')
+            lines.append(f"# TYPE {PREFIX}_index_documents gauge")
+            lines.append(f"{PREFIX}_index_documents {len(index.doc_numbers)}")
+
+        if caches:
+            for counter in ("hits", "misses", "evictions"):
+                lines.append(f"# TYPE {PREFIX}_cache_{counter}_total counter")
+                for cache, stats in sorted(caches.items()):
+                    lines.append(f'{PREFIX}_cache_{counter}_total{{cache="{cache}"}} {stats[counter]}')
+            lines.append(f"# TYPE {PREFIX}_cache_hit_ratio gauge")
+            for cache, stats in sorted(caches.items()):
+                lookups = stats["hits"] + stats["misses"]
+                ratio = stats["hits"] / lookups if lookups else 0.0
+                lines.append(f'{PREFIX}_cache_hit_ratio{{cache="{cache}"}} {ratio}')
+            lines.append(f"# TYPE {PREFIX}_cache_bytes gauge")
+            for cache, stats in sorted(caches.items()):
+                lines.append(f'{PREFIX}_cache_bytes{{cache="{cache}"}} {stats["bytes"]}')
+        return "\n".join(lines) + "\n"
+
+
+# Mesures du processus
+METRICS = Metrics()
+
+
+def enable():
+    """Active les mesures."""
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    """Désactive les mesures, sans effacer celles déjà faites."""
+    global ENABLED
+    ENABLED = False
+
+
+def increment(name: str, amount: float = 1):
+    """Ajoute une quantité à un compteur du processus, si les mesures sont activées."""
+    if ENABLED:
+        METRICS.increment(name, amount)
+
+
+def timed(stage: str) -> Callable:
+    """
+    Décorateur mesurant la durée de chaque appel d'une fonction.
+
+    Args :
+        stage : Nom de l'étape dans les histogrammes
+
+    Returns :
+        Le décorateur
+    """
+    def decorate(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                METRICS.observe(stage, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def profiled(path: str, report: Optional[TextIO] = None, limit: int = 25):
+    """
+    Profile le bloc avec cProfile et enregistre les statistiques dans un fichier.
+
+    Le fichier se lit avec pstats (python -m pstats fichier) ou tout outil
+    acceptant ce format.
+
+    Args :
+        path : Fichier des statistiques du profil
+        report : Flux où écrire les fonctions les plus coûteuses (durée cumulée), ou None
+        limit : Nombre de fonctions écrites dans report
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        if report is not None:
+            pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(limit)
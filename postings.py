@@ -0,0 +1,433 @@
+"""
+Module pour représenter les listes de postings de façon compacte.
+
+Ce module fournit des fonctionnalités pour :
+1. Stocker les postings d'un mot dans des tableaux d'entiers (array) plutôt que
+   dans des listes de tuples Python
+2. Concaténer les positions de tous les documents dans un seul tampon, encodées
+   par écarts sur 1, 2 ou 4 octets selon le bloc, et décodées à la demande
+3. Intersecter des listes triées de numéros de documents par recherche galopante
+4. Vérifier les expressions exactes et la proximité de termes par fusion linéaire
+   des listes de positions, et retrouver les occurrences d'une expression
+"""
+
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, chain
+from operator import sub
+from typing import Callable, Iterator, List, Sequence, Tuple
+
+# Rapport de tailles au-delà duquel la recherche galopante bat l'intersection d'ensembles
+GALLOP_RATIO = 32
+
+# Nombre maximal de documents par bloc de positions : le début de chaque bloc
+# est noté, et tous les écarts d'un bloc sont encodés sur le même nombre d'octets
+SKIP_INTERVAL = 32
+
+# Type de tableau utilisé pour chaque nombre d'octets par écart
+WIDTH_TYPECODES = {1: 'B', 2: 'H', 4: 'I'}
+
+# Les écarts sont stockés en little-endian, comme dans le fichier d'index
+_SWAP_BYTES = sys.byteorder != 'little'
+
+
+def gallop(values: Sequence[int], target: int, lo: int = 0) -> int:
+    """
+    Recherche galopante de la première valeur supérieure ou égale à la cible.
+
+    Les pas doublent à partir de lo jusqu'à dépasser la cible, puis une
+    dichotomie termine dans le dernier intervalle : le coût est logarithmique
+    en la distance parcourue, et non en la taille de la liste.
+
+    Args :
+        values : Entiers triés par ordre croissant
+        target : Valeur recherchée
+        lo : Position à partir de laquelle chercher
+
+    Returns :
+        La position de la première valeur >= target à partir de lo (len(values) si aucune)
+    """
+    size = len(values)
+    if lo >= size or values[lo] >= target:
+        return lo
+    step = 1
+    hi = lo + 1
+    while hi < size and values[hi] < target:
+        lo = hi
+        step <<= 1
+        hi = lo + step
+    return bisect_left(values, target, lo + 1, min(hi, size))
+
+
+def intersect_sorted(lists: List[Sequence[int]]) -> List[int]:
+    """
+    Intersecte des listes triées de numéros de documents, de la plus courte à la plus longue.
+
+    Le résultat courant (au plus la taille de la liste la plus courte) est
+    recherché par recherche galopante dans chaque liste suivante ; le coût
+    dépend donc de la plus petite liste et non de la somme des tailles. Quand
+    deux listes ont des tailles proches, l'intersection d'ensembles (en C)
+    reste plus rapide qu'une boucle Python et est utilisée à la place.
+
+    Args :
+        lists : Listes triées par ordre croissant (tableaux array ou listes)
+
+    Returns :
+        Liste triée des numéros présents dans toutes les listes
+    """
+    if not lists:
+        return []
+    lists = sorted(lists, key=len)
+    result = list(lists[0])
+    for other in lists[1:]:
+        if not result:
+            break
+        if len(result) * GALLOP_RATIO > len(other):
+            result = sorted(set(result).intersection(other))
+            continue
+        matches = []
+        cursor = 0
+        size = len(other)
+        for value in result:
+            cursor = gallop(other, value, cursor)
+            if cursor == size:
+                break
+            if other[cursor] == value:
+                matches.append(value)
+        result = matches
+    return result
+
+
+def iter_phrase_starts(position_lists: List[Sequence[int]]) -> Iterator[int]:
+    """
+    Parcourt les positions de départ des occurrences d'une expression.
+
+    Les listes de positions sont fusionnées linéairement : le i-ème mot doit se
+    trouver à la position de départ + i. Chaque curseur ne fait qu'avancer.
+
+    Args :
+        position_lists : Positions triées de chaque mot de l'expression, dans l'ordre de l'expression
+
+    Returns :
+        Itérateur des positions du premier mot de chaque occurrence, croissantes
+    """
+    cursors = [0] * len(position_lists)
+    for start in position_lists[0]:
+        for i in range(1, len(position_lists)):
+            positions = position_lists[i]
+            target = start + i
+            cursor = cursors[i]
+            while cursor < len(positions) and positions[cursor] < target:
+                cursor += 1
+            cursors[i] = cursor
+            if cursor == len(positions):
+                return
+            if positions[cursor] != target:
+                break
+        else:
+            yield start
+
+
+def contains_phrase(position_lists: List[Sequence[int]]) -> bool:
+    """
+    Indique si des mots apparaissent à des positions consécutives, dans l'ordre.
+
+    Args :
+        position_lists : Positions triées de chaque mot de l'expression, dans l'ordre de l'expression
+
+    Returns :
+        True si l'expression apparaît au moins une fois
+    """
+    for _ in iter_phrase_starts(position_lists):
+        return True
+    return False
+
+
+def within_distance(left: Sequence[int], right: Sequence[int], distance: int) -> bool:
+    """
+    Indique si deux mots apparaissent à au plus distance positions l'un de l'autre.
+
+    Args :
+        left : Positions triées du premier mot
+        right : Positions triées du second mot
+        distance : Écart maximal entre les deux positions, dans un sens ou dans l'autre
+
+    Returns :
+        True si une paire de positions est assez proche
+    """
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if abs(left[i] - right[j]) <= distance:
+            return True
+        if left[i] < right[j]:
+            i += 1
+        else:
+            j += 1
+    return False
+
+
+class PostingsList:
+    """
+    Liste des postings d'un mot : numéros de documents et positions.
+
+    Les numéros de documents et les fréquences restent décodés, car chaque
+    recherche les parcourt. Les positions, la plus grosse partie de l'index,
+    sont encodées par écarts, document après document, en blocs d'au plus
+    SKIP_INTERVAL documents : chaque bloc utilise le plus petit nombre
+    d'octets par écart (1, 2 ou 4) suffisant pour tous ses écarts. Les
+    positions d'un document se retrouvent donc par un calcul direct, et se
+    décodent par des opérations sur des tableaux entiers.
+
+    Le dernier bloc, encore incomplet, garde ses positions dans tail sans les
+    encoder ; il est encodé en une fois quand il atteint SKIP_INTERVAL documents.
+    Les tableaux des blocs encodés ne sont créés qu'au premier bloc : un mot
+    rare n'en a pas.
+
+    Le nombre de positions avant le i-ème document est offsets[i] ; sa
+    fréquence est donc offsets[i + 1] - offsets[i].
+    """
+
+    __slots__ = ('doc_ids', 'offsets', 'positions', 'blocks', 'skips', 'widths', 'tail', 'tail_start')
+
+    def __init__(self):
+        """Initialise une liste de postings vide."""
+        self.doc_ids = array('I')  # numéros de documents, croissants
+        self.offsets = array('I', [0])  # nombre de positions avant chaque document
+        self.positions = None  # écarts de positions des blocs encodés
+        self.blocks = None  # indice du premier document de chaque bloc encodé
+        self.skips = None  # début de chaque bloc encodé dans positions
+        self.widths = None  # nombre d'octets par écart dans chaque bloc encodé
+        self.tail = array('I')  # positions des documents du dernier bloc, non encodées
+        self.tail_start = 0  # indice du premier document du dernier bloc
+
+    @classmethod
+    def from_encoded(cls, doc_ids: array, offsets: array, blocks: array, widths: bytes,
+                     positions: bytes) -> 'PostingsList':
+        """
+        Reconstruit une liste à partir de ses blocs de positions (voir encoded_positions).
+
+        Args :
+            doc_ids : Numéros de documents, croissants
+            offsets : Nombre de positions avant chaque document, suivi du total
+            blocks : Indice du premier document de chaque bloc
+            widths : Nombre d'octets par écart dans chaque bloc
+            positions : Écarts de positions de tous les blocs, encodés
+
+        Returns :
+            La liste de postings
+        """
+        postings = cls()
+        postings.doc_ids = doc_ids
+        postings.offsets = offsets
+        postings.tail_start = len(doc_ids)
+        if not blocks:
+            return postings
+        postings.blocks = blocks
+        postings.widths = bytearray(widths)
+        postings.positions = bytearray(positions)
+        postings.skips = array('I')
+        ends = blocks[1:] + array('I', [len(doc_ids)])
+        skip = 0
+        for first, end, width in zip(blocks, ends, widths):
+            postings.skips.append(skip)
+            skip += (offsets[end] - offsets[first]) * width
+        return postings
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def __iter__(self) -> Iterator[Tuple[int, array]]:
+        offsets = self.offsets
+        doc_ids = self.doc_ids
+        if self.blocks is not None:
+            ends = self.blocks[1:] + array('I', [self.tail_start])
+            # Les écarts sont décodés bloc par bloc, puis cumulés document par document
+            for first, end, skip, width in zip(self.blocks, ends, self.skips, self.widths):
+                base = offsets[first]
+                gaps = _decode_gaps(self.positions[skip:skip + (offsets[end] - base) * width], width)
+                for i in range(first, end):
+                    yield doc_ids[i], array('I', accumulate(gaps[offsets[i] - base:offsets[i + 1] - base]))
+        base = offsets[self.tail_start]
+        for i in range(self.tail_start, len(doc_ids)):
+            yield doc_ids[i], self.tail[offsets[i] - base:offsets[i + 1] - base]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PostingsList):
+            return NotImplemented
+        # Le découpage en blocs peut différer pour les mêmes postings
+        return (self.doc_ids == other.doc_ids and self.offsets == other.offsets
+                and all(a == b for (_, a), (_, b) in zip(self, other)))
+
+    def __getstate__(self):
+        return (self.doc_ids, self.offsets, self.positions, self.blocks, self.skips, self.widths,
+                self.tail, self.tail_start)
+
+    def __setstate__(self, state):
+        (self.doc_ids, self.offsets, self.positions, self.blocks, self.skips, self.widths,
+         self.tail, self.tail_start) = state
+
+    def append(self, doc_id: int, positions: List[int]):
+        """
+        Ajoute les positions d'un mot dans un document.
+
+        Args :
+            doc_id : Numéro du document, supérieur à ceux déjà présents
+            positions : Positions du mot dans le document, croissantes
+        """
+        doc_ids = self.doc_ids
+        doc_ids.append(doc_id)
+        self.tail.extend(positions)
+        offsets = self.offsets
+        offsets.append(offsets[-1] + len(positions))
+        if len(doc_ids) - self.tail_start >= SKIP_INTERVAL:
+            self._encode_tail()
+
+    def _encode_tail(self):
+        """Encode le dernier bloc et en commence un nouveau, vide."""
+        first = self.tail_start
+        end = len(self.doc_ids)
+        if first == end:
+            return
+        tail = self.tail
+        offsets = self.offsets
+        base = offsets[first]
+        gaps = list(map(sub, tail, chain((0,), tail)))
+        # Chaque document repart de la position 0
+        for i in range(first, end):
+            gaps[offsets[i] - base] = tail[offsets[i] - base]
+        largest = max(gaps)
+        width = 1 if largest < 1 << 8 else 2 if largest < 1 << 16 else 4
+        if self.blocks is None:
+            self._create_blocks()
+        self.blocks.append(first)
+        self.skips.append(len(self.positions))
+        self.widths.append(width)
+        self.positions += _encode_gaps(gaps, width)
+        self.tail = array('I')
+        self.tail_start = end
+
+    def _create_blocks(self):
+        """Crée les tableaux des blocs encodés, au premier bloc."""
+        self.positions = bytearray()
+        self.blocks = array('I')
+        self.skips = array('I')
+        self.widths = bytearray()
+
+    def encoded_positions(self) -> Tuple[array, bytes, bytes]:
+        """
+        Retourne les blocs de positions, dernier bloc compris, sans modifier la liste.
+
+        Returns :
+            Tuple (indice du premier document de chaque bloc, octets par écart de
+            chaque bloc, écarts encodés de tous les blocs)
+        """
+        blocks, widths, positions = array('I'), bytearray(), bytearray()
+        last = PostingsList()
+        last.doc_ids = self.doc_ids
+        last.offsets = self.offsets
+        last.tail = self.tail
+        last.tail_start = self.tail_start
+        last._encode_tail()
+        for postings in (self, last):
+            if postings.blocks is not None:
+                blocks += postings.blocks
+                widths += postings.widths
+                positions += postings.positions
+        return blocks, bytes(widths), bytes(positions)
+
+    def extend(self, other: 'PostingsList', doc_id_shift: int = 0):
+        """
+        Ajoute à la fin les postings d'une autre liste.
+
+        Les blocs encodés de l'autre liste sont repris tels quels, sans être décodés.
+
+        Args :
+            other : La liste à ajouter
+            doc_id_shift : Décalage appliqué à ses numéros de documents
+        """
+        self._encode_tail()
+        size = len(self.doc_ids)
+        if doc_id_shift:
+            self.doc_ids.extend(array('I', [doc_id + doc_id_shift for doc_id in other.doc_ids]))
+        else:
+            self.doc_ids.extend(other.doc_ids)
+        count = self.offsets[-1]
+        self.offsets.extend(array('I', [offset + count for offset in other.offsets[1:]]))
+        if other.blocks is not None:
+            if self.blocks is None:
+                self._create_blocks()
+            base = len(self.positions)
+            self.positions += other.positions
+            self.blocks.extend(array('I', [block + size for block in other.blocks]))
+            self.skips.extend(array('I', [skip + base for skip in other.skips]))
+            self.widths += other.widths
+        self.tail = array('I', other.tail)
+        self.tail_start = other.tail_start + size
+
+    def frequency(self, i: int) -> int:
+        """Retourne la fréquence du mot dans le i-ème document de la liste."""
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def positions_at(self, i: int) -> array:
+        """
+        Retourne les positions du mot dans le i-ème document de la liste.
+
+        Seules les positions de ce document sont décodées : tous les écarts de
+        son bloc ayant la même taille, leur emplacement se calcule directement.
+        """
+        offsets = self.offsets
+        if i >= self.tail_start:
+            base = offsets[self.tail_start]
+            return self.tail[offsets[i] - base:offsets[i + 1] - base]
+        blocks = self.blocks
+        block = bisect_right(blocks, i) - 1
+        width = self.widths[block]
+        start = self.skips[block] + (offsets[i] - offsets[blocks[block]]) * width
+        raw = self.positions[start:start + (offsets[i + 1] - offsets[i]) * width]
+        return array('I', accumulate(_decode_gaps(raw, width)))
+
+    def filter(self, keep: Callable[[int], bool]) -> 'PostingsList':
+        """
+        Retourne une nouvelle liste limitée aux documents retenus.
+
+        Args :
+            keep : Fonction indiquant si un numéro de document doit être conservé
+
+        Returns :
+            La liste filtrée
+        """
+        filtered = PostingsList()
+        for doc_id, positions in self:
+            if keep(doc_id):
+                filtered.append(doc_id, positions)
+        return filtered
+
+    def memory_usage(self) -> int:
+        """Retourne la taille en octets de la liste et de ses tableaux."""
+        size = (sys.getsizeof(self) + sys.getsizeof(self.doc_ids) + sys.getsizeof(self.offsets)
+                + sys.getsizeof(self.tail))
+        if self.blocks is not None:
+            size += (sys.getsizeof(self.positions) + sys.getsizeof(self.blocks)
+                     + sys.getsizeof(self.skips) + sys.getsizeof(self.widths))
+        return size
+
+
+def _encode_gaps(gaps: List[int], width: int) -> bytes:
+    """Encode des écarts sur width octets chacun, en little-endian."""
+    if width == 1:
+        return bytes(gaps)
+    values = array(WIDTH_TYPECODES[width], gaps)
+    if _SWAP_BYTES:
+        values.byteswap()
+    return values.tobytes()
+
+
+def _decode_gaps(raw: bytes, width: int) -> Sequence[int]:
+    """Décode des écarts encodés sur width octets chacun."""
+    if width == 1:
+        return raw
+    gaps = array(WIDTH_TYPECODES[width], raw)
+    if _SWAP_BYTES:
+        gaps.byteswap()
+    return gaps
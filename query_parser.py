@@ -0,0 +1,151 @@
+"""
+Module pour analyser les requêtes de recherche.
+
+Ce module fournit des fonctionnalités pour :
+1. Reconnaître les expressions exactes entre guillemets ("moteur de recherche")
+2. Reconnaître les requêtes de proximité (chat NEAR/3 souris)
+3. Reconnaître les motifs à jokers (moteur*, r?se), développés avec le dictionnaire des termes
+   et, en recherche approchée, développer les termes simples en termes proches
+4. Séparer les termes simples des expressions et des clauses de proximité
+5. Normaliser les mots de la requête avec le tokeniseur de l'index
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+from term_dictionary import WILDCARDS, is_pattern
+from tokenizer import DEFAULT_TOKENIZER, Tokenizer
+
+_TOKEN_PATTERN = re.compile(r'"([^"]*)"?|(\S+)')
+_NEAR_PATTERN = re.compile(r'NEAR/(\d+)$')
+# Caractères retirés d'un motif à jokers : tout sauf les lettres, les chiffres et les jokers
+_PATTERN_SEPARATORS = re.compile(r'[^\w*?]|_')
+
+
+class ParsedQuery:
+    """Requête analysée : termes simples, motifs à jokers, expressions exactes et clauses de proximité."""
+
+    def __init__(self):
+        self.terms: List[str] = []  # termes simples
+        self.wildcards: List[str] = []  # motifs à jokers
+        self.fuzzy: List[str] = []  # termes simples à développer en termes proches (recherche approchée)
+        self.fuzzy_distance = 0  # distance d'édition maximale des termes proches
+        self.expansions: Dict[str, List[str]] = {}  # motif ou terme approché -> termes de l'index correspondants
+        self.phrases: List[List[str]] = []  # expressions exactes, mot par mot
+        self.proximities: List[Tuple[str, str, int]] = []  # (mot, mot, distance maximale)
+
+    def is_simple(self) -> bool:
+        """Indique si la requête ne contient que des termes simples."""
+        return not self.phrases and not self.proximities and not self.wildcards and not self.fuzzy
+
+    def expanded(self) -> List[str]:
+        """Retourne les motifs et les termes approchés, chacun développé en une clause OU."""
+        return self.wildcards + self.fuzzy
+
+    def all_terms(self) -> List[str]:
+        """Retourne tous les mots de la requête, utilisés pour le classement."""
+        words = list(self.terms)
+        for phrase in self.phrases:
+            words.extend(phrase)
+        # Un mot partagé par deux clauses enchaînées (a NEAR b NEAR c) ne compte qu'une fois
+        proximity_words = []
+        for left, right, _ in self.proximities:
+            for word in (left, right):
+                if word not in proximity_words:
+                    proximity_words.append(word)
+        words.extend(proximity_words)
+        # Les termes développés des motifs, sans ceux déjà présents dans la requête
+        for pattern in self.expanded():
+            for term in self.expansions.get(pattern, ()):
+                if term not in words:
+                    words.append(term)
+        return words
+
+    def cache_key(self) -> Tuple:
+        """Retourne une forme normalisée de la requête, identique pour des requêtes équivalentes."""
+        return (tuple(self.terms), tuple(tuple(phrase) for phrase in self.phrases), tuple(self.proximities),
+                tuple(self.wildcards), tuple(self.fuzzy), self.fuzzy_distance)
+
+    def highlight_terms(self) -> List[str]:
+        """Retourne les termes à mettre en évidence, les expressions restant groupées."""
+        highlights = [' '.join(phrase) for phrase in self.phrases]
+        highlights.extend(self.terms)
+        for left, right, _ in self.proximities:
+            highlights.extend((left, right))
+        for pattern in self.expanded():
+            highlights.extend(self.expansions.get(pattern, ()))
+        return highlights
+
+
+def parse_query(query: str, tokenizer: Tokenizer = DEFAULT_TOKENIZER, fuzzy_distance: int = 0) -> ParsedQuery:
+    """
+    Analyse une requête de recherche.
+
+    Syntaxe :
+        mot                  terme simple
+        "mot1 mot2"          expression exacte (mots consécutifs, dans l'ordre)
+        mot1 NEAR/k mot2     mots distants d'au plus k positions, dans un ordre quelconque
+        pré*  r?se           motif à jokers : * pour une suite de caractères, ? pour un caractère
+
+    Les clauses NEAR peuvent s'enchaîner (a NEAR/2 b NEAR/2 c). Un opérateur
+    NEAR sans mot de part et d'autre est ignoré.
+
+    Les mots sont découpés et normalisés par le tokeniseur de l'index : un mot
+    qui donne plusieurs tokens (l'été -> l, été) est traité comme une expression
+    exacte, un mot sans token (ponctuation seule) est ignoré.
+
+    Un motif à jokers est seulement normalisé (casse, accents) : les mots vides
+    et la racinisation ne s'y appliquent pas, et un motif fait uniquement de
+    jokers est ignoré. Ses termes (expansions) sont remplis par le moteur de
+    recherche, à partir du dictionnaire des termes de l'index.
+
+    En recherche approchée (fuzzy_distance > 0), les termes simples sont
+    placés dans fuzzy plutôt que dans terms ; les expressions et les clauses
+    de proximité restent exactes.
+
+    Args :
+        query : Chaîne de requête de recherche
+        tokenizer : Tokeniseur de l'index interrogé
+        fuzzy_distance : Nombre de fautes de frappe tolérées par terme simple (0 pour une recherche exacte)
+
+    Returns :
+        La requête analysée
+    """
+    parsed = ParsedQuery()
+    parsed.fuzzy_distance = fuzzy_distance
+    operands = []  # (mot ou None pour une expression, est un opérateur NEAR, distance)
+    for match in _TOKEN_PATTERN.finditer(query):
+        phrase, word = match.groups()
+        if phrase is None:
+            near = _NEAR_PATTERN.match(word)
+            if near:
+                operands.append((None, True, int(near.group(1))))
+                continue
+            if is_pattern(word):
+                pattern = _PATTERN_SEPARATORS.sub('', tokenizer.normalize(word))
+                if pattern.strip(WILDCARDS) and pattern not in parsed.wildcards:
+                    parsed.wildcards.append(pattern)
+                continue
+        words = tokenizer.tokenize(phrase if phrase is not None else word)
+        if len(words) > 1:
+            parsed.phrases.append(words)
+            operands.append((None, False, 0))
+        elif words:
+            operands.append((words[0], False, 0))
+
+    in_proximity = set()
+    for i, (word, is_near, distance) in enumerate(operands):
+        if not is_near or i == 0 or i + 1 == len(operands):
+            continue
+        left, right = operands[i - 1][0], operands[i + 1][0]
+        if left is not None and right is not None:
+            parsed.proximities.append((left, right, distance))
+            in_proximity.update((i - 1, i + 1))
+
+    for i, (word, is_near, _) in enumerate(operands):
+        if word is not None and not is_near and i not in in_proximity:
+            if not fuzzy_distance:
+                parsed.terms.append(word)
+            elif word not in parsed.fuzzy:
+                parsed.fuzzy.append(word)
+    return parsed
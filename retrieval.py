@@ -1,204 +1,328 @@
-"""
-Module pour trier et afficher les résultats de recherche.
-
-Ce module fournit des fonctionnalités pour :
-1. Trier les documents récupérés selon leur score de pertinence
-2. Afficher les résultats avec nom du document, score et extraits (snippets) montrant le contexte des mots-clés
-"""
-
-from typing import Dict, List, Tuple
-
-from indexer import InvertedIndex
-from search_engine import SearchEngine
-
-
-def highlight_all_terms(snippet: str, terms: List[str]) -> str:
-    """
-    Met en évidence toutes les occurrences des termes donnés dans l'extrait.
-    Gère à la fois les termes simples et les expressions multi-mots.
-
-    Args :
-        snippet : L'extrait de texte
-        terms : Liste des termes à mettre en évidence
-
-    Returns :
-        Extrait avec tous les termes surlignés
-    """
-    tokens = snippet.split()
-
-    # D'abord, gérer les expressions multi-mots
-    i = 0
-    while i < len(tokens):
-        for term in terms:
-            term_words = term.lower().split()
-            if len(term_words) <= 1:
-                continue
-            if i + len(term_words) > len(tokens):
-                continue
-            match = True
-            for j, term_word in enumerate(term_words):
-                clean_token = ''.join(c for c in tokens[i+j] if c.isalnum()).lower()
-                if clean_token != term_word:
-                    match = False
-                    break
-            if match:
-                original_phrase = ' '.join(tokens[i:i+len(term_words)])
-                tokens[i] = f"**{original_phrase}**"
-                for _ in range(len(term_words) - 1):
-                    tokens.pop(i + 1)
-                break
-        i += 1
-
-    # Ensuite, gérer les termes simples
-    for i, token in enumerate(tokens):
-        if token.startswith('**') and token.endswith('**'):
-            continue
-        clean_token = ''.join(c for c in token if c.isalnum()).lower()
-        for term in terms:
-            if ' ' not in term and clean_token == term.lower():
-                tokens[i] = f"**{token}**"
-                break
-
-    return ' '.join(tokens)
-
-
-class ResultRetriever:
-    """Classe pour récupérer et afficher les résultats de recherche."""
-
-    def __init__(self, index: InvertedIndex, documents: Dict[str, str]):
-        """
-        Initialise avec un index inversé et une collection de documents.
-
-        Args :
-            index : L'index inversé
-            documents : Dictionnaire associant les identifiants de documents à leur contenu brut
-        """
-        self.index = index
-        self.documents = documents
-        self.search_engine = SearchEngine(index)
-
-    def search(self, query: str, use_all_terms: bool = True, max_results: int = 10) -> List[Tuple[str, float]]:
-        """
-        Recherche les documents correspondant à la requête et retourne les résultats classés.
-
-        Args :
-            query : Chaîne de requête de recherche
-            use_all_terms : Si True, les documents doivent contenir tous les termes (recherche ET)
-                            Si False, les documents peuvent contenir n'importe quel terme (recherche OU)
-            max_results : Nombre maximal de résultats à retourner
-
-        Returns :
-            Liste de tuples (id_doc, score) triés par score de pertinence (décroissant)
-        """
-        results = self.search_engine.search(query, use_all_terms)
-        return results[:max_results] if max_results > 0 else results
-
-    def get_snippet(self, doc_id: str, term: str, context_size: int = 5) -> str:
-        """
-        Extrait un extrait du document montrant le contexte autour d'un terme.
-
-        Args :
-            doc_id : Identifiant du document
-            term : Terme à mettre en contexte
-            context_size : Nombre de mots à inclure avant et après le terme
-
-        Returns :
-            Extrait montrant le terme dans son contexte
-        """
-        if doc_id not in self.documents:
-            return ""
-
-        contenu = self.documents[doc_id]
-        terme = term.lower()
-        tokens = contenu.lower().split()
-        positions = []
-        for i, token in enumerate(tokens):
-            clean_token = ''.join(c for c in token if c.isalnum())
-            if clean_token == terme:
-                positions.append(i)
-        if not positions:
-            return ""
-        pos = positions[0]
-        start = max(0, pos - context_size)
-        end = min(len(tokens), pos + context_size + 1)
-        snippet_tokens = tokens[start:end]
-        for i in range(len(snippet_tokens)):
-            clean_token = ''.join(c for c in snippet_tokens[i] if c.isalnum())
-            if clean_token == terme:
-                snippet_tokens[i] = f"**{snippet_tokens[i]}**"
-        snippet = ' '.join(snippet_tokens)
-        if start > 0:
-            snippet = f"...{snippet}"
-        if end < len(tokens):
-            snippet = f"{snippet}..."
-        return snippet
-
-    def get_multi_term_snippet(self, doc_id: str, terms: List[str], context_size: int = 5) -> str:
-        """
-        Extrait un extrait du document montrant le contexte autour de plusieurs termes.
-
-        Args :
-            doc_id : Identifiant du document
-            terms : Liste des termes à mettre en contexte
-            context_size : Nombre de mots à inclure avant et après les termes
-
-        Returns :
-            Extrait montrant les termes dans leur contexte
-        """
-        if not terms or doc_id not in self.documents:
-            return ""
-        for term in terms:
-            snippet = self.get_snippet(doc_id, term, context_size)
-            if snippet:
-                contains_other_terms = False
-                for other_term in terms:
-                    if other_term != term and other_term.lower() in snippet.lower():
-                        contains_other_terms = True
-                        break
-                if contains_other_terms or term == terms[-1]:
-                    snippet = snippet.replace('**', '')
-                    return highlight_all_terms(snippet, terms)
-        return ""
-
-    def display_result(self, doc_id: str, score: float, query_terms: List[str]) -> str:
-        """
-        Formate un résultat de recherche pour l'affichage.
-
-        Args :
-            doc_id : Identifiant du document
-            score : Score de pertinence
-            query_terms : Liste des termes de la requête
-
-        Returns :
-            Chaîne formatée représentant le résultat de recherche
-        """
-        snippet = self.get_multi_term_snippet(doc_id, query_terms)
-        result = f"Document : {doc_id}\n"
-        result += f"Score : {score:.2f}\n"
-        if snippet:
-            result += f"Extrait : {snippet}\n"
-        return result
-
-    def display_results(self, query: str, use_all_terms: bool = True, max_results: int = 10) -> str:
-        """
-        Recherche des documents et affiche les résultats formatés.
-
-        Args :
-            query : Chaîne de requête de recherche
-            use_all_terms : Si True, recherche ET ; sinon, recherche OU
-            max_results : Nombre maximal de résultats à afficher
-
-        Returns :
-            Chaîne formatée avec les résultats de recherche
-        """
-        query_terms = query.lower().split()
-        results = self.search(query, use_all_terms, max_results)
-        if not results:
-            return f"Aucun résultat trouvé pour la requête : '{query}'"
-        output = f"Résultats de la recherche pour la requête : '{query}'\n"
-        output += f"Mode de recherche : {'ET' if use_all_terms else 'OU'}\n\n"
-        for i, (doc_id, score) in enumerate(results, 1):
-            output += f"Résultat {i} :\n"
-            output += self.display_result(doc_id, score, query_terms)
-            output += "\n"
+"""
+Module pour trier et afficher les résultats de recherche.
+
+Ce module fournit des fonctionnalités pour :
+1. Trier les documents récupérés selon leur score de pertinence
+2. Afficher les résultats avec nom du document, score et extraits (snippets) montrant le contexte des mots-clés,
+   découpés dans le texte original à partir des positions et des décalages des tokens de l'index
+3. Garder en cache les résultats des requêtes et les extraits, invalidés à chaque modification de l'index
+"""
+
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import metrics
+from cache import LRUCache
+from indexer import InvertedIndex
+from postings import iter_phrase_starts
+from query_parser import parse_query
+from search_engine import SearchEngine
+
+# Ponctuation collée à la fin du dernier token d'un extrait
+_TRAILING_PATTERN = re.compile(r'\S*')
+
+
+def _occurs_within(starts: Sequence[int], start: int, end: int) -> bool:
+    """Indique si une des positions triées tombe dans l'intervalle [start, end[."""
+    i = bisect_left(starts, start)
+    return i < len(starts) and starts[i] < end
+
+
+def highlight_all_terms(snippet: str, terms: List[str]) -> str:
+    """
+    Met en évidence toutes les occurrences des termes donnés dans l'extrait.
+    Gère à la fois les termes simples et les expressions multi-mots.
+
+    Args :
+        snippet : L'extrait de texte
+        terms : Liste des termes à mettre en évidence
+
+    Returns :
+        Extrait avec tous les termes surlignés
+    """
+    tokens = snippet.split()
+
+    # D'abord, gérer les expressions multi-mots
+    i = 0
+    while i < len(tokens):
+        for term in terms:
+            term_words = term.lower().split()
+            if len(term_words) <= 1:
+                continue
+            if i + len(term_words) > len(tokens):
+                continue
+            match = True
+            for j, term_word in enumerate(term_words):
+                clean_token = ''.join(c for c in tokens[i+j] if c.isalnum()).lower()
+                if clean_token != term_word:
+                    match = False
+                    break
+            if match:
+                original_phrase = ' '.join(tokens[i:i+len(term_words)])
+                tokens[i] = f"**{original_phrase}**"
+                for _ in range(len(term_words) - 1):
+                    tokens.pop(i + 1)
+                break
+        i += 1
+
+    # Ensuite, gérer les termes simples
+    for i, token in enumerate(tokens):
+        if token.startswith('**') and token.endswith('**'):
+            continue
+        clean_token = ''.join(c for c in token if c.isalnum()).lower()
+        for term in terms:
+            if ' ' not in term and clean_token == term.lower():
+                tokens[i] = f"**{token}**"
+                break
+
+    return ' '.join(tokens)
+
+
+class ResultRetriever:
+    """Classe pour récupérer et afficher les résultats de recherche."""
+
+    def __init__(self, index: InvertedIndex, documents: Dict[str, str], scorer: str = "bm25",
+                 cache_size: int = 256, cache_bytes: int = 16 * 1024 * 1024, cache_ttl: Optional[float] = None,
+                 fuzzy_distance: int = 0):
+        """
+        Initialise avec un index inversé et une collection de documents.
+
+        Args :
+            index : L'index inversé
+            documents : Dictionnaire associant les identifiants de documents à leur contenu brut
+            scorer : Fonction de classement ('frequence', 'tfidf' ou 'bm25')
+            cache_size : Nombre de requêtes dont les résultats sont gardés en cache (0 pour aucun) ;
+                         le cache des extraits en garde quatre fois plus
+            cache_bytes : Taille maximale de chaque cache, en octets
+            cache_ttl : Durée de vie des entrées des caches en secondes (None pour illimitée)
+            fuzzy_distance : Nombre de fautes de frappe tolérées par terme (0 pour une recherche exacte)
+        """
+        self.index = index
+        self.documents = documents
+        self.search_engine = SearchEngine(index, scorer, fuzzy_distance=fuzzy_distance)
+        self.result_cache = LRUCache(cache_size, cache_bytes, cache_ttl)  # (requête normalisée, options) -> (résultats, termes à surligner)
+        self.snippet_cache = LRUCache(cache_size * 4, cache_bytes, cache_ttl)  # (id_doc, termes) -> extrait
+
+    def search(self, query: str, use_all_terms: bool = True, max_results: int = 10) -> List[Tuple[str, float]]:
+        """
+        Recherche les documents correspondant à la requête et retourne les résultats classés.
+
+        Args :
+            query : Chaîne de requête de recherche
+            use_all_terms : Si True, les documents doivent contenir tous les termes (recherche ET)
+                            Si False, les documents peuvent contenir n'importe quel terme (recherche OU)
+            max_results : Nombre maximal de résultats à retourner
+
+        Returns :
+            Liste de tuples (id_doc, score) triés par score de pertinence (décroissant)
+        """
+        return self.search_with_highlights(query, use_all_terms, max_results)[0]
+
+    def search_with_highlights(self, query: str, use_all_terms: bool = True,
+                               max_results: int = 10) -> Tuple[List[Tuple[str, float]], List[str]]:
+        """
+        Recherche les documents correspondant à la requête, avec les termes à mettre en évidence.
+
+        La requête est seulement découpée et normalisée par le tokeniseur pour
+        former la clé du cache ; ses motifs et ses termes approchés ne sont
+        développés dans le dictionnaire des termes qu'en cas d'absence du cache.
+
+        Args :
+            query : Chaîne de requête de recherche
+            use_all_terms : Si True, recherche ET ; sinon, recherche OU
+            max_results : Nombre maximal de résultats à retourner
+
+        Returns :
+            Tuple (résultats triés par score décroissant, termes à mettre en évidence dans les extraits)
+        """
+        top_k = max_results if max_results > 0 else None
+        engine = self.search_engine
+        parsed = parse_query(query, self.index.tokenizer, engine.fuzzy_distance)
+        key = (parsed.cache_key(), use_all_terms, top_k, engine.max_expansions)
+        version = self.index.version
+        cached = self.result_cache.get(key, version)
+        if cached is None:
+            engine.expand_query(parsed)
+            cached = (engine.search_parsed(parsed, use_all_terms, top_k), parsed.highlight_terms())
+            self.result_cache.put(key, cached, version)
+        results, highlight_terms = cached
+        return list(results), list(highlight_terms)
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Retourne les compteurs des caches de résultats et d'extraits.
+
+        Returns :
+            Dictionnaire associant 'results' et 'snippets' aux compteurs de chaque cache
+        """
+        return {'results': self.result_cache.stats(), 'snippets': self.snippet_cache.stats()}
+
+    def get_snippet(self, doc_id: str, term: str, context_size: int = 5) -> str:
+        """
+        Extrait un extrait du document montrant le contexte autour d'un terme.
+
+        Args :
+            doc_id : Identifiant du document
+            term : Terme de l'index à mettre en contexte (normalisé, voir SearchEngine.parse_query)
+            context_size : Nombre de mots à inclure avant et après le terme
+
+        Returns :
+            Extrait montrant le terme dans son contexte
+        """
+        return self.get_multi_term_snippet(doc_id, [term], context_size)
+
+    @metrics.timed("get_multi_term_snippet")
+    def get_multi_term_snippet(self, doc_id: str, terms: List[str], context_size: int = 5) -> str:
+        """
+        Extrait un extrait du document montrant le contexte autour de plusieurs termes.
+
+        Les occurrences des termes sont lues dans les positions de l'index et
+        l'extrait est découpé dans le texte original à partir des décalages des
+        tokens : seule la fenêtre affichée est parcourue, quelle que soit la
+        longueur du document.
+
+        Args :
+            doc_id : Identifiant du document
+            terms : Liste des termes à mettre en contexte
+            context_size : Nombre de mots à inclure avant et après les termes
+
+        Returns :
+            Extrait montrant les termes dans leur contexte
+        """
+        if not terms or doc_id not in self.documents:
+            return ""
+        key = (doc_id, tuple(terms), context_size)
+        version = self.index.version
+        snippet = self.snippet_cache.get(key, version)
+        if snippet is None:
+            snippet = self._build_snippet(doc_id, terms, context_size)
+            self.snippet_cache.put(key, snippet, version)
+        return snippet
+
+    def _build_snippet(self, doc_id: str, terms: List[str], context_size: int) -> str:
+        """Construit l'extrait de get_multi_term_snippet, sans passer par le cache."""
+        # Occurrences de chaque terme : (position de départ, nombre de tokens)
+        occurrences = [self._term_occurrences(doc_id, term) for term in terms]
+
+        anchor = None
+        for i, (starts, _) in enumerate(occurrences):
+            if not starts:
+                continue
+            window_start = max(0, starts[0] - context_size)
+            window_end = starts[0] + context_size + 1
+            if anchor is None:
+                anchor = (window_start, window_end)
+            # Préférer une fenêtre qui montre aussi un autre terme de la requête
+            if any(j != i and _occurs_within(other_starts, window_start, window_end)
+                   for j, (other_starts, _) in enumerate(occurrences)):
+                anchor = (window_start, window_end)
+                break
+        if anchor is None:
+            return ""
+
+        window_start, window_end = anchor
+        window_end = min(window_end, self.index.get_document_length(doc_id))
+        offsets = self.index.get_token_offsets(doc_id, window_start, window_end)
+        if not offsets:
+            return ""
+
+        # Tokens à surligner : début de chaque occurrence -> dernier token couvert
+        highlights = {}
+        for starts, span in occurrences:
+            for start in starts[bisect_left(starts, window_start - span + 1):bisect_left(starts, window_end)]:
+                first = max(start, window_start)
+                highlights[first] = max(highlights.get(first, first), start + span - 1)
+
+        try:
+            content = self.documents[doc_id]
+        except KeyError:
+            # Fichier supprimé ou devenu illisible depuis son recensement : pas d'extrait
+            return ""
+        tokenizer = self.index.tokenizer
+        last = window_start + len(offsets) - 1
+        # L'extrait commence et finit aux blancs qui entourent la fenêtre, pour
+        # garder la ponctuation collée au premier et au dernier token
+        cursor = offsets[0]
+        while cursor > 0 and not content[cursor - 1].isspace():
+            cursor -= 1
+        pieces = []
+        highlight_end = -1  # dernier token de l'occurrence surlignée en cours
+        for position, start in enumerate(offsets, window_start):
+            # Les blancs et la ponctuation entre deux tokens sont repris tels quels
+            pieces.append(content[cursor:start])
+            if position in highlights:
+                if position > highlight_end:
+                    pieces.append("**")
+                highlight_end = max(highlight_end, min(highlights[position], last))
+            cursor = tokenizer.token_end(content, start)
+            pieces.append(content[start:cursor])
+            if position == highlight_end:
+                pieces.append("**")
+        pieces.append(_TRAILING_PATTERN.match(content, cursor).group())
+
+        snippet = ' '.join(''.join(pieces).split())
+        if window_start > 0:
+            snippet = f"...{snippet}"
+        if window_end < self.index.get_document_length(doc_id):
+            snippet = f"{snippet}..."
+        return snippet
+
+    def _term_occurrences(self, doc_id: str, term: str) -> Tuple[List[int], int]:
+        """
+        Retrouve les occurrences d'un terme ou d'une expression dans un document.
+
+        Returns :
+            Tuple (positions de départ croissantes, nombre de tokens de chaque occurrence)
+        """
+        words = term.split()
+        if not words:
+            return [], 0
+        position_lists = [self.index.get_positions(word, doc_id) for word in words]
+        if len(words) == 1:
+            return position_lists[0], 1
+        if not all(position_lists):
+            return [], len(words)
+        return list(iter_phrase_starts(position_lists)), len(words)
+
+    def display_result(self, doc_id: str, score: float, query_terms: List[str]) -> str:
+        """
+        Formate un résultat de recherche pour l'affichage.
+
+        Args :
+            doc_id : Identifiant du document
+            score : Score de pertinence
+            query_terms : Liste des termes de la requête
+
+        Returns :
+            Chaîne formatée représentant le résultat de recherche
+        """
+        snippet = self.get_multi_term_snippet(doc_id, query_terms)
+        result = f"Document : {doc_id}\n"
+        result += f"Score : {score:.2f}\n"
+        if snippet:
+            result += f"Extrait : {snippet}\n"
+        return result
+
+    def display_results(self, query: str, use_all_terms: bool = True, max_results: int = 10) -> str:
+        """
+        Recherche des documents et affiche les résultats formatés.
+
+        Args :
+            query : Chaîne de requête de recherche
+            use_all_terms : Si True, recherche ET ; sinon, recherche OU
+            max_results : Nombre maximal de résultats à afficher
+
+        Returns :
+            Chaîne formatée avec les résultats de recherche
+        """
+        results, query_terms = self.search_with_highlights(query, use_all_terms, max_results)
+        if not results:
+            return f"Aucun résultat trouvé pour la requête : '{query}'"
+        output = f"Résultats de la recherche pour la requête : '{query}'\n"
+        output += f"Mode de recherche : {'ET' if use_all_terms else 'OU'}\n\n"
+        for i, (doc_id, score) in enumerate(results, 1):
+            output += f"Résultat {i} :\n"
+            output += self.display_result(doc_id, score, query_terms)
+            output += "\n"
         return output
\ No newline at end of file
@@ -0,0 +1,252 @@
+"""
+Module pour calculer les scores de pertinence des documents.
+
+Ce module fournit des fonctionnalités pour :
+1. Classer les documents par fréquence brute, TF-IDF ou BM25
+2. Précalculer la normalisation par longueur de chaque document à partir de
+   document_lengths, une seule fois par version de l'index
+3. Accumuler les scores en une seule boucle sur les postings de chaque terme
+4. Borner la contribution maximale de chaque terme, pour l'élagage top-k (MaxScore)
+5. Remplacer les statistiques de l'index par celles de toute la collection, pour
+   qu'un index fragmenté (voir sharding) donne les mêmes scores qu'un index unique
+"""
+
+import math
+from array import array
+from typing import Dict, NamedTuple, Optional, Set
+
+from postings import PostingsList
+
+
+class CollectionStatistics(NamedTuple):
+    """Statistiques d'une collection : nombre de documents, nombre total de tokens et nombre de documents par terme."""
+    document_count: int
+    total_tokens: int
+    document_frequencies: Dict[str, int]
+
+
+class Scorer:
+    """Classe de base des fonctions de classement."""
+
+    name = ""
+
+    def __init__(self):
+        self._version = None
+        self._norms = array('d')  # numéro de document -> normalisation précalculée
+        self._upper_bounds = {}  # mot -> contribution maximale pour la version courante
+        self.document_count = 0
+        self.average_length = 0.0
+        self._statistics = None  # statistiques globales remplaçant celles de l'index, le cas échéant
+
+    def use_statistics(self, statistics: Optional[CollectionStatistics]):
+        """
+        Remplace les statistiques de l'index par celles d'une collection plus large.
+
+        Un fragment d'index fragmenté classe ainsi ses documents avec l'idf et
+        la longueur moyenne de toute la collection.
+
+        Args :
+            statistics : Statistiques de la collection (None pour revenir à celles de l'index)
+        """
+        previous = self._statistics
+        self._statistics = statistics
+        if previous is None or statistics is None or previous[:2] != statistics[:2]:
+            self._version = None
+            return
+        # Même collection : les normalisations restent valables, seules les bornes
+        # des termes dont le nombre de documents a changé sont à recalculer
+        previous_frequencies = previous.document_frequencies
+        for term, frequency in statistics.document_frequencies.items():
+            if previous_frequencies.get(term) != frequency:
+                self._upper_bounds.pop(term, None)
+
+    def prepare(self, index):
+        """
+        Précalcule les statistiques de la collection si l'index a changé.
+
+        Args :
+            index : L'index inversé à partir duquel les scores sont calculés
+        """
+        if self._version == index.version and len(self._norms) == len(index.doc_names):
+            return
+        if self._statistics is not None:
+            self.document_count = self._statistics.document_count
+            total_length = self._statistics.total_tokens
+        else:
+            self.document_count = len(index.doc_numbers)
+            total_length = index.total_tokens
+        self.average_length = total_length / self.document_count if self.document_count else 0.0
+
+        norms = array('d', bytes(8 * len(index.doc_names)))
+        document_lengths = index.document_lengths
+        for doc_id, number in index.doc_numbers.items():
+            norms[number] = self.length_norm(document_lengths[doc_id])
+        self._norms = norms
+        self._upper_bounds = {}
+        self._version = index.version
+
+    def length_norm(self, length: int) -> float:
+        """Retourne la normalisation associée à un document de la longueur donnée."""
+        return 1.0
+
+    def idf(self, document_frequency: int) -> float:
+        """Retourne le poids d'un terme présent dans le nombre de documents donné."""
+        return 1.0
+
+    def term_idf(self, term: str, postings: PostingsList) -> float:
+        """Retourne le poids d'un terme, selon les statistiques globales s'il y en a."""
+        if self._statistics is not None:
+            return self.idf(self._statistics.document_frequencies.get(term, len(postings)))
+        return self.idf(len(postings))
+
+    def posting_score(self, idf: float, tf: int, doc_id: int) -> float:
+        """
+        Retourne la contribution d'un terme au score d'un document.
+
+        Args :
+            idf : Poids du terme, retourné par idf
+            tf : Fréquence du terme dans le document
+            doc_id : Numéro du document
+        """
+        raise NotImplementedError
+
+    def upper_bound(self, term: str, postings: PostingsList) -> float:
+        """
+        Retourne la contribution maximale d'un terme à un score, tous documents confondus.
+
+        La borne est calculée au premier appel puis gardée jusqu'au prochain
+        changement de version de l'index.
+
+        Args :
+            term : Le terme
+            postings : Les postings du terme
+        """
+        bound = self._upper_bounds.get(term)
+        if bound is None:
+            idf = self.term_idf(term, postings)
+            offsets = postings.offsets
+            bound = 0.0
+            for i, doc_id in enumerate(postings.doc_ids):
+                score = self.posting_score(idf, offsets[i + 1] - offsets[i], doc_id)
+                if score > bound:
+                    bound = score
+            self._upper_bounds[term] = bound
+        return bound
+
+    def accumulate(self, postings: PostingsList, candidates: Set[int], scores: Dict[int, float],
+                   idf: Optional[float] = None):
+        """
+        Ajoute aux scores la contribution d'un terme pour les documents candidats.
+
+        Args :
+            postings : Les postings du terme
+            candidates : Numéros des documents à scorer (None pour tous les documents des postings)
+            scores : Scores cumulés, numéro de document -> score, mis à jour sur place
+            idf : Poids du terme, retourné par term_idf (calculé d'après les postings si None)
+        """
+        raise NotImplementedError
+
+
+class TermFrequencyScorer(Scorer):
+    """Score historique : somme des fréquences brutes des termes de la requête."""
+
+    name = "frequence"
+
+    def posting_score(self, idf, tf, doc_id):
+        return tf
+
+    def accumulate(self, postings, candidates, scores, idf=None):
+        offsets = postings.offsets
+        for i, doc_id in enumerate(postings.doc_ids):
+            if candidates is None or doc_id in candidates:
+                scores[doc_id] = scores.get(doc_id, 0.0) + (offsets[i + 1] - offsets[i])
+
+
+class TfIdfScorer(Scorer):
+    """
+    TF-IDF selon la similarité classique de Lucene : racine de la fréquence,
+    idf = 1 + ln(N / (df + 1)), normalisation par la racine de la longueur.
+    """
+
+    name = "tfidf"
+
+    def length_norm(self, length):
+        return 1.0 / math.sqrt(length) if length else 0.0
+
+    def idf(self, document_frequency):
+        return 1.0 + math.log(self.document_count / (document_frequency + 1))
+
+    def posting_score(self, idf, tf, doc_id):
+        return math.sqrt(tf) * idf * self._norms[doc_id]
+
+    def accumulate(self, postings, candidates, scores, idf=None):
+        if idf is None:
+            idf = self.idf(len(postings))
+        norms = self._norms
+        offsets = postings.offsets
+        sqrt = math.sqrt
+        for i, doc_id in enumerate(postings.doc_ids):
+            if candidates is None or doc_id in candidates:
+                scores[doc_id] = scores.get(doc_id, 0.0) + sqrt(offsets[i + 1] - offsets[i]) * idf * norms[doc_id]
+
+
+class BM25Scorer(Scorer):
+    """BM25 (Okapi) avec les paramètres k1 et b."""
+
+    name = "bm25"
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialise les paramètres de BM25.
+
+        Args :
+            k1 : Saturation de la fréquence des termes
+            b : Importance de la normalisation par la longueur du document
+        """
+        super().__init__()
+        self.k1 = k1
+        self.b = b
+
+    def length_norm(self, length):
+        if not self.average_length:
+            return self.k1
+        return self.k1 * (1.0 - self.b + self.b * length / self.average_length)
+
+    def idf(self, document_frequency):
+        return math.log(1.0 + (self.document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def posting_score(self, idf, tf, doc_id):
+        return idf * (self.k1 + 1.0) * tf / (tf + self._norms[doc_id])
+
+    def accumulate(self, postings, candidates, scores, idf=None):
+        if idf is None:
+            idf = self.idf(len(postings))
+        weight = idf * (self.k1 + 1.0)
+        norms = self._norms
+        offsets = postings.offsets
+        for i, doc_id in enumerate(postings.doc_ids):
+            if candidates is None or doc_id in candidates:
+                tf = offsets[i + 1] - offsets[i]
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * tf / (tf + norms[doc_id])
+
+
+SCORERS = {
+    TermFrequencyScorer.name: TermFrequencyScorer,
+    TfIdfScorer.name: TfIdfScorer,
+    BM25Scorer.name: BM25Scorer,
+}
+
+
+def get_scorer(name: str) -> Scorer:
+    """
+    Crée une fonction de classement à partir de son nom.
+
+    Args :
+        name : 'frequence', 'tfidf' ou 'bm25'
+
+    Returns :
+        La fonction de classement
+    """
+    if name not in SCORERS:
+        raise ValueError(f"Classement inconnu : {name} (choix possibles : {', '.join(SCORERS)})")
+    return SCORERS[name]()
@@ -1,132 +1,488 @@
-"""
-Module pour implémenter des algorithmes de recherche utilisant l'index inversé.
-
-2. Rechercher plusieurs mots (intersection ou union des listes de documents)
-3. Calculer les scores de pertinence pour les résultats de recherche
-"""
-
-Ce module fournit des fonctionnalités pour :
-1. Rechercher des mots simples dans l'index
-from typing import Dict, List, Tuple
-
-from indexer import InvertedIndex
-
-
-class SearchEngine:
-    """Classe pour rechercher des documents à l'aide d'un index inversé."""
-
-    def __init__(self, index: InvertedIndex):
-        """
-        Initialise le moteur de recherche avec un index inversé.
-
-        Args :
-            index : L'index inversé à utiliser pour les recherches
-        """
-        self.index = index
-
-    def search_single_term(self, term: str) -> List[Tuple[str, List[int]]]:
-        """
-        Recherche les documents contenant un terme unique.
-
-        Args :
-            term : Le terme à rechercher
-
-        Returns :
-            Liste de tuples (id_doc, positions) pour les documents contenant le terme
-        """
-        return self.index.get_documents_for_term(term)
-
-    def search_all_terms(self, terms: List[str]) -> List[str]:
-        """
-        Recherche les documents contenant TOUS les termes spécifiés (opération ET).
-
-        Args :
-            terms : Liste des termes à rechercher
-
-        Returns :
-            Liste des identifiants de documents contenant tous les termes
-        """
-        if not terms:
-            return []
-
-        # Obtenir les identifiants de documents pour le premier terme
-        doc_ids = {doc_id for doc_id, _ in self.index.get_documents_for_term(terms[0])}
-
-        # Intersection avec les identifiants pour les autres termes
-        for term in terms[1:]:
-            term_doc_ids = {doc_id for doc_id, _ in self.index.get_documents_for_term(term)}
-            doc_ids = doc_ids.intersection(term_doc_ids)
-
-            # Arrêt anticipé si l'intersection est vide
-            if not doc_ids:
-                return []
-
-        return list(doc_ids)
-
-    def search_any_term(self, terms: List[str]) -> List[str]:
-        """
-        Recherche les documents contenant AU MOINS UN des termes spécifiés (opération OU).
-
-        Args :
-            terms : Liste des termes à rechercher
-
-        Returns :
-            Liste des identifiants de documents contenant au moins un terme
-        """
-        doc_ids = set()
-
-        # Union des identifiants de documents pour tous les termes
-        for term in terms:
-            term_doc_ids = {doc_id for doc_id, _ in self.index.get_documents_for_term(term)}
-            doc_ids = doc_ids.union(term_doc_ids)
-
-        return list(doc_ids)
-
-    def calculate_relevance_scores(self, terms: List[str], doc_ids: List[str]) -> Dict[str, float]:
-        """
-        Calcule les scores de pertinence des documents en fonction de la fréquence des termes.
-
-        Args :
-            terms : Liste des termes de la requête
-            doc_ids : Liste des identifiants de documents à scorer
-
-        Returns :
-            Dictionnaire associant les identifiants de documents à leur score de pertinence
-        """
-        scores = {}
-
-        for doc_id in doc_ids:
-            # Score simple basé sur la fréquence des termes : somme des fréquences
-            score = sum(self.index.get_term_frequency(term, doc_id) for term in terms)
-            scores[doc_id] = score
-
-        return scores
-
-    def search(self, query: str, use_all_terms: bool = True) -> List[Tuple[str, float]]:
-        """
-        Recherche les documents correspondant à la requête et retourne les résultats classés.
-
-        Args :
-            query : Chaîne de requête de recherche
-            use_all_terms : Si True, les documents doivent contenir tous les termes (recherche ET)
-                            Si False, les documents peuvent contenir n'importe quel terme (recherche OU)
-
-        Returns :
-            Liste de tuples (id_doc, score) triés par score de pertinence (décroissant)
-        """
-        # Prétraiter la requête comme les documents
-        terms = query.lower().split()
-
-        # Trouver les documents correspondants
-        if use_all_terms:
-            doc_ids = self.search_all_terms(terms)
-        else:
-            doc_ids = self.search_any_term(terms)
-
-        # Calculer les scores de pertinence
-        scores = self.calculate_relevance_scores(terms, doc_ids)
-
-        # Trier les résultats par score décroissant
-        ranked_results = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-
-        return ranked_results
\ No newline at end of file
+"""
+Module pour implémenter des algorithmes de recherche utilisant l'index inversé.
+
+Ce module fournit des fonctionnalités pour :
+1. Rechercher des mots simples dans l'index
+2. Rechercher plusieurs mots (intersection ou union des listes de documents)
+3. Calculer les scores de pertinence pour les résultats de recherche
+4. Ne retenir que les k meilleurs résultats avec un tas borné, en élaguant les
+   documents qui ne peuvent plus y entrer (MaxScore)
+5. Évaluer les expressions exactes et les requêtes de proximité (NEAR/k) à partir
+   des positions stockées dans l'index
+6. Traiter des lots de requêtes en ne lisant qu'une fois les postings de chaque terme,
+   éventuellement répartis sur un pool de threads ou de processus
+7. Développer les motifs à jokers en un nombre limité de termes de l'index et, en
+   recherche approchée, chaque terme en termes proches tolérant des fautes de frappe
+"""
+
+import heapq
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple, Union
+
+import metrics
+from indexer import InvertedIndex
+from postings import PostingsList, contains_phrase, gallop, intersect_sorted, within_distance
+from query_parser import ParsedQuery, parse_query
+from scoring import Scorer, get_scorer
+from term_dictionary import MAX_EXPANSIONS
+
+# Coût relatif d'une recherche galopante face au parcours d'un posting :
+# au-delà, il est plus rapide de parcourir toute la liste
+BISECT_COST = 16
+
+
+class SearchEngine:
+    """Classe pour rechercher des documents à l'aide d'un index inversé."""
+
+    def __init__(self, index: InvertedIndex, scorer: Union[str, Scorer] = "bm25",
+                 max_expansions: int = MAX_EXPANSIONS, fuzzy_distance: int = 0):
+        """
+        Initialise le moteur de recherche avec un index inversé.
+
+        Args :
+            index : L'index inversé à utiliser pour les recherches
+            scorer : Fonction de classement, ou son nom ('frequence', 'tfidf' ou 'bm25')
+            max_expansions : Nombre maximal de termes retenus pour un motif à jokers ou un terme approché
+            fuzzy_distance : Nombre de fautes de frappe tolérées par terme (0 pour une recherche exacte)
+        """
+        self.index = index
+        self.scorer = get_scorer(scorer) if isinstance(scorer, str) else scorer
+        self.max_expansions = max_expansions
+        self.fuzzy_distance = fuzzy_distance
+        self._prefetched = None  # mot -> postings déjà lus, pendant un lot de requêtes
+
+    def parse_query(self, query: str) -> ParsedQuery:
+        """Analyse une requête avec le tokeniseur de l'index interrogé et développe ses motifs et termes approchés."""
+        return self.expand_query(parse_query(query, self.index.tokenizer, self.fuzzy_distance))
+
+    def expand_query(self, parsed: ParsedQuery) -> ParsedQuery:
+        """Développe sur place les motifs et les termes approchés d'une requête analysée, et la retourne."""
+        for pattern in parsed.wildcards:
+            parsed.expansions[pattern] = self.index.expand_terms(pattern, self.max_expansions)
+        for word in parsed.fuzzy:
+            parsed.expansions[word] = self.index.fuzzy_terms(word, self.fuzzy_distance, self.max_expansions)
+        return parsed
+
+    def _get_postings(self, term: str) -> PostingsList:
+        """Récupère les postings d'un terme, depuis ceux du lot en cours s'ils ont été lus."""
+        if self._prefetched is not None:
+            postings = self._prefetched.get(term)
+            if postings is not None:
+                return postings
+        return self.index.get_postings(term)
+
+    def search_single_term(self, term: str) -> List[Tuple[str, List[int]]]:
+        """
+        Recherche les documents contenant un terme unique.
+
+        Args :
+            term : Le terme à rechercher
+
+        Returns :
+            Liste de tuples (id_doc, positions) pour les documents contenant le terme
+        """
+        return self.index.get_documents_for_term(term)
+
+    def search_all_terms(self, terms: List[str]) -> List[str]:
+        """
+        Recherche les documents contenant TOUS les termes spécifiés (opération ET).
+
+        Args :
+            terms : Liste des termes à rechercher
+
+        Returns :
+            Liste des identifiants de documents contenant tous les termes
+        """
+        doc_names = self.index.doc_names
+        return [doc_names[number] for number in self._match_all_terms(terms)]
+
+    @metrics.timed("search_all_terms")
+    def _match_all_terms(self, terms: List[str]) -> List[int]:
+        """
+        Intersecte les postings des termes, du plus rare au plus fréquent.
+
+        Returns :
+            Liste triée des numéros de documents contenant tous les termes
+        """
+        if not terms:
+            return []
+        doc_id_lists = []
+        for term in terms:
+            postings = self._get_postings(term)
+            # Arrêt anticipé si un terme est absent
+            if not len(postings):
+                return []
+            doc_id_lists.append(postings.doc_ids)
+        return intersect_sorted(doc_id_lists)
+
+    def search_phrase(self, words: List[str]) -> List[str]:
+        """
+        Recherche les documents contenant une expression exacte (mots consécutifs, dans l'ordre).
+
+        Args :
+            words : Mots de l'expression
+
+        Returns :
+            Liste des identifiants de documents contenant l'expression
+        """
+        doc_names = self.index.doc_names
+        return [doc_names[number] for number in self._match_phrase(words)]
+
+    def search_near(self, left: str, right: str, distance: int) -> List[str]:
+        """
+        Recherche les documents où deux termes sont à au plus distance positions l'un de l'autre.
+
+        Args :
+            left : Premier terme
+            right : Second terme
+            distance : Écart maximal entre les positions des deux termes
+
+        Returns :
+            Liste des identifiants de documents satisfaisant la contrainte de proximité
+        """
+        doc_names = self.index.doc_names
+        return [doc_names[number] for number in self._match_near(left, right, distance)]
+
+    def _matching_positions(self, words: List[str]):
+        """
+        Parcourt les documents contenant tous les mots avec leurs listes de positions.
+
+        Returns :
+            Itérateur de tuples (numéro de document, [positions de chaque mot])
+        """
+        postings_lists = [self._get_postings(word) for word in words]
+        if any(not len(postings) for postings in postings_lists):
+            return
+        cursors = [0] * len(postings_lists)
+        for number in intersect_sorted([postings.doc_ids for postings in postings_lists]):
+            position_lists = []
+            for i, postings in enumerate(postings_lists):
+                cursors[i] = cursor = gallop(postings.doc_ids, number, cursors[i])
+                position_lists.append(postings.positions_at(cursor))
+            yield number, position_lists
+
+    def _match_phrase(self, words: List[str]) -> List[int]:
+        """Retourne les numéros des documents contenant l'expression exacte."""
+        return [number for number, position_lists in self._matching_positions(words)
+                if contains_phrase(position_lists)]
+
+    def _match_near(self, left: str, right: str, distance: int) -> List[int]:
+        """Retourne les numéros des documents satisfaisant la contrainte de proximité."""
+        return [number for number, (left_positions, right_positions) in self._matching_positions([left, right])
+                if within_distance(left_positions, right_positions, distance)]
+
+    @metrics.timed("match_query")
+    def _match_query(self, parsed: ParsedQuery, use_all_terms: bool) -> List[int]:
+        """
+        Évalue les clauses d'une requête (termes, expressions, proximités).
+
+        Args :
+            parsed : La requête analysée
+            use_all_terms : Si True, toutes les clauses doivent être satisfaites ; sinon au moins une
+
+        Returns :
+            Liste triée des numéros de documents correspondants
+        """
+        clauses = [self._match_phrase(words) for words in parsed.phrases]
+        clauses.extend(self._match_near(left, right, distance) for left, right, distance in parsed.proximities)
+        clauses.extend(self._match_any_term(parsed.expansions[pattern]) for pattern in parsed.expanded())
+        if use_all_terms:
+            if parsed.terms:
+                clauses.append(self._match_all_terms(parsed.terms))
+            return intersect_sorted(clauses)
+        matches = set()
+        for clause in clauses:
+            matches.update(clause)
+        for term in parsed.terms:
+            matches.update(self._get_postings(term).doc_ids)
+        return sorted(matches)
+
+    def _match_any_term(self, terms: List[str]) -> List[int]:
+        """Retourne les numéros triés des documents contenant au moins un des termes (motif ou terme approché développé)."""
+        matches = set()
+        for term in terms:
+            matches.update(self._get_postings(term).doc_ids)
+        return sorted(matches)
+
+    def search_any_term(self, terms: List[str]) -> List[str]:
+        """
+        Recherche les documents contenant AU MOINS UN des termes spécifiés (opération OU).
+
+        Args :
+            terms : Liste des termes à rechercher
+
+        Returns :
+            Liste des identifiants de documents contenant au moins un terme
+        """
+        doc_ids = set()
+
+        # Union des identifiants de documents pour tous les termes
+        for term in terms:
+            term_doc_ids = {doc_id for doc_id, _ in self.index.get_documents_for_term(term)}
+            doc_ids = doc_ids.union(term_doc_ids)
+
+        return list(doc_ids)
+
+    def calculate_relevance_scores(self, terms: List[str], doc_ids: List[str]) -> Dict[str, float]:
+        """
+        Calcule les scores de pertinence des documents avec la fonction de classement.
+
+        Args :
+            terms : Liste des termes de la requête
+            doc_ids : Liste des identifiants de documents à scorer
+
+        Returns :
+            Dictionnaire associant les identifiants de documents à leur score de pertinence
+        """
+        doc_numbers = self.index.doc_numbers
+        candidates = {doc_numbers[doc_id] for doc_id in doc_ids if doc_id in doc_numbers}
+        doc_names = self.index.doc_names
+        scores = self._score(terms, candidates)
+        return {doc_names[number]: score for number, score in scores.items()}
+
+    @metrics.timed("calculate_relevance_scores")
+    def _score(self, terms: List[str], candidates) -> Dict[int, float]:
+        """
+        Calcule les scores par numéro de document, en une boucle sur les postings de chaque terme.
+
+        Args :
+            terms : Liste des termes de la requête
+            candidates : Numéros des documents à scorer, ou None pour tous les documents
+                         contenant au moins un terme
+
+        Returns :
+            Dictionnaire associant les numéros de documents à leur score
+        """
+        self.scorer.prepare(self.index)
+        if candidates is None:
+            scores = {}
+        else:
+            # Les documents candidats ne contenant aucun terme gardent un score nul
+            scores = dict.fromkeys(candidates, 0.0)
+        for term in terms:
+            postings = self._get_postings(term)
+            idf = self.scorer.term_idf(term, postings)
+            if candidates is not None and len(candidates) * BISECT_COST < len(postings):
+                # Peu de candidats : les chercher plutôt que parcourir toute la liste
+                self._accumulate_by_lookup(postings, candidates, scores, idf)
+            else:
+                self.scorer.accumulate(postings, candidates, scores, idf)
+        return scores
+
+    @metrics.timed("top_k_any_terms")
+    def top_k_any_terms(self, terms: List[str], k: int) -> List[Tuple[int, float]]:
+        """
+        Retourne les k documents de meilleur score contenant au moins un terme (MaxScore).
+
+        Variante « terme par terme » de MaxScore : les listes de postings sont
+        traitées par contribution maximale décroissante (termes rares d'abord).
+        Dès que la somme des contributions maximales des listes restantes ne
+        dépasse plus le k-ième score partiel, aucun nouveau document ne peut
+        entrer dans les k meilleurs : les listes restantes (les plus longues) ne
+        sont plus parcourues, seuls les documents encore en course y sont
+        recherchés par recherche galopante, et ceux qui ne peuvent plus atteindre le
+        seuil sont écartés au fil des listes.
+
+        Args :
+            terms : Liste des termes de la requête
+            k : Nombre de résultats à retourner
+
+        Returns :
+            Liste de tuples (numéro de document, score) triés par score décroissant
+        """
+        scorer = self.scorer
+        scorer.prepare(self.index)
+        lists = []
+        for term in terms:
+            postings = self._get_postings(term)
+            if len(postings):
+                lists.append((scorer.upper_bound(term, postings), scorer.term_idf(term, postings), postings))
+        if k <= 0 or not lists:
+            return []
+        lists.sort(key=itemgetter(0), reverse=True)
+        # remaining_bounds[i] : score maximal apporté par les listes i et suivantes
+        remaining_bounds = list(itertools.accumulate(bound for bound, _, _ in reversed(lists)))[::-1] + [0.0]
+
+        scores = {}
+        candidates = None  # documents encore en course, une fois l'élagage commencé
+        for i, (_, idf, postings) in enumerate(lists):
+            if len(scores) >= k:
+                threshold = heapq.nlargest(k, scores.values())[-1]
+                if candidates is None and remaining_bounds[i] <= threshold:
+                    candidates = set(scores)
+                if candidates is not None:
+                    bound = remaining_bounds[i]
+                    candidates = {doc_id for doc_id in candidates if scores[doc_id] + bound > threshold}
+
+            if candidates is None:
+                scorer.accumulate(postings, None, scores, idf)
+            elif len(candidates) * BISECT_COST < len(postings):
+                self._accumulate_by_lookup(postings, candidates, scores, idf)
+            else:
+                scorer.accumulate(postings, candidates, scores, idf)
+
+        pool = scores.items() if candidates is None else ((doc_id, scores[doc_id]) for doc_id in candidates)
+        return heapq.nlargest(k, pool, key=itemgetter(1))
+
+    def _accumulate_by_lookup(self, postings, candidates, scores: Dict[int, float], idf: float):
+        """Ajoute la contribution d'un terme en cherchant chaque candidat par recherche galopante."""
+        scorer = self.scorer
+        doc_ids = postings.doc_ids
+        offsets = postings.offsets
+        size = len(doc_ids)
+        cursor = 0
+        for doc_id in sorted(candidates):
+            cursor = gallop(doc_ids, doc_id, cursor)
+            if cursor == size:
+                break
+            if doc_ids[cursor] == doc_id:
+                scores[doc_id] += scorer.posting_score(idf, offsets[cursor + 1] - offsets[cursor], doc_id)
+
+    def search(self, query: str, use_all_terms: bool = True, top_k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Recherche les documents correspondant à la requête et retourne les résultats classés.
+
+        Args :
+            query : Chaîne de requête de recherche
+            use_all_terms : Si True, les documents doivent contenir tous les termes (recherche ET)
+                            Si False, les documents peuvent contenir n'importe quel terme (recherche OU)
+            top_k : Si indiqué, seuls les top_k meilleurs résultats sont calculés et retournés
+
+        Returns :
+            Liste de tuples (id_doc, score) triés par score de pertinence (décroissant)
+        """
+        # Prétraiter la requête comme les documents
+        return self.search_parsed(self.parse_query(query), use_all_terms, top_k)
+
+    @metrics.timed("search")
+    def search_parsed(self, parsed: ParsedQuery, use_all_terms: bool = True,
+                      top_k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Recherche les documents correspondant à une requête déjà analysée et développée.
+
+        Args :
+            parsed : Requête retournée par parse_query (ou développée par expand_query)
+            use_all_terms : Si True, recherche ET ; sinon, recherche OU
+            top_k : Si indiqué, seuls les top_k meilleurs résultats sont calculés et retournés
+
+        Returns :
+            Liste de tuples (id_doc, score) triés par score de pertinence (décroissant)
+        """
+        terms = parsed.all_terms()
+        doc_names = self.index.doc_names
+
+        # Trouver les documents correspondants et calculer leurs scores ; en mode OU,
+        # les documents sont ceux rencontrés dans les postings, sans ensemble intermédiaire
+        if not parsed.is_simple():
+            # Expressions exactes et proximités : les positions filtrent les candidats
+            scores = self._score(terms, set(self._match_query(parsed, use_all_terms)))
+        elif top_k is not None and not use_all_terms:
+            return [(doc_names[number], score) for number, score in self.top_k_any_terms(terms, top_k)]
+        elif use_all_terms:
+            scores = self._score(terms, set(self._match_all_terms(terms)))
+        else:
+            scores = self._score(terms, None)
+
+        # Trier les résultats par score décroissant, ou ne garder que les meilleurs avec un tas
+        if top_k is not None:
+            best = heapq.nlargest(top_k, scores.items(), key=itemgetter(1))
+        else:
+            best = sorted(scores.items(), key=itemgetter(1), reverse=True)
+        ranked_results = [(doc_names[number], score) for number, score in best]
+
+        return ranked_results
+
+    @metrics.timed("search_many")
+    def search_many(self, queries: List[str], use_all_terms: bool = True, top_k: Optional[int] = None,
+                    workers: int = 1, use_processes: bool = False,
+                    parsed_queries: Optional[Dict[str, ParsedQuery]] = None) -> List[List[Tuple[str, float]]]:
+        """
+        Recherche un lot de requêtes.
+
+        Les requêtes identiques (une fois normalisées) ne sont évaluées qu'une
+        fois, et les postings de chaque terme du lot ne sont lus qu'une fois
+        puis partagés par toutes les requêtes qui l'utilisent.
+
+        Avec plusieurs threads, l'index est partagé tel quel en lecture seule.
+        Avec plusieurs processus, les processus sont créés par fork et héritent
+        de l'index sans le copier ni le sérialiser (non disponible sous Windows).
+
+        Args :
+            queries : Chaînes de requête de recherche
+            use_all_terms : Si True, recherche ET ; sinon, recherche OU
+            top_k : Si indiqué, seuls les top_k meilleurs résultats de chaque requête sont retournés
+            workers : Nombre de threads ou de processus à utiliser
+            use_processes : Si True, les requêtes sont réparties sur des processus plutôt que des threads
+            parsed_queries : Dictionnaire à compléter avec la requête analysée et développée de chaque
+                             requête (pour ses termes à mettre en évidence, par exemple), ou None
+
+        Returns :
+            Les résultats de chaque requête, dans l'ordre des requêtes
+        """
+        # Chaque requête n'est analysée qu'une fois ; une seule évaluation par requête distincte
+        keys = {}  # requête -> clé de la requête analysée
+        unique_queries = {}  # clé -> requête analysée
+        for query in queries:
+            if query not in keys:
+                parsed = self.parse_query(query)
+                keys[query] = key = parsed.cache_key()
+                unique_queries.setdefault(key, parsed)
+                if parsed_queries is not None:
+                    parsed_queries[query] = parsed
+        distinct = list(unique_queries.values())
+
+        workers = max(1, min(workers, len(distinct)))
+        if workers == 1 or not use_processes:
+            batch = self._batch_engine(distinct)
+            if workers == 1:
+                results = [batch.search_parsed(parsed, use_all_terms, top_k) for parsed in distinct]
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(lambda parsed: batch.search_parsed(parsed, use_all_terms, top_k),
+                                                distinct))
+        else:
+            # Des tranches contiguës, une par tâche, pour que chaque processus
+            # partage les postings des termes communs à ses requêtes
+            chunk_size = -(-len(distinct) // (workers * 4))
+            chunks = [distinct[i:i + chunk_size] for i in range(0, len(distinct), chunk_size)]
+            context = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                     initializer=_init_worker, initargs=(self,)) as executor:
+                results = []
+                for chunk_results in executor.map(_search_chunk, chunks,
+                                                  itertools.repeat(use_all_terms), itertools.repeat(top_k)):
+                    results.extend(chunk_results)
+
+        results_by_key = {key: result for key, result in zip(unique_queries, results)}
+        return [list(results_by_key[keys[query]]) for query in queries]
+
+    def _batch_engine(self, queries: List[ParsedQuery]) -> 'SearchEngine':
+        """
+        Prépare un moteur partageant cet index et ce classement, avec les
+        postings de tous les termes des requêtes analysées déjà lus.
+        """
+        terms = set()
+        for parsed in queries:
+            terms.update(parsed.all_terms())
+        batch = SearchEngine(self.index, self.scorer, self.max_expansions, self.fuzzy_distance)
+        batch._prefetched = {term: self.index.get_postings(term) for term in terms}
+        self.scorer.prepare(self.index)
+        return batch
+
+
+# Moteur de recherche d'un processus de travail de search_many, hérité par fork
+_worker_engine = None
+
+
+def _init_worker(engine: SearchEngine):
+    global _worker_engine
+    _worker_engine = engine
+
+
+def _search_chunk(queries: List[ParsedQuery], use_all_terms: bool,
+                  top_k: Optional[int]) -> List[List[Tuple[str, float]]]:
+    batch = _worker_engine._batch_engine(queries)
+    return [batch.search_parsed(parsed, use_all_terms, top_k) for parsed in queries]
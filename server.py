@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+"""
+Serveur HTTP/JSON de recherche pour TextIndexerPy.
+
+Ce module fournit des fonctionnalités pour :
+1. Construire ou recharger l'index d'un répertoire une seule fois, puis le garder en mémoire
+2. Répondre en JSON aux requêtes HTTP de recherche et de statistiques, avec asyncio
+3. Exécuter les recherches et les statistiques dans un pool de threads, pour que la
+   boucle d'événements continue d'accepter les connexions pendant les calculs
+
+Routes :
+    GET /search?q=...&mode=et|ou&k=10     résultats classés, avec extraits
+    GET /stats?limit=10                   statistiques générales et mots les plus fréquents
+    GET /documents/<id_doc>?limit=5       statistiques d'un document
+    GET /health                           état du serveur
+    GET /metrics                          mesures au format texte de Prometheus (durées des étapes
+                                          avec --metrics, mémoire de l'index, caches)
+
+Usage :
+    python server.py dossier_de_textes/ --port 8080 [--metrics]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import document_loader
+import index_storage
+import metrics
+from incremental import IncrementalIndexer
+from indexer import InvertedIndex
+from retrieval import ResultRetriever
+from stats import Statistics
+
+# Taille maximale de la ligne de requête et des en-têtes HTTP
+MAX_HEADER_SIZE = 64 * 1024
+
+
+class HTTPError(Exception):
+    """Erreur retournée au client avec un code HTTP."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class SearchServer:
+    """Serveur asyncio répondant aux recherches sur un index partagé en lecture."""
+
+    def __init__(self, index: InvertedIndex, documents: Dict[str, str], scorer: str = "bm25",
+                 workers: int = 4):
+        """
+        Initialise le serveur avec un index déjà construit.
+
+        Args :
+            index : L'index inversé, partagé par toutes les requêtes
+            documents : Dictionnaire associant les identifiants de documents à leur contenu brut
+            scorer : Fonction de classement ('frequence', 'tfidf' ou 'bm25')
+            workers : Nombre de threads exécutant les recherches
+        """
+        self.index = index
+        self.documents = documents
+        self.retriever = ResultRetriever(index, documents, scorer)
+        self.stats = Statistics(index, documents)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search")
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+        """
+        Démarre l'écoute des connexions.
+
+        Args :
+            host : Adresse d'écoute
+            port : Port d'écoute (0 pour un port libre choisi par le système)
+
+        Returns :
+            Le serveur asyncio, déjà à l'écoute
+        """
+        self._server = await asyncio.start_server(self._handle_connection, host, port,
+                                                  limit=MAX_HEADER_SIZE)
+        return self._server
+
+    @property
+    def port(self) -> int:
+        """Port effectivement utilisé par le serveur démarré."""
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8080):
+        """Démarre le serveur et répond aux requêtes jusqu'à son arrêt."""
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def close(self):
+        """Arrête l'écoute et libère le pool de threads."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Traite les requêtes successives d'une connexion (keep-alive HTTP/1.1)."""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+                    break
+                method, target, version, headers = request
+                keep_alive = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close")
+                try:
+                    if method != "GET":
+                        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"Méthode non prise en charge : {method}")
+                    status, body = HTTPStatus.OK, await self._dispatch(target)
+                except HTTPError as e:
+                    status, body = e.status, {"erreur": e.message}
+                except Exception as e:
+                    status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"erreur": str(e)}
+                self._write_response(writer, status, body, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, str, Dict[str, str]]:
+        """
+        Lit la ligne de requête et les en-têtes HTTP.
+
+        Le corps éventuel est lu et ignoré : toutes les routes sont en GET.
+
+        Returns :
+            Tuple (méthode, cible, version, en-têtes en minuscules)
+        """
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if length:
+            await reader.readexactly(length)
+        return method, target, version, headers
+
+    async def _dispatch(self, target: str) -> Union[dict, str]:
+        """Exécute la route demandée dans le pool de threads et retourne le corps de la réponse (JSON, ou texte)."""
+        url = urlsplit(target)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        path = url.path.rstrip("/") or "/"
+
+        if path == "/health":
+            return {"statut": "ok", "documents": len(self.index.doc_numbers), "version": self.index.version}
+        if path == "/search":
+            query = params.get("q", "")
+            if not query.strip():
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Paramètre q manquant")
+            use_all_terms = params.get("mode", "et").lower() != "ou"
+            limit = _int_param(params, "k", 10)
+            return await self._run(self._search, query, use_all_terms, limit)
+        if path == "/stats":
+            return await self._run(self._general_stats, _int_param(params, "limit", 10))
+        if path == "/metrics":
+            return await self._run(metrics.METRICS.to_prometheus, self.index, self.retriever.cache_stats())
+        if path.startswith("/documents/"):
+            doc_id = unquote(path[len("/documents/"):])
+            return await self._run(self._document_stats, doc_id, _int_param(params, "limit", 5))
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"Route inconnue : {url.path}")
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    def _search(self, query: str, use_all_terms: bool, limit: int) -> dict:
+        ranked, query_terms = self.retriever.search_with_highlights(query, use_all_terms, limit)
+        results = []
+        for doc_id, score in ranked:
+            results.append({
+                "document": doc_id,
+                "score": score,
+                "extrait": self.retriever.get_multi_term_snippet(doc_id, query_terms),
+            })
+        return {"requete": query, "mode": "ET" if use_all_terms else "OU", "resultats": results}
+
+    def _general_stats(self, limit: int) -> dict:
+        doc_count = self.stats.get_document_count()
+        total_words = self.stats.get_total_word_count()
+        return {
+            "documents": doc_count,
+            "mots_uniques": self.stats.get_unique_word_count(),
+            "mots_total": total_words,
+            "moyenne_mots_par_document": total_words / doc_count if doc_count else 0.0,
+            "mots_frequents": self.stats.get_most_frequent_words(limit),
+        }
+
+    def _document_stats(self, doc_id: str, limit: int) -> dict:
+        if doc_id not in self.index.doc_numbers:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Document '{doc_id}' introuvable.")
+        return {
+            "document": doc_id,
+            "mots": self.index.get_document_length(doc_id),
+            "mots_frequents": self.stats.get_document_most_frequent_words(doc_id, limit),
+        }
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: HTTPStatus, body: Union[dict, str], keep_alive: bool):
+        if isinstance(body, str):
+            payload = body.encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + payload)
+
+
+def _int_param(params: Dict[str, str], name: str, default: int) -> int:
+    """Lit un paramètre entier de l'URL."""
+    value = params.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Paramètre {name} invalide : {value}")
+
+
+def main():
+    """Construit ou recharge l'index d'un répertoire puis démarre le serveur."""
+    parser = argparse.ArgumentParser(description="Serveur HTTP/JSON de recherche pour TextIndexerPy")
+    parser.add_argument("directory", help="dossier contenant les fichiers texte à indexer")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--scorer", default="bm25", help="frequence, tfidf ou bm25")
+    parser.add_argument("--threads", type=int, default=4, help="threads exécutant les recherches")
+    parser.add_argument("--workers", type=int, default=1, help="processus pour l'indexation")
+    parser.add_argument("--metrics", action="store_true", help="mesure la durée des étapes (exportée par /metrics)")
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.enable()
+
+    try:
+        documents = document_loader.DocumentStore(args.directory)
+        index_path = os.path.join(args.directory, index_storage.INDEX_FILENAME)
+        updater = IncrementalIndexer.open(args.directory, index_path, args.workers)
+        changes = updater.refresh()
+        print(f"Index à jour ({changes}).")
+        for error in changes.errors:
+            print(f"Fichier illisible : {error}")
+        if changes:
+            try:
+                updater.save(index_path)
+            except OSError as e:
+                print(f"Impossible d'enregistrer l'index : {e}")
+    except Exception as e:
+        print(f"Erreur lors de la construction de l'index : {e}")
+        return 1
+
+    server = SearchServer(updater.index, documents, args.scorer, args.threads)
+    print(f"Serveur à l'écoute sur http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,499 @@
+"""
+Module de l'index fragmenté et de la recherche répartie entre les fragments.
+
+Ce module fournit des fonctionnalités pour :
+1. Répartir les documents entre N fragments (shards), chacun avec son propre index
+   inversé, selon une empreinte stable de leur identifiant
+2. Faire tourner chaque fragment dans le processus courant ou dans un processus de
+   travail, qui tient lieu de nœud distant : les échanges ne passent que par des
+   messages sérialisés
+3. Diffuser les requêtes à tous les fragments en deux temps : collecte des statistiques
+   de la collection (nombre de documents, nombre de tokens, nombre de documents par
+   terme), puis recherche avec ces statistiques globales, pour que les scores soient
+   ceux d'un index unique
+4. Fusionner les meilleurs résultats de chaque fragment
+"""
+
+import heapq
+import itertools
+import multiprocessing
+import os
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from indexer import InvertedIndex
+from scoring import CollectionStatistics
+from search_engine import SearchEngine
+from term_dictionary import MAX_EXPANSIONS
+from tokenizer import Tokenizer
+
+# Nombre de documents envoyés à la fois à un fragment pendant la construction
+SHARD_BATCH_SIZE = 500
+
+# Nom des fichiers d'index des fragments dans le répertoire d'un index fragmenté
+SHARD_FILE = "shard_{:03d}.idx"
+
+
+def shard_of(doc_id: str, shard_count: int) -> int:
+    """
+    Retourne le fragment d'un document.
+
+    L'empreinte CRC-32 de l'identifiant ne dépend ni du processus ni de
+    l'ordre d'ajout : un document remplacé ou supprimé est toujours adressé au
+    fragment qui le contient.
+
+    Args :
+        doc_id : Identifiant du document
+        shard_count : Nombre de fragments
+
+    Returns :
+        Le numéro du fragment, de 0 à shard_count - 1
+    """
+    return zlib.crc32(doc_id.encode("utf-8")) % shard_count
+
+
+class Shard:
+    """
+    Fragment d'un index fragmenté : un index inversé et ses moteurs de recherche.
+
+    Les méthodes publiques sont les commandes reçues du coordinateur ; leurs
+    arguments et résultats sont de simples valeurs sérialisables.
+    """
+
+    def __init__(self, index: InvertedIndex):
+        """
+        Initialise le fragment.
+
+        Args :
+            index : L'index des documents du fragment
+        """
+        self.index = index
+        self._engines = {}  # (classement, développements, distance) -> SearchEngine
+
+    def _engine(self, scorer: str, max_expansions: int, fuzzy_distance: int) -> SearchEngine:
+        key = (scorer, max_expansions, fuzzy_distance)
+        engine = self._engines.get(key)
+        if engine is None:
+            engine = self._engines[key] = SearchEngine(self.index, scorer, max_expansions, fuzzy_distance)
+        return engine
+
+    def add_documents(self, documents: List[Tuple[str, str]]):
+        """Ajoute (ou remplace) des documents dans l'index du fragment."""
+        self.index.build_index_from_stream(documents)
+
+    def remove_document(self, doc_id: str):
+        """Retire un document de l'index du fragment."""
+        self.index.remove_document(doc_id)
+
+    def document_count(self) -> int:
+        """Retourne le nombre de documents du fragment."""
+        return len(self.index.doc_numbers)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Retourne l'empreinte mémoire de l'index du fragment (voir InvertedIndex.memory_usage)."""
+        return self.index.memory_usage()
+
+    def save(self, path: str):
+        """Enregistre l'index du fragment."""
+        self.index.save(path)
+
+    def statistics(self, queries: List[str], max_expansions: int, fuzzy_distance: int) -> CollectionStatistics:
+        """
+        Retourne les statistiques du fragment utiles au classement d'un lot de requêtes.
+
+        Args :
+            queries : Chaînes de requête
+            max_expansions : Nombre maximal de termes retenus pour un motif ou un terme approché
+            fuzzy_distance : Nombre de fautes de frappe tolérées par terme
+
+        Returns :
+            Nombre de documents et de tokens du fragment, et nombre de documents de
+            chaque terme des requêtes présent dans le fragment
+        """
+        # L'analyse des requêtes ne dépend pas du classement
+        engine = self._engine("frequence", max_expansions, fuzzy_distance)
+        terms = set()
+        for query in queries:
+            terms.update(engine.parse_query(query).all_terms())
+        index = self.index
+        frequencies = {}
+        for term in terms:
+            frequency = index.document_frequency(term)
+            if frequency:
+                frequencies[term] = frequency
+        return CollectionStatistics(len(index.doc_numbers), index.total_tokens, frequencies)
+
+    def search(self, queries: List[str], use_all_terms: bool, top_k: Optional[int],
+               statistics: CollectionStatistics, scorer: str, max_expansions: int,
+               fuzzy_distance: int) -> List[List[Tuple[str, float]]]:
+        """
+        Recherche un lot de requêtes dans le fragment, classées selon les statistiques globales.
+
+        Args :
+            queries : Chaînes de requête
+            use_all_terms : Si True, recherche ET ; sinon, recherche OU
+            top_k : Si indiqué, seuls les top_k meilleurs résultats de chaque requête sont retournés
+            statistics : Statistiques de toute la collection
+            scorer : Nom de la fonction de classement
+            max_expansions : Nombre maximal de termes retenus pour un motif ou un terme approché
+            fuzzy_distance : Nombre de fautes de frappe tolérées par terme
+
+        Returns :
+            Les résultats de chaque requête, triés par score décroissant
+        """
+        engine = self._engine(scorer, max_expansions, fuzzy_distance)
+        engine.scorer.use_statistics(statistics)
+        return engine.search_many(queries, use_all_terms, top_k)
+
+    def close(self):
+        """Libère l'index du fragment."""
+        self.index.close()
+
+
+class LocalShard:
+    """Fragment exécuté dans le processus courant, derrière la même interface qu'un fragment distant."""
+
+    def __init__(self, shard: Shard):
+        self.shard = shard
+        self._result = None
+
+    def send(self, command: str, *args):
+        """Exécute une commande du fragment ; son résultat est retourné par receive."""
+        self._result = getattr(self.shard, command)(*args)
+
+    def receive(self):
+        """Retourne le résultat de la dernière commande."""
+        result, self._result = self._result, None
+        return result
+
+    def close(self):
+        """Libère le fragment."""
+        self.shard.close()
+
+
+class ProcessShard:
+    """
+    Fragment exécuté dans un processus de travail, qui tient lieu de nœud distant.
+
+    Les commandes et leurs résultats passent par un tube ; une commande envoyée
+    s'exécute pendant que le coordinateur envoie les suivantes aux autres
+    fragments. Les exceptions levées par le fragment sont relancées par receive.
+    """
+
+    def __init__(self, tokenizer: Optional[Tokenizer] = None, path: Optional[str] = None):
+        """
+        Démarre le processus du fragment.
+
+        Args :
+            tokenizer : Tokeniseur d'un nouvel index vide
+            path : Fichier d'index à charger plutôt que de créer un index vide
+        """
+        connection, child_connection = multiprocessing.Pipe()
+        self._connection = connection
+        self._process = multiprocessing.Process(target=_serve_shard, args=(child_connection, tokenizer, path),
+                                                daemon=True)
+        self._process.start()
+        child_connection.close()
+
+    def send(self, command: str, *args):
+        """Envoie une commande au fragment, sans attendre son résultat."""
+        self._connection.send((command, args))
+
+    def receive(self):
+        """Attend et retourne le résultat de la dernière commande envoyée."""
+        succeeded, result = self._connection.recv()
+        if not succeeded:
+            raise result
+        return result
+
+    def close(self):
+        """Arrête le processus du fragment."""
+        if self._process.is_alive():
+            try:
+                self._connection.send(None)
+            except OSError:
+                pass
+            self._process.join()
+        self._connection.close()
+
+
+def _serve_shard(connection, tokenizer: Optional[Tokenizer], path: Optional[str]):
+    """Boucle d'un processus de fragment : exécute les commandes reçues jusqu'au message None."""
+    shard = Shard(InvertedIndex.load(path) if path is not None else InvertedIndex(tokenizer))
+    try:
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            command, args = message
+            try:
+                connection.send((True, getattr(shard, command)(*args)))
+            except Exception as e:
+                connection.send((False, e))
+    finally:
+        shard.close()
+        connection.close()
+
+
+class ShardedIndex:
+    """
+    Index réparti entre plusieurs fragments, chacun avec son propre index inversé.
+
+    Un document est toujours rangé dans le fragment désigné par shard_of ; les
+    fragments ne partagent aucune donnée et peuvent donc tourner dans des
+    processus, ou sur des machines, distincts.
+    """
+
+    def __init__(self, shard_count: int = 2, tokenizer: Tokenizer = None, processes: bool = False,
+                 paths: Optional[List[str]] = None):
+        """
+        Initialise les fragments.
+
+        Args :
+            shard_count : Nombre de fragments (ignoré si paths est indiqué)
+            tokenizer : Découpage et normalisation des documents et des requêtes
+            processes : Si True, chaque fragment tourne dans son propre processus
+            paths : Fichiers d'index des fragments à charger, dans l'ordre des fragments
+        """
+        if paths is not None:
+            shard_count = len(paths)
+        if shard_count < 1:
+            raise ValueError(f"Nombre de fragments invalide : {shard_count}")
+        paths = paths if paths is not None else [None] * shard_count
+        if processes:
+            self.shards = [ProcessShard(tokenizer, path) for path in paths]
+        else:
+            self.shards = [LocalShard(Shard(InvertedIndex.load(path) if path is not None
+                                            else InvertedIndex(tokenizer))) for path in paths]
+
+    def __len__(self) -> int:
+        return sum(self.scatter("document_count"))
+
+    def __enter__(self) -> 'ShardedIndex':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def scatter(self, command: str, *args) -> List:
+        """
+        Envoie une commande à tous les fragments, puis rassemble leurs résultats.
+
+        Args :
+            command : Nom de la méthode de Shard à exécuter
+            *args : Arguments de la commande
+
+        Returns :
+            Le résultat de chaque fragment, dans l'ordre des fragments
+        """
+        for shard in self.shards:
+            shard.send(command, *args)
+        # Tous les résultats sont lus, même après une erreur, pour que chaque
+        # réponse reste associée à sa commande
+        results = []
+        error = None
+        for shard in self.shards:
+            try:
+                results.append(shard.receive())
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+        return results
+
+    def build_index(self, documents: Dict[str, str]):
+        """
+        Ajoute une collection de documents aux fragments.
+
+        Args :
+            documents : Dictionnaire associant les identifiants de documents à leur contenu brut
+        """
+        self.build_index_from_stream(documents.items())
+
+    def build_index_from_stream(self, documents: Iterable[Tuple[str, str]], batch_size: int = SHARD_BATCH_SIZE):
+        """
+        Ajoute un flux de documents aux fragments, par lots.
+
+        Un fragment indexe un lot pendant que les suivants sont répartis ; au
+        plus un lot par fragment est en cours, pour que la lecture ne devance
+        pas trop l'indexation.
+
+        Args :
+            documents : Flux de tuples (id_doc, contenu brut)
+            batch_size : Nombre de documents envoyés à la fois à un fragment
+        """
+        shard_count = len(self.shards)
+        batches = [[] for _ in range(shard_count)]
+        pending = [False] * shard_count
+        try:
+            for doc_id, content in documents:
+                number = shard_of(doc_id, shard_count)
+                batch = batches[number]
+                batch.append((doc_id, content))
+                if len(batch) >= batch_size:
+                    if pending[number]:
+                        self.shards[number].receive()
+                    self.shards[number].send("add_documents", batch)
+                    pending[number] = True
+                    batches[number] = []
+            for number, batch in enumerate(batches):
+                if batch:
+                    if pending[number]:
+                        self.shards[number].receive()
+                    self.shards[number].send("add_documents", batch)
+                    pending[number] = True
+        finally:
+            for number, shard in enumerate(self.shards):
+                if pending[number]:
+                    shard.receive()
+
+    def add_document(self, doc_id: str, content: str):
+        """Ajoute (ou remplace) un document dans son fragment."""
+        shard = self.shards[shard_of(doc_id, len(self.shards))]
+        shard.send("add_documents", [(doc_id, content)])
+        shard.receive()
+
+    def remove_document(self, doc_id: str):
+        """Retire un document de son fragment."""
+        shard = self.shards[shard_of(doc_id, len(self.shards))]
+        shard.send("remove_document", doc_id)
+        shard.receive()
+
+    def memory_usage(self) -> List[Dict[str, int]]:
+        """Retourne l'empreinte mémoire de l'index de chaque fragment, en octets."""
+        return self.scatter("memory_usage")
+
+    def save(self, directory: str):
+        """
+        Enregistre l'index de chaque fragment dans un répertoire, en parallèle.
+
+        Args :
+            directory : Répertoire de l'index fragmenté (créé au besoin)
+        """
+        os.makedirs(directory, exist_ok=True)
+        for number, shard in enumerate(self.shards):
+            shard.send("save", os.path.join(directory, SHARD_FILE.format(number)))
+        for shard in self.shards:
+            shard.receive()
+
+    @classmethod
+    def load(cls, directory: str, processes: bool = False) -> 'ShardedIndex':
+        """
+        Charge un index fragmenté enregistré par save.
+
+        Args :
+            directory : Répertoire de l'index fragmenté
+            processes : Si True, chaque fragment est chargé dans son propre processus
+
+        Returns :
+            L'index fragmenté chargé
+        """
+        paths = []
+        while os.path.exists(os.path.join(directory, SHARD_FILE.format(len(paths)))):
+            paths.append(os.path.join(directory, SHARD_FILE.format(len(paths))))
+        if not paths:
+            raise FileNotFoundError(f"Aucun fragment d'index dans {directory}")
+        return cls(processes=processes, paths=paths)
+
+    def close(self):
+        """Arrête les fragments et libère leurs index."""
+        for shard in self.shards:
+            shard.close()
+
+
+class ShardedSearchEngine:
+    """
+    Moteur de recherche coordinateur d'un index fragmenté.
+
+    Une recherche se fait en deux allers-retours vers les fragments : chacun
+    retourne d'abord ses statistiques pour les termes des requêtes, que le
+    coordinateur additionne ; puis chacun classe ses documents avec ces
+    statistiques globales (idf et longueur moyenne de toute la collection) et
+    retourne ses top_k meilleurs résultats, fusionnés par le coordinateur.
+    Les scores sont ainsi ceux d'un index unique contenant tous les documents.
+
+    Les motifs à jokers et les termes approchés sont développés par chaque
+    fragment dans son propre vocabulaire ; la limite max_expansions s'applique
+    donc à chaque fragment plutôt qu'à la collection.
+    """
+
+    def __init__(self, index: ShardedIndex, scorer: str = "bm25",
+                 max_expansions: int = MAX_EXPANSIONS, fuzzy_distance: int = 0):
+        """
+        Initialise le coordinateur.
+
+        Args :
+            index : L'index fragmenté à interroger
+            scorer : Nom de la fonction de classement ('frequence', 'tfidf' ou 'bm25')
+            max_expansions : Nombre maximal de termes retenus pour un motif à jokers ou un terme approché
+            fuzzy_distance : Nombre de fautes de frappe tolérées par terme (0 pour une recherche exacte)
+        """
+        self.index = index
+        self.scorer = scorer
+        self.max_expansions = max_expansions
+        self.fuzzy_distance = fuzzy_distance
+
+    def collection_statistics(self, queries: List[str]) -> CollectionStatistics:
+        """
+        Rassemble les statistiques de toute la collection pour un lot de requêtes.
+
+        Args :
+            queries : Chaînes de requête
+
+        Returns :
+            Nombre de documents et de tokens de tous les fragments, et nombre de
+            documents de chaque terme des requêtes
+        """
+        document_count = 0
+        total_tokens = 0
+        frequencies = {}
+        for statistics in self.index.scatter("statistics", queries, self.max_expansions, self.fuzzy_distance):
+            document_count += statistics.document_count
+            total_tokens += statistics.total_tokens
+            for term, frequency in statistics.document_frequencies.items():
+                frequencies[term] = frequencies.get(term, 0) + frequency
+        return CollectionStatistics(document_count, total_tokens, frequencies)
+
+    def search(self, query: str, use_all_terms: bool = True, top_k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Recherche les documents correspondant à la requête dans tous les fragments.
+
+        Args :
+            query : Chaîne de requête de recherche
+            use_all_terms : Si True, recherche ET ; sinon, recherche OU
+            top_k : Si indiqué, seuls les top_k meilleurs résultats sont calculés et retournés
+
+        Returns :
+            Liste de tuples (id_doc, score) triés par score de pertinence (décroissant)
+        """
+        return self.search_many([query], use_all_terms, top_k)[0]
+
+    def search_many(self, queries: List[str], use_all_terms: bool = True,
+                    top_k: Optional[int] = None) -> List[List[Tuple[str, float]]]:
+        """
+        Recherche un lot de requêtes dans tous les fragments.
+
+        Le lot entier ne coûte que deux allers-retours vers chaque fragment,
+        quel que soit le nombre de requêtes.
+
+        Args :
+            queries : Chaînes de requête de recherche
+            use_all_terms : Si True, recherche ET ; sinon, recherche OU
+            top_k : Si indiqué, seuls les top_k meilleurs résultats de chaque requête sont retournés
+
+        Returns :
+            Les résultats de chaque requête, dans l'ordre des requêtes
+        """
+        if not queries:
+            return []
+        statistics = self.collection_statistics(queries)
+        shard_results = self.index.scatter("search", queries, use_all_terms, top_k, statistics,
+                                           self.scorer, self.max_expansions, self.fuzzy_distance)
+        results = []
+        for per_shard in zip(*shard_results):
+            merged = heapq.merge(*per_shard, key=lambda result: -result[1])
+            results.append(list(itertools.islice(merged, top_k)))
+        return results
@@ -0,0 +1,149 @@
+"""
+Module du dictionnaire trié des termes de l'index.
+
+Ce module fournit des fonctionnalités pour :
+1. Garder les termes de l'index triés, pour trouver par dichotomie tous les termes
+   commençant par un préfixe sans parcourir tout le vocabulaire
+2. Développer les motifs à jokers (* pour une suite de caractères quelconque, ? pour
+   un caractère) en la liste des termes de l'index qui leur correspondent
+3. Limiter le nombre de termes retenus pour un motif, afin qu'un motif trop large
+   (a*) ne transforme pas une requête en union de milliers de termes
+"""
+
+import heapq
+import re
+from bisect import bisect_left
+from typing import Callable, Iterator, List, Optional, Sequence, Set
+
+# Caractères jokers reconnus dans les requêtes
+WILDCARDS = "*?"
+
+# Nombre maximal de termes retenus pour un motif : au-delà, seuls les termes
+# présents dans le plus de documents sont gardés
+MAX_EXPANSIONS = 64
+
+_WILDCARD_PATTERN = re.compile(r"([*?])")
+
+
+def is_pattern(word: str) -> bool:
+    """Indique si un mot de requête contient un joker."""
+    return "*" in word or "?" in word
+
+
+def literal_prefix(pattern: str) -> str:
+    """Retourne la partie d'un motif précédant son premier joker."""
+    match = _WILDCARD_PATTERN.search(pattern)
+    return pattern[:match.start()] if match else pattern
+
+
+def compile_pattern(pattern: str):
+    """
+    Convertit un motif à jokers en expression régulière.
+
+    Args :
+        pattern : Motif (* pour une suite quelconque, éventuellement vide, ? pour un caractère)
+
+    Returns :
+        L'expression régulière compilée, à appliquer avec fullmatch
+    """
+    parts = []
+    for part in _WILDCARD_PATTERN.split(pattern):
+        if part == "*":
+            parts.append(".*")
+        elif part == "?":
+            parts.append(".")
+        else:
+            parts.append(re.escape(part))
+    return re.compile("".join(parts), re.DOTALL)
+
+
+def _prefix_successor(prefix: str) -> Optional[str]:
+    """Retourne la plus petite chaîne supérieure à toutes celles qui commencent par prefix."""
+    while prefix and ord(prefix[-1]) == 0x10FFFF:
+        prefix = prefix[:-1]
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class TermDictionary:
+    """
+    Vocabulaire trié de l'index.
+
+    Les termes sont répartis en une ou plusieurs suites triées (par exemple les
+    termes d'un fichier d'index, lus sans être chargés, et ceux ajoutés depuis),
+    dont certains termes peuvent avoir été retirés. L'ordre des chaînes Python
+    (par points de code) est aussi celui des octets UTF-8 du fichier d'index.
+    """
+
+    def __init__(self, runs: Sequence[Sequence[str]], removed: Set[str] = frozenset()):
+        """
+        Initialise le dictionnaire.
+
+        Args :
+            runs : Suites de termes triées, sans terme commun
+            removed : Termes à ignorer dans ces suites
+        """
+        self.runs = runs
+        self.removed = removed
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self.runs) - len(self.removed)
+
+    def iter_prefix(self, prefix: str) -> Iterator[str]:
+        """
+        Parcourt, dans l'ordre, les termes commençant par un préfixe.
+
+        Les bornes de la plage de termes sont trouvées par dichotomie dans
+        chaque suite ; seuls les termes de la plage sont lus.
+
+        Args :
+            prefix : Le préfixe (vide pour tous les termes)
+
+        Returns :
+            Itérateur des termes, triés
+        """
+        successor = _prefix_successor(prefix)
+        ranges = []
+        for run in self.runs:
+            start = bisect_left(run, prefix) if prefix else 0
+            end = bisect_left(run, successor, start) if successor is not None else len(run)
+            if start < end:
+                ranges.append(map(run.__getitem__, range(start, end)))
+        terms = heapq.merge(*ranges) if len(ranges) > 1 else (ranges[0] if ranges else iter(()))
+        if self.removed:
+            removed = self.removed
+            return (term for term in terms if term not in removed)
+        return terms
+
+    def expand(self, pattern: str, max_expansions: int = MAX_EXPANSIONS,
+               document_frequency: Optional[Callable[[str], int]] = None) -> List[str]:
+        """
+        Retourne les termes correspondant à un motif à jokers.
+
+        Seule la plage des termes commençant par la partie du motif précédant
+        le premier joker est parcourue ; un motif commençant par un joker
+        parcourt donc tout le vocabulaire.
+
+        Args :
+            pattern : Motif à jokers, normalisé comme les termes de l'index
+            max_expansions : Nombre maximal de termes retenus
+            document_frequency : Nombre de documents d'un terme, pour garder les
+                                 termes les plus fréquents quand le motif en donne
+                                 trop (les premiers dans l'ordre alphabétique si None)
+
+        Returns :
+            Liste triée des termes correspondants, au plus max_expansions
+        """
+        prefix = literal_prefix(pattern)
+        terms = self.iter_prefix(prefix)
+        rest = pattern[len(prefix):]
+        if rest != "*":
+            regex = compile_pattern(pattern)
+            terms = (term for term in terms if regex.fullmatch(term))
+        if document_frequency is None:
+            return [term for _, term in zip(range(max_expansions), terms)]
+        matches = list(terms)
+        if len(matches) > max_expansions:
+            matches = sorted(heapq.nlargest(max_expansions, matches, key=document_frequency))
+        return matches
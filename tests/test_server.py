@@ -0,0 +1,201 @@
+"""
+Tests du serveur HTTP/JSON, démarré sur un port libre de 127.0.0.1.
+
+Le serveur tourne dans sa propre boucle d'événements, dans un thread ; les
+requêtes sont faites avec http.client, comme par un client réel.
+"""
+
+import asyncio
+import http.client
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import pytest
+
+import document_loader
+from incremental import IncrementalIndexer
+from server import SearchServer
+
+DOCUMENTS = {
+    "chats.txt": "Le chat noir dort sur le canapé. Un chat dort toujours.",
+    "chiens.txt": "Le chien noir court dans le jardin.",
+    "jardin.txt": "Le jardin est plein de fleurs, et le chat y chasse.",
+    "moteur.txt": "Un moteur de recherche construit un index inversé.",
+    "vide.md": "Quelques mots sans rapport.",
+}
+
+
+class RunningServer:
+    """Serveur démarré dans un thread, avec son répertoire de documents."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.updater = IncrementalIndexer(directory)
+        self.updater.refresh(background_compaction=False)
+        self.server = SearchServer(self.updater.index, document_loader.DocumentStore(directory), workers=4)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._call(self.server.start("127.0.0.1", 0))
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout=10)
+
+    def connect(self) -> http.client.HTTPConnection:
+        return http.client.HTTPConnection("127.0.0.1", self.server.port, timeout=10)
+
+    def get(self, path: str, connection: http.client.HTTPConnection = None):
+        """Envoie une requête GET et retourne le code HTTP et le corps décodé (JSON, ou texte)."""
+        own_connection = connection is None
+        if own_connection:
+            connection = self.connect()
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            body = response.read().decode("utf-8")
+            if response.getheader("Content-Type", "").startswith("application/json"):
+                body = json.loads(body)
+            return response.status, body
+        finally:
+            if own_connection:
+                connection.close()
+
+    def close(self):
+        self._call(self.server.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+        self._loop.close()
+        self.updater.index.close()
+
+
+@pytest.fixture
+def running(tmp_path):
+    for name, content in DOCUMENTS.items():
+        (tmp_path / name).write_text(content, encoding="utf-8")
+    # Listé par le répertoire mais écarté à l'indexation
+    (tmp_path / "binaire.txt").write_bytes(b"\x00\x01\x02 chat")
+    running = RunningServer(str(tmp_path))
+    yield running
+    running.close()
+
+
+def test_health(running):
+    status, body = running.get("/health")
+    assert status == 200
+    assert body["statut"] == "ok"
+    assert body["documents"] == len(DOCUMENTS)
+
+
+def test_search_returns_ranked_results_with_snippets(running):
+    status, body = running.get("/search?q=chat&mode=et&k=10")
+    assert status == 200
+    assert body["mode"] == "ET"
+    documents = [result["document"] for result in body["resultats"]]
+    assert sorted(documents) == ["chats.txt", "jardin.txt"]
+    assert documents[0] == "chats.txt"
+    scores = [result["score"] for result in body["resultats"]]
+    assert scores == sorted(scores, reverse=True)
+    assert all("**chat**" in result["extrait"] for result in body["resultats"])
+
+
+def test_search_modes_and_limit(running):
+    _, all_terms = running.get("/search?" + "q=" + quote("chat noir") + "&mode=et")
+    _, any_term = running.get("/search?" + "q=" + quote("chat noir") + "&mode=ou")
+    assert [result["document"] for result in all_terms["resultats"]] == ["chats.txt"]
+    assert {result["document"] for result in any_term["resultats"]} == {"chats.txt", "chiens.txt", "jardin.txt"}
+    _, limited = running.get("/search?" + "q=" + quote("chat noir") + "&mode=ou&k=1")
+    assert len(limited["resultats"]) == 1
+
+
+def test_search_normalizes_the_query(running):
+    _, lower = running.get("/search?q=chat")
+    _, upper = running.get("/search?q=CHAT")
+    assert upper["resultats"] == lower["resultats"]
+
+
+def test_search_bad_requests(running):
+    status, body = running.get("/search")
+    assert status == 400
+    assert "erreur" in body
+    status, _ = running.get("/search?q=" + quote("   "))
+    assert status == 400
+    status, _ = running.get("/search?q=chat&k=beaucoup")
+    assert status == 400
+
+
+def test_unknown_route_and_method(running):
+    status, _ = running.get("/inconnue")
+    assert status == 404
+    connection = running.connect()
+    try:
+        connection.request("POST", "/search?q=chat", body=b"")
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 405
+    finally:
+        connection.close()
+
+
+def test_stats_count_only_indexed_documents(running):
+    status, body = running.get("/stats?limit=3")
+    assert status == 200
+    assert body["documents"] == len(DOCUMENTS)
+    assert body["moyenne_mots_par_document"] == pytest.approx(body["mots_total"] / len(DOCUMENTS))
+    assert len(body["mots_frequents"]) == 3
+    assert body["mots_frequents"][0][0] == "le"
+
+
+def test_document_stats(running):
+    status, body = running.get("/documents/chats.txt?limit=2")
+    assert status == 200
+    assert body["document"] == "chats.txt"
+    assert body["mots"] == 11
+    assert len(body["mots_frequents"]) == 2
+    assert all(word in ("le", "chat", "dort") and count == 2 for word, count in body["mots_frequents"])
+
+
+def test_document_stats_not_found(running):
+    status, _ = running.get("/documents/absent.txt")
+    assert status == 404
+    # Fichier présent dans le répertoire mais écarté à l'indexation
+    status, _ = running.get("/documents/binaire.txt")
+    assert status == 404
+
+
+def test_search_with_a_deleted_document(running):
+    os.remove(os.path.join(running.directory, "jardin.txt"))
+    status, body = running.get("/search?q=chat")
+    assert status == 200
+    snippets = {result["document"]: result["extrait"] for result in body["resultats"]}
+    assert snippets["jardin.txt"] == ""
+    assert "**chat**" in snippets["chats.txt"]
+
+
+def test_keep_alive(running):
+    connection = running.connect()
+    try:
+        for query in ("chat", "chien", "moteur"):
+            status, body = running.get(f"/search?q={query}", connection)
+            assert status == 200
+            assert body["resultats"]
+    finally:
+        connection.close()
+
+
+def test_metrics(running):
+    status, body = running.get("/metrics")
+    assert status == 200
+    assert "textindexer_index_documents 5" in body
+
+
+def test_concurrent_requests(running):
+    paths = [f"/search?q={query}&mode=ou" for query in ("chat", "chien", "jardin", "noir", "moteur")] * 8
+    paths += ["/stats", "/documents/chats.txt"] * 4
+    expected = {path: running.get(path) for path in set(paths)}
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        responses = list(executor.map(running.get, paths))
+    for path, response in zip(paths, responses):
+        assert response == expected[path]
@@ -0,0 +1,105 @@
+"""
+Tests de l'index fragmenté : classement et scores identiques à ceux d'un index unique.
+
+Les fragments sont testés dans le processus courant et dans des processus
+de travail locaux, avant et après un enregistrement suivi d'un rechargement.
+"""
+
+import math
+
+import pytest
+
+from benchmarks.corpus import generate_corpus
+from indexer import InvertedIndex
+from search_engine import SearchEngine
+from sharding import ShardedIndex, ShardedSearchEngine
+
+QUERIES = ["ba", "mu ki", "de ri po", '"ba de"', "ba NEAR/3 ki", "lo*", "zeki tuvo", "absent"]
+TOP_K = 10
+
+
+@pytest.fixture(scope="module")
+def documents():
+    return generate_corpus(400, 40, vocabulary_size=300, seed=7)
+
+
+@pytest.fixture(scope="module")
+def single(documents):
+    index = InvertedIndex()
+    index.build_index(documents)
+    yield index
+    index.close()
+
+
+def assert_same_ranking(results, expected, top_k):
+    """
+    Vérifie que deux classements ont les mêmes scores.
+
+    Sans top_k, les documents et leur score doivent être identiques ; avec
+    top_k, les documents à égalité au rang de coupure peuvent différer, seuls
+    ceux mieux classés sont comparés.
+    """
+    assert len(results) == len(expected)
+    for (_, score), (_, expected_score) in zip(results, expected):
+        assert math.isclose(score, expected_score, rel_tol=1e-9)
+    if top_k is None:
+        scores = dict(results)
+        assert scores.keys() == dict(expected).keys()
+        for doc_id, expected_score in expected:
+            assert math.isclose(scores[doc_id], expected_score, rel_tol=1e-9)
+    elif expected:
+        cutoff = expected[-1][1]
+        assert ({doc_id for doc_id, score in results if score > cutoff}
+                == {doc_id for doc_id, score in expected if score > cutoff})
+
+
+def assert_matches_single(sharded, single, scorer):
+    engine = SearchEngine(single, scorer)
+    coordinator = ShardedSearchEngine(sharded, scorer)
+    for use_all_terms in (True, False):
+        for top_k in (None, TOP_K):
+            expected = [engine.search(query, use_all_terms, top_k) for query in QUERIES]
+            results = coordinator.search_many(QUERIES, use_all_terms, top_k)
+            for query, result, reference in zip(QUERIES, results, expected):
+                try:
+                    assert_same_ranking(result, reference, top_k)
+                except AssertionError as e:
+                    raise AssertionError(f"{query!r} ({scorer}, ET={use_all_terms}, top_k={top_k})") from e
+
+
+@pytest.mark.parametrize("processes", [False, True], ids=["locaux", "processus"])
+@pytest.mark.parametrize("scorer", ["bm25", "tfidf", "frequence"])
+def test_sharded_scores_match_single_index(documents, single, processes, scorer):
+    with ShardedIndex(3, processes=processes) as sharded:
+        sharded.build_index(documents)
+        assert len(sharded) == len(documents)
+        assert_matches_single(sharded, single, scorer)
+
+
+@pytest.mark.parametrize("processes", [False, True], ids=["locaux", "processus"])
+def test_sharded_scores_match_after_save_and_load(documents, single, processes, tmp_path):
+    with ShardedIndex(4, processes=processes) as sharded:
+        sharded.build_index(documents)
+        sharded.save(str(tmp_path))
+    with ShardedIndex.load(str(tmp_path), processes=processes) as loaded:
+        assert len(loaded.shards) == 4
+        assert len(loaded) == len(documents)
+        assert_matches_single(loaded, single, "bm25")
+
+
+def test_sharded_scores_match_after_updates(documents):
+    removed = sorted(documents)[::7]
+    added = {"ajout_1.txt": "ba ba ki lo mu", "ajout_2.txt": "de ri po ba de"}
+    single = InvertedIndex()
+    single.build_index(documents)
+    with ShardedIndex(3) as sharded:
+        sharded.build_index(documents)
+        for doc_id in removed:
+            single.remove_document(doc_id)
+            sharded.remove_document(doc_id)
+        for doc_id, content in added.items():
+            single.add_document(doc_id, content)
+            sharded.add_document(doc_id, content)
+        assert len(sharded) == len(documents) - len(removed) + len(added)
+        assert_matches_single(sharded, single, "bm25")
+    single.close()
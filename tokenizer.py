@@ -0,0 +1,251 @@
+"""
+Module pour découper et normaliser le texte en tokens.
+
+Ce module fournit des fonctionnalités pour :
+1. Découper le texte en mots avec une expression régulière compilée une seule fois
+2. Normaliser les mots (forme Unicode NFKC, casse, accents en option) de la même
+   façon à l'indexation et dans les requêtes
+3. Retirer les mots vides et raciniser les mots, en option (voir analysis.py)
+4. Garder en cache la forme normalisée des mots déjà rencontrés, et traiter un
+   texte entièrement ASCII par une table de traduction, sans normalisation Unicode
+5. Relever la position de chaque token dans le texte original, pour les extraits
+"""
+
+import re
+import unicodedata
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from analysis import STEMMERS, STOP_WORDS
+
+# Un token est une suite de lettres ou de chiffres (Unicode), sans le tiret bas
+DEFAULT_PATTERN = r"[^\W_]+"
+
+# Même découpage, en gardant dans le mot les accents combinants d'un texte
+# décomposé (e suivi de U+0301 plutôt que é)
+_COMBINING_PATTERN = re.compile(r"[^\W_](?:[^\W_]|[\u0300-\u036f])*")
+
+# Avec le motif par défaut, un texte ASCII est découpé plus vite en remplaçant
+# chaque caractère qui n'est ni une lettre ni un chiffre par un blanc
+_ASCII_SEPARATORS = str.maketrans({chr(c): ' ' for c in range(128) if not chr(c).isalnum()})
+
+# Nombre de mots distincts dont la forme normalisée est gardée en cache
+NORMALIZE_CACHE_SIZE = 1 << 16
+
+
+class Tokenizer:
+    """
+    Découpage et normalisation du texte, partagés par l'indexation et les requêtes.
+
+    Les paramètres sont enregistrés avec l'index : une requête est toujours
+    normalisée comme les documents de l'index qu'elle interroge.
+    """
+
+    def __init__(self, casefold: bool = True, normalization: Optional[str] = "NFKC",
+                 fold_accents: bool = False, pattern: str = DEFAULT_PATTERN,
+                 stop_words: Sequence[str] = (), stemmer: Optional[str] = None):
+        """
+        Initialise le tokeniseur.
+
+        Args :
+            casefold : Si True, ignore la casse (casefold, plus complet que lower : ß -> ss)
+            normalization : Forme de normalisation Unicode ('NFC', 'NFKC'...) ou None
+            fold_accents : Si True, retire les accents (été -> ete)
+            pattern : Expression régulière d'un token
+            stop_words : Langues dont les mots vides sont retirés ('fr', 'en')
+            stemmer : Langue du raciniseur léger appliqué aux tokens ('fr', 'en') ou None
+        """
+        for language in stop_words:
+            if language not in STOP_WORDS:
+                raise ValueError(f"Liste de mots vides inconnue : {language} (choix possibles : {', '.join(STOP_WORDS)})")
+        if stemmer is not None and stemmer not in STEMMERS:
+            raise ValueError(f"Raciniseur inconnu : {stemmer} (choix possibles : {', '.join(STEMMERS)})")
+        self.casefold = casefold
+        self.normalization = normalization
+        self.fold_accents = fold_accents
+        self.pattern = pattern
+        self.stop_words = list(stop_words)
+        self.stemmer = stemmer
+        self._regex = re.compile(pattern)
+        self._combining_regex = _COMBINING_PATTERN if pattern == DEFAULT_PATTERN else self._regex
+        self._ascii_table = _ASCII_SEPARATORS if pattern == DEFAULT_PATTERN else None
+        self._normalize_cached = lru_cache(maxsize=NORMALIZE_CACHE_SIZE)(self._normalize_word)
+
+        # Mots vides, normalisés comme les tokens (sans accents si fold_accents)
+        self._stop_words = frozenset(self.normalize(word) for language in stop_words
+                                     for word in STOP_WORDS[language])
+        self._stem = STEMMERS[stemmer] if stemmer is not None else None
+        # Normalisation, filtrage et racinisation d'un mot découpé, None si aucun filtre
+        self._term = None
+        if self._stop_words or self._stem is not None:
+            self._term = lru_cache(maxsize=NORMALIZE_CACHE_SIZE)(self._analyze_word)
+
+    def __getstate__(self) -> Dict:
+        return self.config()
+
+    def __setstate__(self, state: Dict):
+        self.__init__(**state)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Tokenizer):
+            return NotImplemented
+        return self.config() == other.config()
+
+    def config(self) -> Dict:
+        """Retourne les paramètres du tokeniseur, enregistrés avec l'index."""
+        return {
+            'casefold': self.casefold,
+            'normalization': self.normalization,
+            'fold_accents': self.fold_accents,
+            'pattern': self.pattern,
+            'stop_words': self.stop_words,
+            'stemmer': self.stemmer,
+        }
+
+    def _normalize_word(self, word: str) -> str:
+        if self.normalization:
+            word = unicodedata.normalize(self.normalization, word)
+        if self.casefold:
+            word = word.casefold()
+        if self.fold_accents:
+            word = ''.join(c for c in unicodedata.normalize('NFD', word) if not unicodedata.combining(c))
+            word = unicodedata.normalize('NFC', word)
+        return word
+
+    def _analyze_word(self, word: str) -> str:
+        word = self.normalize(word)
+        if word in self._stop_words:
+            return ""
+        if self._stem is not None:
+            word = self._stem(word)
+        return word
+
+    def normalize(self, word: str) -> str:
+        """
+        Normalise les caractères d'un terme (forme Unicode, casse, accents).
+
+        Les mots vides et la racinisation ne sont pas appliqués : cette
+        normalisation est idempotente, et un terme de l'index est inchangé.
+        Pour un texte saisi par l'utilisateur, utiliser tokenize.
+        """
+        if word.isascii():
+            return word.lower() if self.casefold else word
+        return self._normalize_cached(word)
+
+    def tokenize(self, text: str) -> List[str]:
+        """
+        Découpe un texte en tokens normalisés.
+
+        Args :
+            text : Texte d'entrée à tokeniser
+
+        Returns :
+            Liste de tokens
+        """
+        if text.isascii():
+            # Chemin rapide : la casse se traite en une passe sur tout le texte
+            # et la normalisation Unicode n'a aucun effet
+            if self.casefold:
+                text = text.lower()
+            if self._ascii_table is not None:
+                words = text.translate(self._ascii_table).split()
+            else:
+                words = self._regex.findall(text)
+            if self._term is None:
+                return words
+        else:
+            words = self._words(text).findall(text)
+            if self._term is None:
+                return list(map(self._normalize_cached, words))
+        return [term for term in map(self._term, words) if term]
+
+    def analyze(self, content: str) -> Tuple[Dict[str, List[int]], array]:
+        """
+        Tokenise un document en une seule passe et relève la place de chaque token.
+
+        Args :
+            content : Contenu brut du document
+
+        Returns :
+            Tuple (dictionnaire token -> positions, décalage en caractères du début
+            de chaque token dans content)
+        """
+        if content.isascii() and self._ascii_table is not None:
+            return self._analyze_ascii(content)
+        positions = {}
+        offsets = array('I')
+        append_offset = offsets.append
+        if content.isascii():
+            # La mise en minuscules d'un texte ASCII conserve les décalages
+            text = content.lower() if self.casefold else content
+            normalize = self._term
+            regex = self._regex
+        else:
+            text = content
+            normalize = self._term or self._normalize_cached
+            regex = self._words(content)
+        position = 0
+        for match in regex.finditer(text):
+            token = match.group() if normalize is None else normalize(match.group())
+            if not token:
+                continue  # mot vide
+            token_positions = positions.get(token)
+            if token_positions is None:
+                positions[token] = [position]
+            else:
+                token_positions.append(position)
+            append_offset(match.start())
+            position += 1
+        return positions, offsets
+
+    def _analyze_ascii(self, content: str) -> Tuple[Dict[str, List[int]], array]:
+        """Variante d'analyze pour un texte ASCII, découpé par la table de traduction."""
+        # Les séparateurs deviennent des blancs sans changer la longueur du texte :
+        # chaque token se retrouve au même décalage que dans content
+        text = (content.lower() if self.casefold else content).translate(self._ascii_table)
+        term = self._term
+        positions = {}
+        offsets = array('I')
+        append_offset = offsets.append
+        find = text.find
+        cursor = 0
+        position = 0
+        for word in text.split():
+            start = find(word, cursor)
+            cursor = start + len(word)
+            token = word if term is None else term(word)
+            if not token:
+                continue  # mot vide
+            token_positions = positions.get(token)
+            if token_positions is None:
+                positions[token] = [position]
+            else:
+                token_positions.append(position)
+            append_offset(start)
+            position += 1
+        return positions, offsets
+
+    def token_end(self, content: str, start: int) -> int:
+        """
+        Retourne la fin du token qui commence au décalage donné (relevé par analyze).
+
+        Args :
+            content : Contenu brut du document
+            start : Décalage du début du token dans content
+
+        Returns :
+            Décalage du caractère suivant le token
+        """
+        match = self._combining_regex.match(content, start)
+        return match.end() if match else start
+
+    def _words(self, text: str):
+        """Choisit l'expression de découpage d'un texte non ASCII."""
+        if unicodedata.is_normalized('NFC', text):
+            return self._regex
+        return self._combining_regex
+
+
+# Tokeniseur par défaut, partagé par les index qui n'en précisent pas
+DEFAULT_TOKENIZER = Tokenizer()